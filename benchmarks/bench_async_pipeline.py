@@ -0,0 +1,108 @@
+"""
+Time-to-first-row and total wall time of one ingestion run: the phased
+main() (threaded fetch of every city, then process, then one insert) vs.
+PIPELINE_MODE=async (aiohttp fetch streamed through micro-batched asyncpg
+COPY inserts).
+
+Runs against the local stub API and a disposable PostgreSQL database
+(DB_* settings); each variant starts from an empty scratch schema.
+
+    python -m benchmarks.bench_async_pipeline --cities 1000 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("WEATHER_API_KEY", "bench")
+os.environ.setdefault("CACHE_BACKEND", "none")
+os.environ.setdefault("API_RATE_LIMIT_PER_MINUTE", "0")
+
+from benchmarks import pg  # noqa: E402
+from benchmarks.stub_api import StubWeatherServer  # noqa: E402
+from weather_analyzer import main as pipeline_main  # noqa: E402
+from weather_analyzer.config.settings import settings  # noqa: E402
+
+
+def fresh_schema(conn) -> None:
+    """Empty scratch tables, and make the once-per-process schema checks run again."""
+    from weather_analyzer.db import rollup, schema
+
+    pg.reset_schema(conn)
+    schema.forget_write_schema()
+    rollup.forget_rollup_table()
+    pipeline_main.observation_cache.clear()
+
+
+def stored_rows(conn) -> int:
+    with conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM weather_summary")
+        return cur.fetchone()[0]
+
+
+def run_phased(cities, raw_output, concurrency) -> tuple[float | None, float]:
+    # All rows become visible when the single insert transaction commits
+    start = time.perf_counter()
+    committed = []
+    persist = pipeline_main.persist_records
+
+    def timed_persist(records, **kwargs):
+        inserted = persist(records, **kwargs)
+        committed.append(time.perf_counter() - start)
+        return inserted
+
+    pipeline_main.persist_records = timed_persist
+    try:
+        pipeline_main.main(cities=cities, raw_output=raw_output, concurrency=concurrency, pipeline="phased")
+    finally:
+        pipeline_main.persist_records = persist
+    return (committed[0] if committed else None), time.perf_counter() - start
+
+
+def run_async(cities, raw_output, concurrency) -> tuple[float | None, float]:
+    from weather_analyzer.async_pipeline import create_pool, run_async_pipeline
+
+    async def run():
+        # PGOPTIONS is not read by asyncpg: point its sessions at the scratch schema explicitly
+        pool = await create_pool(server_settings={"search_path": pg.BENCH_SCHEMA})
+        try:
+            start = time.perf_counter()
+            stats = await run_async_pipeline(
+                cities, raw_output=raw_output, concurrency=concurrency,
+                observations=pipeline_main.observation_cache, pool=pool,
+            )
+            return stats["first_row_seconds"], time.perf_counter() - start
+        finally:
+            await pool.close()
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cities", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub API response delay, seconds")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    cities = [f"City-{i}" for i in range(args.cities)]
+    # Same in-flight ceiling for both: the threaded client caps it at its pool size
+    settings.HTTP_POOL_MAXSIZE = max(settings.HTTP_POOL_MAXSIZE, args.concurrency)
+
+    conn = pg.connect()
+    with StubWeatherServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as raw_output:
+        settings.WEATHER_API_URL = f"{server.base_url}/weather"
+
+        print(f"{args.cities} cities, stub latency {args.latency * 1000:.0f} ms, concurrency {args.concurrency}")
+        print(f"{'pipeline':<8} {'first row s':>12} {'total s':>9} {'rows':>7}")
+        for name, run in (("phased", run_phased), ("async", run_async)):
+            fresh_schema(conn)
+            first_row, total = run(cities, raw_output, args.concurrency)
+            first = f"{first_row:.3f}" if first_row is not None else "-"
+            print(f"{name:<8} {first:>12} {total:>9.2f} {stored_rows(conn):>7}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Load throughput (rows/sec) of the batch INSERT path vs. the COPY
+staging-table path.
+
+Needs a disposable PostgreSQL database (DB_* settings); everything
+happens in the scratch schema from benchmarks.pg.
+
+    python -m benchmarks.bench_bulk_insert --rows 1000000
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("WEATHER_API_KEY", "bench")
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+from benchmarks import pg  # noqa: E402
+from weather_analyzer.backfill import load_records  # noqa: E402
+
+
+def synthetic_records(rows: int, cities: int = 500):
+    start = datetime(2015, 1, 1)
+    for n in range(rows):
+        yield {
+            "city": f"City-{n % cities}",
+            "temperature": (n % 400) / 10 - 10,
+            "humidity": n % 100,
+            "fetched_at": start + timedelta(minutes=10 * (n // cities)),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    conn = pg.connect()
+
+    for mode in ("batch", "copy"):
+        pg.reset_schema(conn)
+        start = time.perf_counter()
+        inserted = load_records(synthetic_records(args.rows), mode, args.batch_rows)
+        elapsed = time.perf_counter() - start
+        print(f"{mode:<6} {inserted:>10,} rows in {elapsed:7.2f}s  {inserted / elapsed:>12,.0f} rows/sec")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
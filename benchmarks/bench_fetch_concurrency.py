@@ -0,0 +1,59 @@
+"""
+Wall time of the serial fetch loop vs. the concurrent FetchEngine.
+
+    python -m benchmarks.bench_fetch_concurrency --cities 200 --latency 0.05
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("WEATHER_API_KEY", "bench")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_NAME", "bench")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("CACHE_BACKEND", "none")
+os.environ.setdefault("API_RATE_LIMIT_PER_MINUTE", "0")
+
+from benchmarks.stub_api import StubWeatherServer  # noqa: E402
+from weather_analyzer.config.settings import settings  # noqa: E402
+from weather_analyzer.fetch_weather import fetch_weather, fetch_weather_many  # noqa: E402
+
+
+def run_serial(cities):
+    return [fetch_weather(city) for city in cities]
+
+
+def run_concurrent(cities, concurrency):
+    return fetch_weather_many(cities, concurrency=concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cities", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8, 16, 32])
+    args = parser.parse_args()
+
+    cities = [f"City-{i}" for i in range(args.cities)]
+
+    with StubWeatherServer(latency=args.latency) as server:
+        settings.WEATHER_API_URL = f"{server.base_url}/weather"
+
+        start = time.perf_counter()
+        serial = run_serial(cities)
+        serial_time = time.perf_counter() - start
+        print(f"serial       {serial_time:8.2f}s  ({sum(r is not None for r in serial)} ok)")
+
+        for concurrency in args.concurrency:
+            start = time.perf_counter()
+            results = run_concurrent(cities, concurrency)
+            elapsed = time.perf_counter() - start
+            print(
+                f"engine x{concurrency:<4} {elapsed:8.2f}s  "
+                f"({sum(r is not None for r in results)} ok, {serial_time / elapsed:.1f}x faster)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+API request count and wall time: per-city fetches vs. the group endpoint.
+
+The first group run resolves city IDs (one call per city); later runs
+only pay one call per GROUP_CHUNK_SIZE cities.
+
+    python -m benchmarks.bench_group_fetch --cities 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("WEATHER_API_KEY", "bench")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_NAME", "bench")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("CACHE_BACKEND", "none")
+os.environ.setdefault("API_RATE_LIMIT_PER_MINUTE", "0")
+
+from benchmarks.stub_api import StubWeatherServer  # noqa: E402
+from weather_analyzer.config.settings import settings  # noqa: E402
+from weather_analyzer.fetch_group import fetch_weather_grouped  # noqa: E402
+from weather_analyzer.fetch_weather import fetch_weather_many  # noqa: E402
+
+
+def measure(server, label, fetch, cities):
+    before = server.requests
+    start = time.perf_counter()
+    results = fetch(cities)
+    elapsed = time.perf_counter() - start
+    calls = server.requests - before
+    ok = sum(r is not None for r in results)
+    print(f"{label:<22} {elapsed:7.2f}s  {calls:5d} API calls  ({ok} ok)")
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    cities = [f"City-{i}" for i in range(args.cities)]
+
+    with tempfile.TemporaryDirectory() as tmp, StubWeatherServer(latency=args.latency) as server:
+        settings.WEATHER_API_URL = f"{server.base_url}/weather"
+        settings.WEATHER_GROUP_API_URL = f"{server.base_url}/group"
+        settings.CITY_ID_CACHE_PATH = os.path.join(tmp, "city_ids.json")
+
+        single = measure(server, "single", fetch_weather_many, cities)
+        measure(server, "group (cold ID cache)", fetch_weather_grouped, cities)
+        group = measure(server, "group (warm ID cache)", fetch_weather_grouped, cities)
+        print(f"request reduction: {single / max(group, 1):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
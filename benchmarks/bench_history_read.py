@@ -0,0 +1,80 @@
+"""
+Peak memory and read time of a full-history read: plain pd.read_sql
+vs. the chunked, typed read_history API.
+
+Each variant runs in a fresh subprocess so peak RSS is measured in
+isolation. Needs a disposable PostgreSQL database (DB_* settings);
+seeding 50M rows takes a few minutes and ~4 GB of disk.
+
+    python -m benchmarks.bench_history_read --rows 50000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("WEATHER_API_KEY", "bench")
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+from benchmarks import pg  # noqa: E402
+
+QUERY = "SELECT city, temperature, humidity, fetched_at FROM weather_summary ORDER BY fetched_at ASC"
+
+
+def run_variant(variant: str) -> dict:
+    import pandas as pd
+
+    start = time.perf_counter()
+    if variant == "read_sql":
+        conn = pg.connect()
+        df = pd.read_sql(QUERY, conn, parse_dates=["fetched_at"])
+        conn.close()
+    else:
+        from weather_analyzer.db.history import read_history
+        df = read_history()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "rows": len(df),
+        "seconds": elapsed,
+        "frame_mb": df.memory_usage(deep=True).sum() / 1e6,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the existing scratch table")
+    parser.add_argument("--variant", choices=["read_sql", "read_history"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant)))
+        return
+
+    if not args.skip_seed:
+        conn = pg.connect()
+        pg.reset_schema(conn)
+        pg.seed_rows(conn, args.rows, cities=args.cities)
+        conn.close()
+
+    print(f"{'variant':<14} {'rows':>12} {'seconds':>9} {'frame MB':>10} {'peak RSS MB':>12}")
+    for variant in ("read_sql", "read_history"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_history_read", "--variant", variant],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        print(
+            f"{variant:<14} {result['rows']:>12,} {result['seconds']:>9.2f} "
+            f"{result['frame_mb']:>10.1f} {result['peak_rss_mb']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
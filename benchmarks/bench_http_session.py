@@ -0,0 +1,50 @@
+"""
+Connect vs. transfer time with and without keep-alive connection reuse.
+
+    python -m benchmarks.bench_http_session --requests 200 --latency 0.01
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("WEATHER_API_KEY", "bench")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_NAME", "bench")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+from benchmarks.stub_api import StubWeatherServer  # noqa: E402
+from weather_analyzer.http_client import WeatherHttpClient  # noqa: E402
+
+
+def run(client: WeatherHttpClient, url: str, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        client.get_json(url, {"q": f"City-{i}"})
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with StubWeatherServer(latency=args.latency) as server:
+        url = f"{server.base_url}/weather"
+
+        for label, keepalive in (("fresh connection", False), ("pooled keep-alive", True)):
+            client = WeatherHttpClient(keepalive=keepalive)
+            elapsed = run(client, url, args.requests)
+            stats = client.stats()
+            client.close()
+            print(
+                f"{label:<18} {elapsed:7.2f}s  connects={stats['connects']:<5} "
+                f"connect={stats['connect_time'] * 1000:8.1f}ms  "
+                f"transfer={stats['transfer_time'] * 1000:8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Per-run insert latency as weather_summary grows: the old COUNT(*)
+bracketing vs. RETURNING-based accounting in insert_weather_records.
+
+Needs a disposable PostgreSQL database (DB_* settings); everything
+happens in the scratch schema from benchmarks.pg.
+
+    python -m benchmarks.bench_insert_accounting --sizes 10000 100000 1000000 10000000
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("WEATHER_API_KEY", "bench")
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+from psycopg2.extras import execute_batch  # noqa: E402
+
+from benchmarks import pg  # noqa: E402
+from weather_analyzer.db.insert_weather import insert_weather_records  # noqa: E402
+
+
+def legacy_insert(conn, records: list[dict]) -> int:
+    """The pre-RETURNING implementation, kept here for comparison."""
+    values = [(r["city"], r["temperature"], r["humidity"], r["fetched_at"]) for r in records]
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM weather_summary;")
+        before = cur.fetchone()[0]
+        execute_batch(
+            cur,
+            """
+            INSERT INTO weather_summary (city, temperature, humidity, fetched_at)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (city, fetched_at) DO NOTHING
+            """,
+            values,
+            page_size=50,
+        )
+        cur.execute("SELECT COUNT(*) FROM weather_summary;")
+        return cur.fetchone()[0] - before
+
+
+def run_records(run: int, cities: int) -> list[dict]:
+    fetched_at = datetime(2100, 1, 1) + timedelta(minutes=10 * run)
+    return [
+        {"city": f"City-{i}", "temperature": 5.0, "humidity": 50, "fetched_at": fetched_at}
+        for i in range(cities)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--cities", type=int, default=3, help="records per run")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = pg.connect()
+    pg.reset_schema(conn)
+    seeded = 0
+    run = 0
+
+    print(f"{'rows':>12} {'COUNT(*) ms':>12} {'RETURNING ms':>13}")
+    for size in sorted(args.sizes):
+        pg.seed_rows(conn, size - seeded, start_row=seeded)
+        seeded = size
+
+        legacy, returning = [], []
+        for _ in range(args.runs):
+            run += 1
+            start = time.perf_counter()
+            legacy_insert(conn, run_records(run, args.cities))
+            legacy.append(time.perf_counter() - start)
+
+            run += 1
+            start = time.perf_counter()
+            insert_weather_records(run_records(run, args.cities))
+            returning.append(time.perf_counter() - start)
+
+        print(
+            f"{size:>12,} {statistics.median(legacy) * 1000:>12.1f} "
+            f"{statistics.median(returning) * 1000:>13.1f}"
+        )
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Scan time and storage size: pd.read_sql against weather_summary vs. the
+date-partitioned Parquet dataset written by weather_analyzer.dataset.
+
+Two queries are timed: the full history (every column), and a typical
+analyst query (one city, the last 30 days, two columns) where the
+Parquet reader prunes partitions and columns. Needs a disposable
+PostgreSQL database (DB_* settings).
+
+    python -m benchmarks.bench_parquet --rows 5000000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+os.environ.setdefault("WEATHER_API_KEY", "bench")
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+from benchmarks import pg  # noqa: E402
+
+# pandas only formally supports SQLAlchemy connections; psycopg2 works fine
+warnings.filterwarnings("ignore", message="pandas only supports SQLAlchemy")
+
+
+def timed(func) -> tuple[float, int]:
+    start = time.perf_counter()
+    rows = len(func())
+    return time.perf_counter() - start, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the existing scratch table")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from weather_analyzer.dataset import export_history, read_dataset
+
+    conn = pg.connect()
+    if not args.skip_seed:
+        pg.reset_schema(conn)
+        pg.seed_rows(conn, args.rows, cities=args.cities)
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_total_relation_size('weather_summary'), max(fetched_at) FROM weather_summary")
+        table_bytes, newest = cur.fetchone()
+
+    root = Path(tempfile.mkdtemp(prefix="weather_parquet_"))
+    try:
+        start = time.perf_counter()
+        written = export_history(root=root, full=True)
+        export_seconds = time.perf_counter() - start
+        parquet_bytes = sum(p.stat().st_size for p in root.rglob("*.parquet"))
+
+        window_start = newest - pd.Timedelta(days=30)
+        queries = {
+            "full scan": (
+                lambda: pd.read_sql(
+                    "SELECT city, temperature, humidity, fetched_at FROM weather_summary ORDER BY fetched_at",
+                    conn, parse_dates=["fetched_at"],
+                ),
+                lambda: read_dataset(root),
+            ),
+            "1 city, 30 days, 2 cols": (
+                lambda: pd.read_sql(
+                    "SELECT temperature, fetched_at FROM weather_summary "
+                    "WHERE city = %(city)s AND fetched_at >= %(start)s ORDER BY fetched_at",
+                    conn, params={"city": "City-7", "start": window_start}, parse_dates=["fetched_at"],
+                ),
+                lambda: read_dataset(root, cities=["City-7"], start=window_start, columns=["temperature", "fetched_at"]),
+            ),
+        }
+
+        print(f"rows {written['rows']:,} in {written['days']:,} day partitions, export {export_seconds:.2f}s")
+        print(f"size: weather_summary {table_bytes / 1e6:.1f} MB (heap + indexes), Parquet {parquet_bytes / 1e6:.1f} MB")
+        print(f"{'query':<26} {'read_sql s':>11} {'parquet s':>10} {'rows':>11}")
+        for name, (sql_query, parquet_query) in queries.items():
+            sql_seconds, rows = timed(sql_query)
+            parquet_seconds, parquet_rows = timed(parquet_query)
+            assert rows == parquet_rows, (rows, parquet_rows)
+            print(f"{name:<26} {sql_seconds:>11.2f} {parquet_seconds:>10.2f} {rows:>11,}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Raw payload → DB-ready rows, per million payloads: the previous
+dict-per-observation processing (plus the writer's tuple rebuild) vs.
+the single-pass columnar WeatherBatch.
+
+Reports throughput, peak traced allocations while processing, and the
+memory still held by the result. The legacy path only kept temperature
+and humidity, so the batch is measured with that metric set and with
+every metric. Synthetic payloads, no database needed.
+
+    python -m benchmarks.bench_records --payloads 100000 1000000
+"""
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault("WEATHER_API_KEY", "bench")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_NAME", "bench")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+from weather_analyzer.db.insert_weather import record_values  # noqa: E402
+from weather_analyzer.metrics import METRICS  # noqa: E402
+from weather_analyzer.records import WeatherBatch  # noqa: E402
+
+
+def make_payloads(count: int, cities: int = 500) -> list[dict]:
+    return [
+        {
+            "name": f"City{i % cities:04d}",
+            "dt": 1_700_000_000 + i,
+            "main": {"temp": (i % 400) / 10 - 10, "humidity": i % 100, "pressure": 1013},
+            "wind": {"speed": 3.1, "deg": i % 360},
+            "clouds": {"all": i % 101},
+        }
+        for i in range(count)
+    ]
+
+
+def legacy(payloads: list[dict]):
+    # The previous process_weather_data, then insert_weather_records' tuple rebuild
+    fetched_at = datetime.utcnow()
+    processed = []
+    for item in payloads:
+        city = item.get("name")
+        main = item.get("main", {})
+        if not city or not main:
+            continue
+        processed.append({
+            "city": item["name"],
+            "temperature": item["main"]["temp"],
+            "humidity": item["main"]["humidity"],
+            "fetched_at": fetched_at,
+        })
+    values = [(row["city"], row["temperature"], row["humidity"], row["fetched_at"]) for row in processed]
+    return processed, values
+
+
+def columnar(payloads: list[dict]):
+    return WeatherBatch.from_payloads(payloads, metrics=["humidity"])
+
+
+def columnar_with_rows(payloads: list[dict]):
+    batch = WeatherBatch.from_payloads(payloads, metrics=["humidity"])
+    return batch, list(record_values(batch, batch.metrics))
+
+
+def columnar_all_metrics(payloads: list[dict]):
+    batch = WeatherBatch.from_payloads(payloads, metrics=list(METRICS))
+    return batch, list(record_values(batch, batch.metrics))
+
+
+def measure(fn, payloads: list[dict]) -> tuple[float, float, float]:
+    """(seconds, peak MB allocated while running, MB retained by the result)."""
+    gc.collect()
+    start = time.perf_counter()
+    fn(payloads)
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    result = fn(payloads)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return seconds, peak / 1e6, retained / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--payloads", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    variants = {
+        "legacy dicts + tuples": legacy,
+        "WeatherBatch": columnar,
+        "WeatherBatch + rows()": columnar_with_rows,
+        "all metrics + rows()": columnar_all_metrics,
+    }
+
+    print(f"{'payloads':>10} {'variant':<22} {'s / 1M':>8} {'payloads/s':>12} {'peak MB':>9} {'held MB':>9}")
+    for count in args.payloads:
+        payloads = make_payloads(count)
+        for name, fn in variants.items():
+            seconds, peak, retained = measure(fn, payloads)
+            print(
+                f"{count:>10,} {name:<22} {seconds * 1e6 / count:>8.2f} {count / seconds:>12,.0f} "
+                f"{peak:>9.1f} {retained:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Cold-start cost of the CLI entry points: median wall time of
+`python -c "import <module>"` over fresh interpreters, plus the heaviest
+imports reported by `-X importtime`.
+
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("WEATHER_API_KEY", "bench")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_NAME", "bench")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = [
+    "weather_analyzer.main",
+    "weather_analyzer.scheduler",
+    "weather_analyzer.backfill",
+    "weather_analyzer.pipeline",
+]
+
+
+def _run(args: list[str]) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    return subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True, check=True)
+
+
+def wall_time(module: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _run(["-c", f"import {module}"])
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def heaviest_imports(module: str, top: int) -> list[tuple[str, int]]:
+    """Third-party / stdlib root packages by cumulative import time (µs)."""
+    stderr = _run(["-X", "importtime", "-c", f"import {module}"]).stderr
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        # Root packages only: their cumulative time already includes submodules
+        if cumulative.strip().isdigit() and "." not in name and name != "weather_analyzer":
+            totals[name] = max(totals.get(name, 0), int(cumulative))
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = wall_time("sys", args.runs)
+    print(f"bare interpreter: {baseline * 1000:.0f} ms")
+
+    for module in ENTRY_POINTS:
+        seconds = wall_time(module, args.runs)
+        print(f"\n{module}: {seconds * 1000:.0f} ms ({(seconds - baseline) * 1000:.0f} ms above bare)")
+        for name, micros in heaviest_imports(module, args.top):
+            print(f"  {micros / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+compute_trends throughput across history sizes and city counts:
+the previous groupby-per-key formulation with a boolean mask per city
+for plotting vs. the single-pass analytics core with slice views.
+
+Synthetic in-memory data in the read_history dtypes, no database needed.
+The legacy variant materialises Python date objects per row, so it is
+skipped above --legacy-max-rows.
+
+With --metrics, also compares aggregating that many metric columns one
+daily_aggregates pass each vs. one shared compute_metric_trends pass.
+
+    python -m benchmarks.bench_trends --rows 1000 100000 1000000 10000000 100000000 --cities 3 100 5000
+    python -m benchmarks.bench_trends --rows 10000000 --cities 500 --metrics 1 4 8
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("WEATHER_API_KEY", "bench")
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from weather_analyzer.analytics import core  # noqa: E402
+
+
+def make_history(rows: int, cities: int, days: int = 365, seed: int = 0, metrics: int = 1) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    names = [f"City{i:05d}" for i in range(cities)]
+    codes = rng.integers(0, cities, rows, dtype=np.int16 if cities < 2 ** 15 else np.int32)
+    seconds = np.sort(rng.integers(0, days * 86400, rows))
+    return pd.DataFrame({
+        "city": pd.Categorical.from_codes(codes, categories=names),
+        "temperature": rng.normal(10, 10, rows).astype(np.float32),
+        **{f"metric{i}": rng.normal(0, 1, rows).astype(np.float32) for i in range(1, metrics)},
+        "fetched_at": np.datetime64("2024-01-01", "s") + seconds.astype("timedelta64[s]"),
+    })
+
+
+def metric_columns(df: pd.DataFrame) -> list[str]:
+    return [c for c in df.columns if c not in ("city", "fetched_at")]
+
+
+def per_metric(df: pd.DataFrame):
+    return {m: core.trends_from_daily(core.daily_aggregates(df, m)) for m in metric_columns(df)}
+
+
+def shared_pass(df: pd.DataFrame):
+    return core.compute_metric_trends(df, metric_columns(df))
+
+
+def legacy(df: pd.DataFrame):
+    df = df.assign(date=df["fetched_at"].dt.date)
+    overall = df.groupby("city", observed=True)["temperature"].agg(["min", "max", "mean"]).reset_index()
+    daily = df.groupby(["city", "date"], observed=True)["temperature"].agg(["min", "max", "mean"]).reset_index()
+    for city in daily["city"].unique():
+        daily[daily["city"] == city]
+    return overall, daily
+
+
+def vectorized(df: pd.DataFrame):
+    overall, daily = core.compute_trends(df)
+    for _ in core.city_slices(daily):
+        pass
+    return overall, daily
+
+
+def timed(fn, df: pd.DataFrame, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--cities", type=int, nargs="+", default=[3, 100, 5000])
+    parser.add_argument("--legacy-max-rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--metrics", type=int, nargs="*", default=[], help="metric counts to compare")
+    args = parser.parse_args()
+
+    if args.metrics:
+        print(f"{'rows':>12} {'cities':>7} {'metrics':>8} {'per-metric s':>13} {'shared s':>9} {'speedup':>8}")
+        for rows in args.rows:
+            for cities in args.cities:
+                for metrics in args.metrics:
+                    df = make_history(rows, cities, metrics=metrics)
+                    old = timed(per_metric, df, args.repeat)
+                    new = timed(shared_pass, df, args.repeat)
+                    print(f"{rows:>12} {cities:>7} {metrics:>8} {old:>13.3f} {new:>9.3f} {old / new:>7.1f}x")
+                    del df
+        return
+
+    print(f"{'rows':>12} {'cities':>7} {'legacy s':>10} {'core s':>10} {'speedup':>8}")
+    for rows in args.rows:
+        for cities in args.cities:
+            df = make_history(rows, cities)
+            repeat = args.repeat if rows <= 10_000_000 else 1
+            new = timed(vectorized, df, repeat)
+            if rows <= args.legacy_max_rows:
+                old = timed(legacy, df, repeat)
+                print(f"{rows:>12} {cities:>7} {old:>10.3f} {new:>10.3f} {old / new:>7.1f}x")
+            else:
+                print(f"{rows:>12} {cities:>7} {'skipped':>10} {new:>10.3f} {'-':>8}")
+            del df
+
+
+if __name__ == "__main__":
+    main()
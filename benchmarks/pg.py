@@ -0,0 +1,68 @@
+"""
+Scratch PostgreSQL helpers for the database benchmarks.
+
+Benchmarks connect with the usual DB_* settings but work inside a
+dedicated schema (BENCH_SCHEMA, default `weather_bench`) selected through
+PGOPTIONS, so library code that says `weather_summary` hits the scratch
+tables and never production data. Point DB_* at a disposable database.
+"""
+import os
+
+BENCH_SCHEMA = os.environ.get("BENCH_SCHEMA", "weather_bench")
+os.environ["PGOPTIONS"] = f"-c search_path={BENCH_SCHEMA}"
+
+import psycopg2  # noqa: E402
+
+from weather_analyzer.config.settings import settings  # noqa: E402
+
+WEATHER_SUMMARY_DDL = """
+    CREATE TABLE weather_summary (
+        city TEXT NOT NULL,
+        temperature DOUBLE PRECISION,
+        humidity INTEGER,
+        fetched_at TIMESTAMP NOT NULL,
+        UNIQUE (city, fetched_at)
+    )
+"""
+
+
+def connect():
+    conn = psycopg2.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        dbname=settings.DB_NAME,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+    )
+    conn.autocommit = True
+    return conn
+
+
+def reset_schema(conn, ddl: str = WEATHER_SUMMARY_DDL) -> None:
+    """Drop and recreate the scratch schema with an empty weather_summary."""
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {BENCH_SCHEMA}")
+        cur.execute(ddl)
+
+
+def seed_rows(conn, rows: int, cities: int = 100, start_row: int = 0) -> None:
+    """
+    Append synthetic history: `cities` cities observed every 10 minutes,
+    generated server-side so seeding 10M rows takes seconds, not hours.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO weather_summary (city, temperature, humidity, fetched_at)
+            SELECT
+                'City-' || (n %% %(cities)s),
+                (n %% 400) / 10.0 - 10,
+                n %% 100,
+                TIMESTAMP '2015-01-01' + (n / %(cities)s) * INTERVAL '10 minutes'
+            FROM generate_series(%(start)s, %(stop)s - 1) AS n
+            ON CONFLICT DO NOTHING
+            """,
+            {"cities": cities, "start": start_row, "stop": start_row + rows},
+        )
+        cur.execute("ANALYZE weather_summary")
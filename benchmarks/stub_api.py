@@ -0,0 +1,98 @@
+"""
+Local stand-in for the OpenWeatherMap API used by the benchmarks.
+
+Serves /data/2.5/weather?q=<city> and /data/2.5/group?id=<id,...> with a
+fixed artificial latency so wall-time comparisons measure the pipeline,
+not the internet. Every served request is counted.
+"""
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def city_payload(city: str) -> dict:
+    """Deterministic OpenWeatherMap-shaped payload for a city name."""
+    seed = zlib.crc32(city.encode("utf-8"))
+    return {
+        "id": seed % 10_000_000,
+        "name": city,
+        "dt": int(time.time()) // 600 * 600,
+        "main": {
+            "temp": round((seed % 400) / 10 - 10, 1),
+            "humidity": seed % 100,
+            "pressure": 990 + seed % 40,
+        },
+        "wind": {"speed": (seed % 150) / 10, "deg": seed % 360},
+        "clouds": {"all": seed % 101},
+    }
+
+
+class StubWeatherHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.05
+    stats = None  # shared dict, set per server
+    cities_by_id = None  # shared dict, set per server
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        with self.stats["lock"]:
+            self.stats["requests"] += 1
+
+        if url.path.endswith("/group"):
+            ids = [int(i) for i in query.get("id", [""])[0].split(",") if i]
+            items = [city_payload(self.cities_by_id[i]) for i in ids if i in self.cities_by_id]
+            payload = {"cnt": len(items), "list": items}
+        else:
+            city = query.get("q", ["Unknown"])[0]
+            payload = city_payload(city)
+            self.cities_by_id[payload["id"]] = city
+
+        body = json.dumps(payload).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubWeatherServer:
+    """Run the stub API on a background thread: `with StubWeatherServer() as server: ...`"""
+
+    def __init__(self, latency: float = 0.05, port: int = 0):
+        self.stats = {"requests": 0, "lock": threading.Lock()}
+        handler = type("Handler", (StubWeatherHandler,), {
+            "latency": latency,
+            "stats": self.stats,
+            "cities_by_id": {},
+        })
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def requests(self) -> int:
+        return self.stats["requests"]
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/data/2.5"
+
+    def __enter__(self) -> "StubWeatherServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
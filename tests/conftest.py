@@ -0,0 +1,10 @@
+import os
+
+# Settings requires these at import time; tests never talk to the real API or DB.
+os.environ.setdefault("WEATHER_API_KEY", "test-key")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_NAME", "weather_test")
+os.environ.setdefault("DB_USER", "user")
+os.environ.setdefault("DB_PASSWORD", "pass")
+os.environ.setdefault("CACHE_BACKEND", "none")
+os.environ.setdefault("API_RATE_LIMIT_PER_MINUTE", "0")
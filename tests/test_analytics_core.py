@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from weather_analyzer.analytics.core import city_slices, compute_metric_trends, compute_trends
+
+
+def _history(categorical=False):
+    rng = np.random.default_rng(7)
+    rows = 500
+    df = pd.DataFrame({
+        "city": rng.choice(["Stockholm", "London", "New York", "Oslo"], rows),
+        "temperature": rng.normal(10, 8, rows).astype("float32"),
+        "fetched_at": pd.Timestamp("2024-03-01") + pd.to_timedelta(rng.integers(0, 10 * 86400, rows), unit="s"),
+    })
+    df.loc[::17, "temperature"] = np.nan
+    if categorical:
+        df["city"] = df["city"].astype("category")
+    return df
+
+
+def _reference(df):
+    """The groupby-per-key formulation compute_trends replaces."""
+    df = df.assign(date=df["fetched_at"].dt.normalize(), temperature=df["temperature"].astype("float64"))
+    overall = df.groupby("city", observed=True)["temperature"].agg(["min", "max", "mean"]).reset_index()
+    daily = df.groupby(["city", "date"], observed=True)["temperature"].agg(["min", "max", "mean"]).reset_index()
+    return overall, daily
+
+
+@pytest.mark.parametrize("categorical", [False, True])
+def test_compute_trends_matches_groupby(categorical):
+    df = _history(categorical)
+    overall, daily = compute_trends(df)
+    expected_overall, expected_daily = _reference(df)
+
+    pd.testing.assert_frame_equal(overall, expected_overall.astype({"city": object}), check_dtype=False)
+    pd.testing.assert_frame_equal(daily, expected_daily.astype({"city": object}), check_dtype=False)
+
+
+def test_compute_trends_drops_unparseable_timestamps():
+    df = pd.DataFrame({
+        "city": ["Oslo", "Oslo", "Oslo"],
+        "temperature": [1.0, 2.0, 30.0],
+        "fetched_at": ["2024-03-01 10:00", "2024-03-01 11:00", "not a date"],
+    })
+    overall, daily = compute_trends(df)
+
+    assert overall["max"].tolist() == [2.0]
+    assert daily["date"].tolist() == [pd.Timestamp("2024-03-01")]
+
+
+def test_city_slices_keep_time_order_per_city():
+    df = _history().sort_values("fetched_at", ignore_index=True)
+    slices = dict(city_slices(df))
+
+    assert sorted(slices) == sorted(df["city"].unique())
+    for city, rows in slices.items():
+        assert (rows["city"] == city).all()
+        assert rows["fetched_at"].is_monotonic_increasing
+    assert sum(len(rows) for rows in slices.values()) == len(df)
+
+
+@pytest.mark.parametrize("dtype", [object, "category"])
+def test_city_slices_leave_out_rows_without_a_city(dtype):
+    df = pd.DataFrame({"city": pd.Series(["a", None, "b", "a"], dtype=dtype), "temperature": [1.0, 2.0, 3.0, 4.0]})
+
+    slices = list(city_slices(df))
+
+    assert [city for city, _ in slices] == ["a", "b"]
+    assert slices[0][1]["temperature"].tolist() == [1.0, 4.0]
+
+
+def test_compute_metric_trends_shares_one_pass_across_metrics():
+    df = _history()
+    rng = np.random.default_rng(3)
+    df["pressure"] = pd.array(rng.integers(980, 1040, len(df)), dtype="Int16")
+    df.loc[::5, "pressure"] = pd.NA
+
+    trends = compute_metric_trends(df, ["temperature", "pressure"])
+
+    overall, daily = trends["temperature"]
+    expected_overall, expected_daily = compute_trends(df)
+    pd.testing.assert_frame_equal(overall, expected_overall)
+    pd.testing.assert_frame_equal(daily, expected_daily)
+
+    reference = df.assign(date=df["fetched_at"].dt.normalize(), pressure=df["pressure"].astype("float64"))
+    expected = reference.groupby(["city", "date"])["pressure"].agg(["min", "max", "mean"]).reset_index()
+    pd.testing.assert_frame_equal(trends["pressure"][1], expected.astype({"city": object}), check_dtype=False)
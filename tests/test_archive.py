@@ -0,0 +1,84 @@
+import gzip
+import zlib
+from datetime import date, datetime, timedelta, timezone
+
+from weather_analyzer.archive import RawArchive, archive_files, archive_path, iter_archive
+
+
+class Clock:
+    def __init__(self, start: datetime):
+        self.now = start
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def test_archive_appends_runs_and_rotates_by_day(tmp_path):
+    clock = Clock(datetime(2024, 3, 1, 23, 50, tzinfo=timezone.utc))
+
+    with RawArchive(tmp_path, clock=clock) as archive:
+        archive.write("Oslo", {"name": "Oslo", "main": {"temp": -2.0}})
+        clock.now += timedelta(minutes=20)  # crosses midnight mid-run
+        archive.write("Paris", {"name": "Paris", "main": {"temp": 9.5}})
+
+    # A second run appends another gzip member to the same day file
+    with RawArchive(tmp_path, clock=clock) as archive:
+        archive.write("Köln", {"name": "Köln", "main": {"temp": 4.0}})
+
+    assert archive_files(tmp_path) == [
+        archive_path(tmp_path, date(2024, 3, 1)),
+        archive_path(tmp_path, date(2024, 3, 2)),
+    ]
+    entries = list(iter_archive(tmp_path))
+    assert [e["city"] for e in entries] == ["Oslo", "Paris", "Köln"]
+    assert entries[1]["fetched_at"] == "2024-03-02T00:10:00+00:00"
+    assert entries[2]["data"] == {"name": "Köln", "main": {"temp": 4.0}}
+    assert [e["city"] for e in iter_archive(tmp_path, start=date(2024, 3, 2))] == ["Paris", "Köln"]
+
+
+def test_concurrent_writer_gets_its_own_part_file(tmp_path):
+    clock = Clock(datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc))
+
+    with RawArchive(tmp_path, clock=clock) as first, RawArchive(tmp_path, clock=clock) as second:
+        first.write("Oslo", {"name": "Oslo"})
+        second.write("Paris", {"name": "Paris"})
+        assert first.path != second.path
+
+    assert len(archive_files(tmp_path)) == 2
+    assert sorted(e["city"] for e in iter_archive(tmp_path)) == ["Oslo", "Paris"]
+
+
+def test_reader_keeps_entries_before_a_truncated_tail(tmp_path):
+    path = archive_path(tmp_path, date(2024, 3, 1))
+    with gzip.open(path, "wb") as f:
+        f.write(b'{"city": "Oslo", "data": {}}\n{"city": "Paris", "data": {}}\n')
+    complete = path.read_bytes()
+    with gzip.open(path, "ab") as f:
+        f.write(b'{"city": "Rome", "data": {}}\n')
+    path.write_bytes(path.read_bytes()[: len(complete) + 15])  # interrupted append
+
+    assert [e["city"] for e in iter_archive(tmp_path)] == ["Oslo", "Paris"]
+
+
+def test_run_after_a_killed_writer_stays_readable(tmp_path):
+    clock = Clock(datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc))
+
+    with RawArchive(tmp_path, clock=clock) as archive:
+        for city in ("Oslo", "Paris", "Rome"):
+            archive.write(city, {"name": city})
+
+    # Killed mid-run: its member never gets its trailer
+    killed = RawArchive(tmp_path, clock=clock)
+    for city in ("Lima", "Quito"):
+        killed.write(city, {"name": city})
+    killed._file.write(killed._compressor.flush(zlib.Z_SYNC_FLUSH))
+    killed._file.close()
+
+    with RawArchive(tmp_path, clock=clock) as archive:
+        for city in ("Bern", "Kyiv", "Riga"):
+            archive.write(city, {"name": city})
+        assert archive.path == archive_path(tmp_path, date(2024, 3, 1), part="1")
+
+    cities = [e["city"] for e in iter_archive(tmp_path)]
+    assert cities[:3] == ["Oslo", "Paris", "Rome"]
+    assert cities[-3:] == ["Bern", "Kyiv", "Riga"]
@@ -0,0 +1,137 @@
+import asyncio
+
+from weather_analyzer.async_pipeline import AsyncPipeline, AsyncWeatherFetcher
+from weather_analyzer.http_client import RetryPolicy
+from weather_analyzer.records import ObservationCache
+
+
+def payload(city: str, dt: int = 1_700_000_000) -> dict:
+    return {"name": city, "dt": dt, "main": {"temp": 5.0, "humidity": 50}}
+
+
+def test_rows_are_written_while_slow_cities_are_still_fetching():
+    events = []
+
+    async def fetch(city):
+        # City-0 is the straggler; the rest answer at once
+        await asyncio.sleep(0.2 if city == "City-0" else 0)
+        events.append(("fetched", city))
+        return None if city == "City-3" else payload(city)
+
+    async def write(batch):
+        events.append(("written", list(batch.city)))
+        return len(batch)
+
+    pipeline = AsyncPipeline(fetch, write, concurrency=2, batch_rows=2, batch_ms=10, queue_size=2, writers=1)
+    stats = asyncio.run(pipeline.run([f"City-{i}" for i in range(6)]))
+
+    written = [cities for kind, cities in events if kind == "written"]
+    assert sorted(sum(written, [])) == ["City-0", "City-1", "City-2", "City-4", "City-5"]
+    assert all(len(cities) <= 2 for cities in written)
+    assert events.index(("fetched", "City-0")) > events.index(("written", written[0]))
+    assert stats["fetched"] == 5 and stats["failed"] == 1 and stats["inserted"] == 5
+    assert stats["max_queued"] <= 2
+    assert 0 < stats["first_row_seconds"] < stats["seconds"]
+
+
+def test_failed_batches_are_counted_and_only_stored_observations_remembered():
+    observations = ObservationCache()
+    calls = []
+
+    async def fetch(city):
+        return payload(city)
+
+    async def write(batch):
+        calls.append(list(batch.city))
+        if len(calls) == 1:
+            raise RuntimeError("database down")
+        return len(batch)
+
+    def run():
+        pipeline = AsyncPipeline(fetch, write, concurrency=1, batch_rows=1, writers=1, observations=observations)
+        return asyncio.run(pipeline.run(["Oslo", "Rome"]))
+
+    first = run()
+    assert first["unsaved"] == 1 and first["inserted"] == 1
+
+    # Rome was stored and is skipped as unchanged; Oslo's failed write is retried
+    second = run()
+    assert calls[2:] == [["Oslo"]]
+    assert second["skipped"] == 1 and second["inserted"] == 1
+
+
+class _Response:
+    def __init__(self, status, body, headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return self.body
+
+
+class _Session:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def get(self, url, params=None, headers=None):
+        return self.responses.pop(0)
+
+
+def test_async_fetcher_retries_transient_errors_only(monkeypatch):
+    async def no_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+    session = _Session([
+        _Response(503, b"busy"),
+        _Response(200, b'{"name": "Oslo", "main": {"temp": 1.0}}'),
+        _Response(404, b"city not found"),
+    ])
+    fetcher = AsyncWeatherFetcher(session, retry_policy=RetryPolicy(attempts=3, backoff_factor=0))
+
+    assert asyncio.run(fetcher.fetch("Oslo")) == {"name": "Oslo", "main": {"temp": 1.0}}
+    assert asyncio.run(fetcher.fetch("Atlantis")) is None
+    assert fetcher.stats["retried"] == 1 and fetcher.stats["dropped"] == 1
+    assert fetcher.stats["server_errors"] == 1
+
+
+def test_cache_and_archive_calls_run_off_the_event_loop():
+    import threading
+
+    threads = {}
+
+    class _Cache:
+        def get(self, city):
+            threads["cache.get"] = threading.get_ident()
+            return None
+
+        def revalidation_headers(self, city):
+            return None
+
+        def put(self, city, data, headers):
+            threads["cache.put"] = threading.get_ident()
+
+    def archive(city, data):
+        threads["archive"] = threading.get_ident()
+
+    async def write(batch):
+        return len(batch)
+
+    async def run():
+        threads["loop"] = threading.get_ident()
+        session = _Session([_Response(200, b'{"name": "Oslo", "main": {"temp": 1.0}}')])
+        fetcher = AsyncWeatherFetcher(session, retry_policy=RetryPolicy(attempts=1), cache=_Cache())
+        pipeline = AsyncPipeline(fetcher.fetch, write, concurrency=1, writers=1, on_payload=archive)
+        return await pipeline.run(["Oslo"])
+
+    assert asyncio.run(run())["inserted"] == 1
+    loop = threads.pop("loop")
+    assert set(threads) == {"cache.get", "cache.put", "archive"}
+    assert loop not in threads.values()
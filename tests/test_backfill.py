@@ -0,0 +1,109 @@
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from weather_analyzer.archive import RawArchive
+from weather_analyzer.backfill import backfill_archive, parse_raw_file
+
+
+def _payload(city: str, dt: int | None, temp: float = 5.0) -> dict:
+    payload = {"name": city, "main": {"temp": temp, "humidity": 70}}
+    if dt is not None:
+        payload["dt"] = dt
+    return payload
+
+
+@pytest.fixture
+def raw_folder(tmp_path):
+    folder = tmp_path / "raw"
+    folder.mkdir()
+    # Legacy pretty-printed snapshot; Paris has no dt and falls back to the file time
+    with open(folder / "raw_weather_20240301_120500.json", "w", encoding="utf-8") as f:
+        json.dump([_payload("Oslo", 1709294400), _payload("Paris", None), {"cod": "404"}], f, indent=4)
+
+    clock = lambda: datetime(2024, 3, 2, 9, 0, 30, tzinfo=timezone.utc)  # noqa: E731
+    with RawArchive(folder, clock=clock) as archive:
+        archive.write("Oslo", _payload("Oslo", 1709370000))
+        archive.write("Rome", _payload("Rome", None))
+    return folder
+
+
+@pytest.fixture
+def local_zone(monkeypatch):
+    # Legacy snapshot names are local wall-clock time; pin the zone they are read in
+    monkeypatch.setenv("TZ", "Europe/Oslo")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_parse_uses_observation_time(raw_folder, local_zone):
+    legacy, skipped = parse_raw_file(raw_folder / "raw_weather_20240301_120500.json")
+
+    assert skipped == 1
+    assert [(r.city, r.fetched_at) for r in legacy] == [
+        ("Oslo", datetime(2024, 3, 1, 12, 0)),      # payload dt
+        ("Paris", datetime(2024, 3, 1, 11, 5)),     # snapshot time, 12:05 CET as naive UTC
+    ]
+
+    archived, _ = parse_raw_file(raw_folder / "raw_weather_2024-03-02.ndjson.gz")
+    assert [(r.city, r.fetched_at) for r in archived] == [
+        ("Oslo", datetime(2024, 3, 2, 9, 0)),
+        ("Rome", datetime(2024, 3, 2, 9, 0, 30)),   # archive time, naive UTC
+    ]
+
+
+def test_backfill_resumes_from_checkpoint(raw_folder, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    loaded = []
+
+    def failing_insert(records, strict=False):
+        if loaded:
+            raise RuntimeError("Weather records not inserted")
+        loaded.append(list(records))
+        return len(records)
+
+    # batch_rows=1: one commit per file; the second commit fails
+    with pytest.raises(RuntimeError):
+        backfill_archive(raw_folder, batch_rows=1, workers=1, checkpoint_path=checkpoint, insert=failing_insert)
+    assert [r.city for r in loaded[0]] == ["Oslo", "Paris"]
+
+    resumed = []
+
+    def insert(records, strict=False):
+        resumed.append([r.city for r in records])
+        return len(records)
+
+    stats = backfill_archive(raw_folder, batch_rows=1, workers=1, checkpoint_path=checkpoint, insert=insert)
+    assert resumed == [["Oslo", "Rome"]]
+    assert stats == {"files": 2, "loaded_files": 1, "records": 2, "inserted": 2, "malformed": 0}
+
+    assert backfill_archive(raw_folder, workers=1, checkpoint_path=checkpoint, insert=insert)["loaded_files"] == 0
+
+
+def test_backfill_parses_in_worker_processes(raw_folder, tmp_path):
+    batches = []
+    stats = backfill_archive(
+        raw_folder, workers=2, checkpoint_path=tmp_path / "checkpoint.json",
+        insert=lambda records, strict=False: batches.append(list(records)) or len(records),
+    )
+
+    assert stats["records"] == 4 and stats["malformed"] == 1
+    assert sorted(r.city for batch in batches for r in batch) == ["Oslo", "Oslo", "Paris", "Rome"]
+
+
+def test_unreadable_legacy_file_is_skipped_not_fatal(raw_folder, tmp_path):
+    with open(raw_folder / "raw_weather_20240301_130000.json", "w", encoding="utf-8") as f:
+        f.write('[{"name": "Oslo", "main": {"te')  # interrupted write
+
+    batches = []
+    stats = backfill_archive(
+        raw_folder, workers=1, checkpoint_path=tmp_path / "checkpoint.json",
+        insert=lambda records, strict=False: batches.append(list(records)) or len(records),
+    )
+
+    assert stats["files"] == stats["loaded_files"] == 3
+    assert stats["records"] == 4 and stats["malformed"] == 2
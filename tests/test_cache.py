@@ -0,0 +1,75 @@
+from weather_analyzer.cache import DiskCache, MemoryCache, WeatherCache
+from weather_analyzer.config.settings import settings
+
+
+class _Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _payload(dt):
+    return {"name": "Stockholm", "dt": dt, "main": {"temp": 6.5, "humidity": 80}}
+
+
+def test_entry_stays_fresh_until_next_observation(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_TTL_SECONDS", 600)
+    monkeypatch.setattr(settings, "CACHE_MIN_TTL_SECONDS", 60)
+    monkeypatch.setattr(settings, "OBSERVATION_REFRESH_SECONDS", 600)
+    clock = _Clock()
+    cache = WeatherCache(MemoryCache(10), clock=clock)
+
+    # Observed 400s ago: the provider refreshes in ~200s
+    cache.put("Stockholm", _payload(clock.now - 400))
+
+    clock.now += 150
+    assert cache.get("stockholm") is not None
+    clock.now += 100
+    assert cache.get("Stockholm") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "revalidated": 0}
+
+
+def test_stale_observation_still_cached_for_min_ttl(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_MIN_TTL_SECONDS", 60)
+    clock = _Clock()
+    cache = WeatherCache(MemoryCache(10), clock=clock)
+
+    cache.put("Stockholm", _payload(clock.now - 3600))
+
+    clock.now += 59
+    assert cache.get("Stockholm") is not None
+    clock.now += 2
+    assert cache.get("Stockholm") is None
+
+
+def test_memory_cache_evicts_least_recently_used():
+    clock = _Clock()
+    cache = WeatherCache(MemoryCache(2), clock=clock)
+    cache.put("A", _payload(clock.now))
+    cache.put("B", _payload(clock.now))
+    cache.get("A")
+    cache.put("C", _payload(clock.now))
+
+    assert cache.get("B") is None
+    assert cache.get("A") is not None
+    assert cache.get("C") is not None
+
+
+def test_disk_cache_persists_and_evicts(tmp_path):
+    clock = _Clock()
+    path = tmp_path / "cache.sqlite3"
+    cache = WeatherCache(DiskCache(path, max_entries=2, clock=clock), clock=clock)
+    cache.put("A", _payload(clock.now))
+    clock.now += 1
+    cache.put("B", _payload(clock.now))
+    clock.now += 1
+    cache.get("A")
+    clock.now += 1
+    cache.put("C", _payload(clock.now))
+
+    reopened = WeatherCache(DiskCache(path, max_entries=2, clock=clock), clock=clock)
+    assert reopened.get("B") is None
+    assert reopened.get("A")["name"] == "Stockholm"
+    assert reopened.get("C") is not None
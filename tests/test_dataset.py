@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from weather_analyzer import dataset
+from weather_analyzer.db import history
+
+
+def _history() -> pd.DataFrame:
+    return pd.DataFrame({
+        "city": pd.Categorical(["Oslo", "Paris", "Oslo", "Paris", "Oslo"]),
+        "temperature": pd.array([1.5, 9.0, 2.5, 10.0, -1.0], dtype="float32"),
+        "humidity": pd.array([80, None, 75, 60, 90], dtype="Int8"),
+        "fetched_at": pd.to_datetime([
+            "2024-03-01 10:00", "2024-03-01 23:50", "2024-03-02 00:10", "2024-03-02 12:00", "2024-03-03 08:00",
+        ]),
+    })
+
+
+@pytest.fixture
+def exported(tmp_path, monkeypatch):
+    frame = _history()
+    requests = []
+
+    def iter_history(start=None, end=None, conn=None, **kwargs):
+        requests.append((start, end))
+        rows = frame
+        if start is not None:
+            rows = rows[rows["fetched_at"] >= start]
+        if end is not None:
+            rows = rows[rows["fetched_at"] < end]
+        # Two chunks, the first one ending mid-day
+        yield rows.iloc[:2].reset_index(drop=True)
+        yield rows.iloc[2:].reset_index(drop=True)
+
+    monkeypatch.setattr(history, "iter_history", iter_history)
+    written = dataset.export_history(root=tmp_path)
+    return tmp_path, written, requests, iter_history
+
+
+def test_export_writes_one_partition_per_day(exported):
+    root, written, _, _ = exported
+
+    assert written == {"days": 3, "rows": 5}
+    assert [d.isoformat() for d in dataset.partitions(root)] == ["2024-03-01", "2024-03-02", "2024-03-03"]
+
+    import pyarrow.parquet as pq
+    meta = pq.ParquetFile(dataset.partition_path(root, dataset.partitions(root)[0])).metadata
+    column = meta.row_group(0).column(0)
+    assert column.path_in_schema == "city"
+    assert "RLE_DICTIONARY" in column.encodings
+    assert column.compression == "ZSTD"
+
+
+def test_export_resumes_at_newest_day(exported):
+    root, _, requests, _ = exported
+
+    assert dataset.export_history(root=root) == {"days": 1, "rows": 1}
+    assert requests[-1] == (pd.Timestamp("2024-03-03").to_pydatetime(), None)
+
+
+def test_read_dataset_matches_history_dtypes_and_filters(exported):
+    root, _, _, _ = exported
+
+    df = dataset.read_dataset(root)
+    expected = _history()
+    assert df["city"].tolist() == expected["city"].tolist()
+    assert df["humidity"].tolist() == expected["humidity"].tolist()
+    assert df.dtypes.astype(str).to_dict() == {
+        "city": "category", "temperature": "float32", "humidity": "Int8",
+        "pressure": "Int16", "wind_speed": "float32", "wind_deg": "Int16", "clouds": "Int8",
+        "rain_1h": "float32", "snow_1h": "float32", "fetched_at": "datetime64[ns]",
+    }
+    # Files exported before a metric was stored read it as missing
+    assert df["pressure"].isna().all() and df["wind_speed"].isna().all()
+
+    pruned = dataset.read_dataset(
+        root, cities=["Oslo"], start="2024-03-02", end="2024-03-03 09:00", columns=["city", "fetched_at"],
+    )
+    assert list(pruned.columns) == ["city", "fetched_at"]
+    assert pruned["fetched_at"].tolist() == pd.to_datetime(["2024-03-02 00:10", "2024-03-03 08:00"]).tolist()
+
+    since = dataset.read_dataset(root, since="2024-03-02 00:10")
+    assert len(since) == 2
+
+
+def test_load_history_dispatches_on_source(exported, monkeypatch):
+    root, _, _, _ = exported
+    monkeypatch.setattr(dataset.settings, "PARQUET_ROOT", str(root))
+
+    assert len(dataset.load_history(source="parquet")) == 5
+    with pytest.raises(ValueError):
+        dataset.load_history(source="csv")
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from weather_analyzer.db.pool import ConnectionPool, PoolTimeout
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        if self.conn.broken:
+            raise RuntimeError("server closed the connection")
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.commits = 0
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        if self.broken:
+            raise RuntimeError("server closed the connection")
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_reuses_connections_and_counts_metrics():
+    pool = ConnectionPool(connect=_FakeConnection, max_size=2, min_size=0, timeout=1, health_check_after=60)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert pool.metrics()["in_use"] == 1
+
+    assert first is second
+    assert first.commits == 2
+    metrics = pool.metrics()
+    assert (metrics["created"], metrics["checkouts"], metrics["in_use"], metrics["idle"]) == (1, 2, 0, 1)
+
+
+def test_pool_blocks_until_a_connection_is_returned():
+    pool = ConnectionPool(connect=_FakeConnection, max_size=1, min_size=0, timeout=2, health_check_after=60)
+    conn = pool.getconn()
+
+    threading.Timer(0.1, pool.putconn, args=(conn,)).start()
+    assert pool.getconn() is conn
+    assert pool.metrics()["wait_time_max"] >= 0.05
+
+
+def test_pool_times_out_when_exhausted():
+    pool = ConnectionPool(connect=_FakeConnection, max_size=1, min_size=0, timeout=0.05)
+    pool.getconn()
+
+    start = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    assert time.monotonic() - start >= 0.05
+
+
+def test_pool_replaces_broken_idle_connection():
+    pool = ConnectionPool(connect=_FakeConnection, max_size=1, min_size=0, timeout=1, health_check_after=0)
+    with pool.connection() as conn:
+        pass
+    conn.broken = True
+
+    with pool.connection() as replacement:
+        assert replacement is not conn
+
+    assert conn.closed
+    assert pool.metrics()["created"] == 2
+    assert pool.metrics()["size"] == 1
+
+
+def test_slow_connect_does_not_block_other_pool_calls():
+    connecting = threading.Event()
+    release = threading.Event()
+
+    def slow_connect():
+        connecting.set()
+        release.wait(2)
+        return _FakeConnection()
+
+    pool = ConnectionPool(connect=slow_connect, max_size=2, min_size=0, timeout=1)
+    threading.Thread(target=pool.getconn, daemon=True).start()
+    assert connecting.wait(1)
+
+    # metrics() and returning a connection must not wait for the handshake
+    start = time.monotonic()
+    pool.metrics()
+    pool.putconn(_FakeConnection())
+    assert time.monotonic() - start < 0.5
+    release.set()
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from weather_analyzer.fetch_engine import FetchEngine
+from weather_analyzer.http_client import RetryPolicy
+
+
+def test_fetch_engine_keeps_input_order():
+    def fetch_once(city):
+        # Later cities finish first
+        time.sleep(0.01 * (3 - len(city) % 3))
+        return {"name": city}
+
+    cities = ["Stockholm", "London", "New York", "Paris", "Oslo"]
+    results = FetchEngine(fetch_once, concurrency=3).run(cities)
+
+    assert [r["name"] for r in results] == cities
+
+
+def test_fetch_engine_retries_without_blocking_other_cities():
+    calls = {}
+    finished = []
+    lock = threading.Lock()
+
+    def fetch_once(city):
+        with lock:
+            calls[city] = calls.get(city, 0) + 1
+            attempt = calls[city]
+        if city == "Flaky" and attempt == 1:
+            raise RuntimeError("HTTP 500")
+        with lock:
+            finished.append(city)
+        return {"name": city}
+
+    engine = FetchEngine(fetch_once, concurrency=1, retry_policy=RetryPolicy(attempts=3, backoff_factor=0.025))
+    results = engine.run(["Flaky", "London", "Oslo"])
+
+    assert [r["name"] for r in results] == ["Flaky", "London", "Oslo"]
+    assert calls["Flaky"] == 2
+    # The retry waited out its backoff while the other cities went ahead
+    assert finished == ["London", "Oslo", "Flaky"]
+
+
+def test_fetch_engine_returns_none_after_all_retries_fail():
+    def fetch_once(city):
+        raise RuntimeError("boom")
+
+    engine = FetchEngine(fetch_once, concurrency=2, retry_policy=RetryPolicy(attempts=2, backoff_factor=0))
+
+    assert engine.run(["Stockholm", "London"]) == [None, None]
+
+
+def test_fetch_engine_streams_results_as_they_complete():
+    streamed = []
+
+    def fetch_once(city):
+        if city == "Broken":
+            raise ValueError("Malformed API response")
+        time.sleep(0.03 if city == "Slow" else 0)
+        return {"name": city}
+
+    def on_result(city, data):
+        streamed.append(city)
+        if city == "Oslo":
+            raise OSError("disk full")  # a failing consumer does not stop the run
+
+    engine = FetchEngine(fetch_once, concurrency=3, retry_policy=RetryPolicy(attempts=1))
+    results = engine.run(["Slow", "Oslo", "Broken", "Paris"], on_result=on_result)
+
+    assert [r and r["name"] for r in results] == ["Slow", "Oslo", None, "Paris"]
+    assert sorted(streamed) == ["Oslo", "Paris", "Slow"]
+    assert streamed[-1] == "Slow"
+
+
+def test_fetch_weather_many_streams_payloads_to_on_result(monkeypatch):
+    from weather_analyzer import fetch_weather
+
+    monkeypatch.setattr(fetch_weather, "fetch_weather_once", lambda city: {"name": city})
+    seen = []
+
+    results = fetch_weather.fetch_weather_many(["Oslo", "Rome"], concurrency=2, on_result=lambda city, data: seen.append(city))
+
+    assert [r["name"] for r in results] == ["Oslo", "Rome"]
+    assert sorted(seen) == ["Oslo", "Rome"]
+
+
+def test_single_mode_fetch_passes_each_payload_to_the_callback(monkeypatch):
+    from benchmarks.stub_api import StubWeatherServer
+    from weather_analyzer import main
+
+    cities = ["Oslo", "Rome", "Lima"]
+    seen = {}
+    with StubWeatherServer(latency=0.01) as server:
+        monkeypatch.setattr(main.settings, "WEATHER_API_URL", f"{server.base_url}/weather")
+        results = main.fetch_raw_weather(cities, concurrency=2, fetch_mode="single",
+                                         on_result=lambda city, data: seen.setdefault(city, data))
+
+    assert [r["name"] for r in results] == cities
+    assert seen == {r["name"]: r for r in results}
+    assert server.requests == len(cities)
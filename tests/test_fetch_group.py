@@ -0,0 +1,46 @@
+from weather_analyzer import fetch_group
+from weather_analyzer.config.settings import settings
+from weather_analyzer.fetch_group import CityIdCache, fetch_weather_grouped
+
+
+class _FakeClient:
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.calls = []
+
+    def get_json(self, url, params, validate=None):
+        ids = [int(i) for i in params["id"].split(",")]
+        self.calls.append(ids)
+        return {"cnt": len(ids), "list": [self.payloads[i] for i in ids if i in self.payloads]}, "timing"
+
+
+def _payload(city_id, name):
+    return {"id": city_id, "name": name, "main": {"temp": 1.0, "humidity": 50}}
+
+
+def test_city_id_cache_roundtrip(tmp_path):
+    path = tmp_path / "city_ids.json"
+    cache = CityIdCache(path)
+    cache.set("New York", 5128581)
+    cache.save()
+
+    assert CityIdCache(path).get("  new york ") == 5128581
+
+
+def test_grouped_fetch_splits_chunks_back_per_city(tmp_path, monkeypatch):
+    path = tmp_path / "city_ids.json"
+    cache = CityIdCache(path)
+    for city_id, city in enumerate(["A", "B", "C", "D", "E"], start=1):
+        cache.set(city, city_id)
+    cache.save()
+
+    # "D" (id 4) is missing from the API response
+    client = _FakeClient({i: _payload(i, name) for i, name in [(1, "A"), (2, "B"), (3, "C"), (5, "E")]})
+    monkeypatch.setattr(fetch_group, "get_client", lambda: client)
+    monkeypatch.setattr(settings, "CITY_ID_CACHE_PATH", str(path))
+    monkeypatch.setattr(settings, "GROUP_CHUNK_SIZE", 2)
+
+    results = fetch_weather_grouped(["E", "D", "C", "B", "A"], concurrency=1)
+
+    assert [r["name"] if r else None for r in results] == ["E", None, "C", "B", "A"]
+    assert sorted(map(sorted, client.calls)) == [[1], [2, 3], [4, 5]]
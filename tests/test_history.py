@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from weather_analyzer.db.history import iter_history
+
+
+class _Cursor:
+    def __init__(self, conn, name):
+        self.conn = conn
+        self.name = name
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def execute(self, statement, params=None):
+        pass
+
+    def fetchall(self):
+        return [("city",), ("temperature",), ("fetched_at",)]
+
+    def fetchmany(self, size):
+        return [("Oslo", 1.0, datetime(2024, 1, 1))] * size
+
+    def close(self):
+        self.closed = True
+
+
+class _Connection:
+    def __init__(self):
+        self.cursors = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, name=None):
+        self.cursors.append(_Cursor(self, name))
+        return self.cursors[-1]
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_stopping_early_closes_the_cursor_and_ends_the_transaction():
+    conn = _Connection()
+    chunks = iter_history(columns=["city", "temperature", "fetched_at"], chunk_size=2, conn=conn)
+
+    assert len(next(chunks)) == 2
+    chunks.close()
+
+    named = [cur for cur in conn.cursors if cur.name]
+    assert named and all(cur.closed for cur in named)
+    assert (conn.rollbacks, conn.commits) == (1, 0)
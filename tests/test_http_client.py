@@ -0,0 +1,117 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from weather_analyzer.http_client import HttpStatusError, RetryPolicy, WeatherHttpClient
+from weather_analyzer.rate_limit import AdaptiveConcurrency, TokenBucket
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"name": "Stockholm", "main": {"temp": 6.5}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThrottlingHandler(_Handler):
+    """429 with Retry-After on the first request, 200 afterwards."""
+
+    calls = 0
+
+    def do_GET(self):
+        type(self).calls += 1
+        if type(self).calls == 1:
+            body = b'{"cod": 429, "message": "rate limit"}'
+            self.send_response(429)
+            self.send_header("Retry-After", "2")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            super().do_GET()
+
+
+def _serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/weather"
+
+
+def test_retry_policy_matches_legacy_backoff():
+    policy = RetryPolicy(attempts=3)
+
+    assert [policy.delay(a) for a in (1, 2)] == [2, 4]
+    assert policy.should_retry(2)
+    assert not policy.should_retry(3)
+
+
+def test_client_reuses_keepalive_connection():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/weather"
+
+    try:
+        client = WeatherHttpClient(keepalive=True)
+        timings = [client.get_json(url, {"q": "Stockholm"})[1] for _ in range(3)]
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert not timings[0].reused
+    assert all(t.reused for t in timings[1:])
+    assert client.stats() == {
+        "requests": 3,
+        "connects": 1,
+        "connect_time": timings[0].connect,
+        "transfer_time": sum(t.transfer for t in timings),
+        "throttled": 0,
+        "server_errors": 0,
+        "retried": 0,
+        "dropped": 0,
+        "throttle_wait": 0.0,
+    }
+
+
+def test_retry_policy_honours_retry_after_and_skips_client_errors():
+    policy = RetryPolicy(attempts=3)
+
+    assert policy.delay(1, HttpStatusError(429, "slow down", retry_after=30)) == 30
+    assert policy.delay(2, HttpStatusError(503, "busy", retry_after=1)) == 4
+    assert policy.should_retry(1, HttpStatusError(429, "slow down"))
+    assert policy.should_retry(1, HttpStatusError(502, "bad gateway"))
+    assert not policy.should_retry(1, HttpStatusError(401, "invalid key"))
+    assert not policy.should_retry(1, HttpStatusError(404, "city not found"))
+
+
+def test_429_pauses_shared_quota_and_shrinks_concurrency():
+    _ThrottlingHandler.calls = 0
+    server, url = _serve(_ThrottlingHandler)
+    sleeps = []
+    now = [0.0]
+    bucket = TokenBucket(600, burst=5, clock=lambda: now[0], sleep=lambda s: (sleeps.append(s), now.__setitem__(0, now[0] + s)))
+    limiter = AdaptiveConcurrency(maximum=8)
+
+    try:
+        client = WeatherHttpClient(rate_limiter=bucket, concurrency=limiter, retry_policy=RetryPolicy(attempts=3, backoff_factor=0))
+        client.call_with_retries(lambda: client.get_json(url, {"q": "Stockholm"}), "Stockholm")
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    stats = client.stats()
+    assert _ThrottlingHandler.calls == 2
+    assert stats["throttled"] == 1 and stats["retried"] == 1 and stats["dropped"] == 0
+    # The Retry-After pause is applied to the bucket shared by every caller
+    assert sleeps == pytest.approx([2.0, 0.1])  # Retry-After, then one refill interval
+    assert limiter.limit == 4
@@ -0,0 +1,92 @@
+import pandas as pd
+import pytest
+
+from weather_analyzer.analytics.incremental import IncrementalTrends
+from weather_analyzer.plotting.plot_trends_postgres import compute_trends
+
+
+def _history():
+    rows = []
+    for hour in range(0, 72, 3):
+        for i, city in enumerate(["Stockholm", "London", "New York"]):
+            rows.append({
+                "city": city,
+                "temperature": (hour * 7 + i * 13) % 25 - 5.0,
+                "humidity": 50,
+                "fetched_at": pd.Timestamp("2024-03-01") + pd.Timedelta(hours=hour),
+            })
+    return pd.DataFrame(rows)
+
+
+def _fetch_from(history):
+    def fetch(start=None):
+        if start is None:
+            return history.copy()
+        return history[history["fetched_at"] >= start].copy()
+    return fetch
+
+
+def test_incremental_matches_full_recompute(tmp_path):
+    history = _history()
+    state = tmp_path / "state.sqlite3"
+
+    # Two runs over growing history, the second with a fresh process (reloaded state)
+    first_half = history[history["fetched_at"] < pd.Timestamp("2024-03-02 12:00")]
+    IncrementalTrends(state).update(_fetch_from(first_half))
+    overall, daily = IncrementalTrends(state).update(_fetch_from(history))
+
+    expected_overall, expected_daily = compute_trends(history.copy())
+
+    pd.testing.assert_frame_equal(overall, expected_overall, check_dtype=False)
+    pd.testing.assert_frame_equal(daily, expected_daily, check_dtype=False)
+
+
+def test_incremental_rereads_only_the_lookback_window(tmp_path):
+    history = _history()
+    trends = IncrementalTrends(tmp_path / "state.sqlite3", lookback_days=1)
+    trends.update(_fetch_from(history))
+
+    seen = []
+
+    def fetch(start=None):
+        seen.append(start)
+        return history.iloc[0:0]
+
+    overall, _ = trends.update(fetch)
+
+    # Watermark 2024-03-03 21:00 → whole days from 2024-03-02
+    assert seen == [pd.Timestamp("2024-03-02")]
+    assert overall["min"].tolist() == pytest.approx(compute_trends(history.copy())[0]["min"].tolist())
+
+
+def test_rows_committed_behind_the_watermark_are_counted(tmp_path):
+    history = _history()
+    # A slower writer's row for an earlier hour commits after the newest row was read
+    late = pd.DataFrame([{
+        "city": "London", "temperature": 40.0, "humidity": 50,
+        "fetched_at": history["fetched_at"].max() - pd.Timedelta(hours=5),
+    }])
+    state = tmp_path / "state.sqlite3"
+
+    IncrementalTrends(state).update(_fetch_from(history))
+    overall, daily = IncrementalTrends(state).update(_fetch_from(pd.concat([history, late], ignore_index=True)))
+
+    expected_overall, expected_daily = compute_trends(pd.concat([history, late], ignore_index=True))
+    pd.testing.assert_frame_equal(overall, expected_overall, check_dtype=False)
+    pd.testing.assert_frame_equal(daily, expected_daily, check_dtype=False)
+
+
+def test_only_changed_days_are_written(tmp_path):
+    import sqlite3
+
+    history = _history()
+    state = tmp_path / "state.sqlite3"
+    IncrementalTrends(state).update(_fetch_from(history))
+
+    with sqlite3.connect(state) as db:
+        db.execute("UPDATE daily SET count = -1 WHERE date < '2024-03-02'")  # outside the window
+
+    IncrementalTrends(state).update(_fetch_from(history))
+
+    with sqlite3.connect(state) as db:
+        assert db.execute("SELECT count(*) FROM daily WHERE count = -1").fetchone()[0] == 3
@@ -0,0 +1,131 @@
+import csv
+import io
+import os
+from datetime import datetime
+
+import pytest
+
+from weather_analyzer.db.insert_weather import (
+    _CsvRecordStream,
+    bulk_insert_weather_records,
+    insert_weather_records,
+    record_values,
+    values_template,
+)
+from weather_analyzer.records import WeatherBatch
+
+
+def test_csv_record_stream_formats_rows_for_copy():
+    records = [
+        {"city": "New York, NY", "temperature": 6.5, "humidity": None,
+         "fetched_at": datetime(2024, 1, 1, 12, 0)},
+        {"city": "Stockholm", "temperature": -3.0, "humidity": 80,
+         "fetched_at": datetime(2024, 1, 1, 12, 0)},
+    ]
+    stream = _CsvRecordStream(records, ("temperature", "humidity"))
+
+    chunks = []
+    while chunk := stream.read(7):
+        chunks.append(chunk)
+
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows == [
+        ["New York, NY", "6.5", "", "", "2024-01-01 12:00:00"],
+        ["Stockholm", "-3.0", "80", "", "2024-01-01 12:00:00"],
+    ]
+
+
+def test_record_values_follow_the_stored_metric_set():
+    record = {"city": "Oslo", "temperature": 1.0, "humidity": 70, "wind_speed": 3.5,
+              "fetched_at": datetime(2024, 1, 1, 12, 0)}
+
+    assert list(record_values([record], ("temperature", "wind_speed", "clouds"))) == [
+        ("Oslo", 1.0, 3.5, None, None, datetime(2024, 1, 1, 12, 0)),
+    ]
+    assert values_template(("temperature", "wind_speed")) == (
+        "(%s, %s::double precision, %s::real, %s::timestamp, %s::timestamp)"
+    )
+
+
+# ----------------------
+# Integration: merge_statement against PostgreSQL
+# ----------------------
+TEST_DSN = os.environ.get("WEATHER_TEST_DSN")
+requires_postgres = pytest.mark.skipif(not TEST_DSN, reason="set WEATHER_TEST_DSN to run against PostgreSQL")
+
+OBSERVED = 1_709_294_400  # 2024-03-01 12:00 UTC
+
+
+@pytest.fixture
+def pg_conn(monkeypatch):
+    import psycopg2
+
+    from weather_analyzer.db import rollup, schema
+
+    monkeypatch.setattr(schema.settings, "OBSERVATION_DEDUP", True)
+    monkeypatch.setattr(schema.settings, "ROLLUP_ENABLED", True)
+    conn = psycopg2.connect(TEST_DSN, options="-c search_path=weather_insert_test")
+    with conn.cursor() as cur:
+        cur.execute("DROP SCHEMA IF EXISTS weather_insert_test CASCADE")
+        cur.execute("CREATE SCHEMA weather_insert_test")
+        schema.create_partitioned_table(cur)
+    conn.commit()
+    # Keys and rollup tables are created on first write, in the scratch schema
+    schema.forget_write_schema()
+    rollup.forget_rollup_table()
+    try:
+        yield conn
+    finally:
+        schema.forget_write_schema()
+        rollup.forget_rollup_table()
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute("DROP SCHEMA weather_insert_test CASCADE")
+        conn.commit()
+        conn.close()
+
+
+def _scalar(conn, statement):
+    with conn.cursor() as cur:
+        cur.execute(statement)
+        return cur.fetchone()[0]
+
+
+def _batch(dt, fetched_at):
+    payload = {"name": "Oslo", "main": {"temp": 1.5, "humidity": 70}}
+    if dt is not None:
+        payload["dt"] = dt
+    return WeatherBatch.from_payloads([payload], fetched_at=fetched_at)
+
+
+@requires_postgres
+@pytest.mark.parametrize("insert", [insert_weather_records, bulk_insert_weather_records])
+def test_an_observation_is_stored_once_across_fetches(pg_conn, insert):
+    first = _batch(OBSERVED, datetime(2024, 3, 1, 12, 5))
+    again = _batch(OBSERVED, datetime(2024, 3, 1, 12, 15))  # polled again, provider unchanged
+
+    assert insert(first, conn=pg_conn) == 1
+    assert insert(again, conn=pg_conn) == 0
+
+    assert _scalar(pg_conn, "SELECT count(*) FROM weather_summary") == 1
+    assert _scalar(pg_conn, "SELECT count(*) FROM weather_observation_keys") == 1
+    assert _scalar(pg_conn, "SELECT observed_at FROM weather_summary") == datetime(2024, 3, 1, 12, 0)
+    assert _scalar(pg_conn, "SELECT count FROM weather_daily_rollup WHERE city = 'Oslo'") == 1
+
+    # The same observation twice within one batch
+    payload = {"name": "Rome", "dt": OBSERVED, "main": {"temp": 9.0}}
+    repeated = WeatherBatch.from_payloads([payload, payload], fetched_at=[datetime(2024, 3, 1, 12, 5), datetime(2024, 3, 1, 12, 15)])
+    assert insert(repeated, conn=pg_conn) == 1
+    assert _scalar(pg_conn, "SELECT count FROM weather_daily_rollup WHERE city = 'Rome'") == 1
+
+
+@requires_postgres
+@pytest.mark.parametrize("insert", [insert_weather_records, bulk_insert_weather_records])
+def test_rows_without_observation_time_fall_back_to_fetched_at(pg_conn, insert):
+    assert insert(_batch(None, datetime(2024, 3, 1, 12, 5)), conn=pg_conn) == 1
+    assert insert(_batch(None, datetime(2024, 3, 1, 12, 5)), conn=pg_conn) == 0
+    assert insert(_batch(None, datetime(2024, 3, 1, 12, 15)), conn=pg_conn) == 1
+
+    assert _scalar(pg_conn, "SELECT count(*) FROM weather_summary") == 2
+    assert _scalar(pg_conn, "SELECT count(*) FROM weather_observation_keys") == 0
+    assert _scalar(pg_conn, "SELECT count FROM weather_daily_rollup WHERE city = 'Oslo'") == 2
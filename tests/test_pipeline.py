@@ -0,0 +1,145 @@
+from contextlib import contextmanager
+
+import pandas as pd
+
+from weather_analyzer import pipeline
+
+
+class _FakePool:
+    def __init__(self):
+        self.checkouts = 0
+
+    @contextmanager
+    def connection(self):
+        self.checkouts += 1
+        yield object()
+
+
+def test_stages_share_one_connection_and_one_history_read(monkeypatch):
+    pool = _FakePool()
+    seen_conns = []
+    persist_conns = []
+    history_reads = []
+    history = pd.DataFrame({
+        "city": ["Oslo", "Oslo"],
+        "temperature": [1.0, 3.0],
+        "fetched_at": pd.to_datetime(["2024-03-01 10:00", "2024-03-01 12:00"]),
+    })
+
+    def fetch_weather_data(conn=None, **kwargs):
+        history_reads.append(conn)
+        return history
+
+    def persist_records(records, insert_mode=None, conn=None):
+        persist_conns.append(conn)
+        return len(records)
+
+    monkeypatch.setattr(pipeline, "get_pool", lambda: pool)
+    monkeypatch.setattr(pipeline, "fetch_and_archive", lambda cities, raw_output, **kwargs: [{"name": c} for c in cities])
+    monkeypatch.setattr(pipeline, "process_weather_batch", lambda raw: raw)
+    monkeypatch.setattr(pipeline, "persist_records", persist_records)
+    monkeypatch.setattr(pipeline, "maintain_schema", lambda conn=None: seen_conns.append(conn))
+    monkeypatch.setattr(pipeline, "fetch_weather_data", fetch_weather_data)
+    monkeypatch.setattr(pipeline.settings, "ANALYTICS_MODE", "full")
+    monkeypatch.setattr(pipeline, "plot_temperature_trends", lambda daily: None)
+    overview = []
+    monkeypatch.setattr(pipeline.plot_trends, "plot_temperature_trends", lambda df, show=True: overview.append(df))
+
+    run = pipeline.run_pipeline(cities=["Oslo"], render_mode="inprocess")
+
+    assert pool.checkouts == 1
+    assert len(set(map(id, seen_conns + history_reads))) == 1
+    assert persist_conns == [None]  # the insert checks out (and retries) on its own
+    assert len(history_reads) == 1
+    assert overview == [history]
+    assert run.inserted == 1
+    assert run.overall_stats["max"].tolist() == [3.0]
+    assert set(run.timings) == {"fetch", "persist", "maintain", "export", "analyze", "render", "total"}
+
+
+def test_fetch_and_archive_do_not_wait_for_the_database(monkeypatch, tmp_path):
+    import psycopg2
+
+    from weather_analyzer import main
+    from weather_analyzer.archive import iter_archive
+    from weather_analyzer.db import insert_weather, pool as db_pool
+
+    checkouts = []
+
+    class _DownPool:
+        def connection(self):
+            checkouts.append(1)
+            raise psycopg2.OperationalError("could not connect to server")
+
+    def fetch_raw_weather(cities, on_result=None, **kwargs):
+        payloads = [{"name": city, "dt": 1709294400, "main": {"temp": 1.0}} for city in cities]
+        for payload in payloads:
+            on_result(payload["name"], payload)
+        return payloads
+
+    monkeypatch.setattr(main, "fetch_raw_weather", fetch_raw_weather)
+    monkeypatch.setattr(pipeline, "get_pool", lambda: _DownPool())
+    monkeypatch.setattr(db_pool, "get_pool", lambda: _DownPool())
+    monkeypatch.setattr(insert_weather.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(pipeline.settings, "DB_RETRIES", 3)
+    monkeypatch.setattr(main, "observation_cache", main.ObservationCache())
+
+    run = pipeline.run_pipeline(cities=["Oslo", "Rome"], raw_output=str(tmp_path), stages=["fetch", "persist"])
+
+    assert [entry["city"] for entry in iter_archive(tmp_path)] == ["Oslo", "Rome"]
+    assert len(run.records) == 2 and run.inserted == 0
+    assert len(checkouts) == 3  # persist retried checkout + insert DB_RETRIES times
+
+
+def test_persist_skips_observations_already_stored(monkeypatch):
+    from datetime import datetime
+
+    from weather_analyzer import main
+    from weather_analyzer.db import insert_weather
+    from weather_analyzer.records import ObservationCache, WeatherBatch
+
+    written = []
+
+    def insert(records, conn=None, strict=False):
+        if fail:
+            raise RuntimeError("Weather records not inserted")
+        written.append(records.city.tolist())
+        return len(records)
+
+    monkeypatch.setattr(insert_weather, "insert_weather_records", insert)
+    monkeypatch.setattr(main, "observation_cache", ObservationCache())
+    payloads = [
+        {"name": "Oslo", "dt": 1709294400, "main": {"temp": 1.0}},
+        {"name": "Rome", "dt": 1709294400, "main": {"temp": 9.0}},
+    ]
+    batch = WeatherBatch.from_payloads(payloads, fetched_at=datetime(2024, 3, 1, 12, 5))
+
+    fail = True
+    assert main.persist_records(batch, insert_mode="batch") == 0
+    fail = False
+    # A failed write is not remembered, so the retry goes through
+    assert main.persist_records(batch, insert_mode="batch") == 2
+    # Polling again before the provider updates writes nothing
+    assert main.persist_records(batch, insert_mode="batch") == 0
+    assert written == [["Oslo", "Rome"]]
+
+
+def test_aggregate_modes_read_only_the_overview_window(monkeypatch):
+    reads = []
+    daily = pd.DataFrame({"city": ["Oslo"], "date": [pd.Timestamp("2024-03-01")], "min": [1.0], "max": [3.0], "mean": [2.0]})
+
+    def fetch_weather_data(conn=None, **kwargs):
+        reads.append(kwargs)
+        return pd.DataFrame()
+
+    monkeypatch.setattr(pipeline, "get_pool", lambda: _FakePool())
+    monkeypatch.setattr(pipeline, "fetch_weather_data", fetch_weather_data)
+    monkeypatch.setattr(pipeline, "load_trends", lambda mode, conn=None: (daily, daily))
+    monkeypatch.setattr(pipeline, "plot_temperature_trends", lambda daily: None)
+    monkeypatch.setattr(pipeline.settings, "ANALYTICS_MODE", "rollup")
+    monkeypatch.setattr(pipeline.settings, "OVERVIEW_DAYS", 7)
+
+    pipeline.run_pipeline(cities=["Oslo"], render_mode="inprocess", stages=["analyze", "render"])
+
+    assert len(reads) == 1
+    assert pd.Timestamp.utcnow().tz_localize(None) - reads[0]["start"] < pd.Timedelta(days=7, minutes=1)
@@ -26,3 +26,63 @@ def test_process_weather_data_ignores_none():
     result = process_weather_data(raw_data)
 
     assert result == []
+
+
+def test_process_weather_data_without_humidity():
+    raw_data = [
+        {"name": "Oslo", "main": {"temp": -1.5}},
+        {"name": "Paris", "main": {"humidity": 60}},
+        {"main": {"temp": 3.0}},
+    ]
+
+    result = process_weather_data(raw_data)
+
+    assert [(r["city"], r["temperature"], r["humidity"]) for r in result] == [("Oslo", -1.5, None)]
+
+
+def test_process_weather_data_treats_non_finite_readings_as_missing():
+    import json
+
+    # json accepts NaN / Infinity literals, so a payload can carry them
+    raw_data = json.loads('''[
+        {"name": "Oslo", "main": {"temp": -1.5, "humidity": NaN, "pressure": Infinity}},
+        {"name": "Rome", "main": {"temp": NaN, "humidity": 40}}
+    ]''')
+
+    result = process_weather_data(raw_data)
+
+    assert [(r["city"], r["humidity"], r["pressure"]) for r in result] == [("Oslo", None, None)]
+
+
+def test_cached_payload_is_stored_when_the_first_insert_failed(monkeypatch):
+    from weather_analyzer import main
+    from weather_analyzer.cache import MemoryCache, WeatherCache
+    from weather_analyzer.db import insert_weather
+    from weather_analyzer.process_data import process_weather_batch
+    from weather_analyzer.records import ObservationCache
+
+    written = []
+
+    def insert(records, conn=None, strict=False):
+        if database_down:
+            raise RuntimeError("Weather records not inserted")
+        written.append(list(records.city))
+        return len(records)
+
+    monkeypatch.setattr(insert_weather, "insert_weather_records", insert)
+    monkeypatch.setattr(main, "observation_cache", ObservationCache())
+    monkeypatch.setattr(main.settings, "OBSERVATION_DEDUP", True)
+
+    payload = {"name": "Stockholm", "dt": 1_700_000_000, "main": {"temp": 6.5, "humidity": 80}}
+    cache = WeatherCache(MemoryCache(10), clock=lambda: 1_700_000_100)
+    cache.put("Stockholm", payload)  # cached by the fetch, before any insert
+
+    database_down = True
+    assert main.persist_records(process_weather_batch([payload]), insert_mode="batch") == 0
+
+    # Rerun within the TTL: the cached payload is the only copy of the reading
+    database_down = False
+    assert main.persist_records(process_weather_batch([cache.get("Stockholm")]), insert_mode="batch") == 1
+    # Served from the cache again: now a repeat, dropped by observation dedup
+    assert main.persist_records(process_weather_batch([cache.get("Stockholm")]), insert_mode="batch") == 0
+    assert written == [["Stockholm"]]
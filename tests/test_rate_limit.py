@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+from weather_analyzer.rate_limit import AdaptiveConcurrency, TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_token_bucket_spends_burst_then_paces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(60, burst=3, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3:] == [1.0, 1.0]  # 60/min → one token per second
+    assert clock.now == 2.0
+
+
+def test_token_bucket_pause_holds_back_every_caller():
+    clock = FakeClock()
+    bucket = TokenBucket(60, burst=5, clock=clock, sleep=clock.sleep)
+
+    bucket.pause(10)
+
+    assert bucket.acquire() == 11.0  # the pause, then one refill interval
+    assert clock.now == 11.0
+
+
+def test_replicas_share_the_quota_by_live_member_count(monkeypatch):
+    from weather_analyzer import http_client, scheduler
+
+    bucket = TokenBucket(60, burst=6)
+    monkeypatch.setattr(http_client, "get_client", lambda: type("Client", (), {"rate_limiter": bucket})())
+    monkeypatch.setattr(scheduler.settings, "API_RATE_LIMIT_PER_MINUTE", 60)
+    monkeypatch.setattr(scheduler.settings, "API_RATE_BURST", 6)
+
+    scheduler._share_api_quota(3)
+    assert (bucket.rate * 60, bucket.capacity) == (20, 2)
+
+    # A replica left: the survivors grow back into its share
+    scheduler._share_api_quota(2)
+    assert (bucket.rate * 60, bucket.capacity) == (30, 3)
+
+
+def test_adaptive_concurrency_aimd():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrency(maximum=8, minimum=2, cooldown=5, clock=clock)
+
+    assert limiter.on_overload() and limiter.limit == 4
+    assert not limiter.on_overload() and limiter.limit == 4  # same burst, one cut
+    clock.now = 10
+    assert limiter.on_overload() and limiter.limit == 2
+    clock.now = 20
+    assert limiter.on_overload() and limiter.limit == 2  # floor
+
+    for _ in range(3):
+        limiter.on_success()
+    assert limiter.limit == 3  # about +1 per full window
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.limit == 8
+
+
+def test_parse_retry_after():
+    now = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Mon, 01 Jan 2024 12:00:30 GMT", now=lambda: now) == 30.0
+    assert parse_retry_after("Mon, 01 Jan 2024 11:00:00 GMT", now=lambda: now) == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
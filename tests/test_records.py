@@ -0,0 +1,140 @@
+from datetime import datetime
+
+from weather_analyzer.db.insert_weather import _CsvRecordStream
+from weather_analyzer.metrics import METRICS
+from weather_analyzer.records import ObservationCache, WeatherBatch, WeatherRecord, parse_payload
+
+FETCHED_AT = datetime(2024, 3, 1, 12, 0)
+
+PAYLOADS = [
+    {"name": "Oslo", "dt": 1709294400, "main": {"temp": -2, "humidity": 81}},
+    {"name": "Paris", "main": {"temp": 9.5}},                      # no humidity
+    {"name": "Rome", "main": {"temp": "warm", "humidity": 40}},    # unusable temperature
+    {"cod": "404", "message": "city not found"},
+    None,
+    {"name": "Lima", "main": {"temp": 19.25, "humidity": True}},   # bool is not a reading
+]
+
+
+def test_record_is_slotted():
+    record = WeatherRecord("Oslo", -2.0, None, FETCHED_AT)
+
+    assert not hasattr(record, "__dict__")
+    assert WeatherRecord.__slots__[:4] == ("city", "temperature", "humidity", "fetched_at")
+    assert set(METRICS) <= set(WeatherRecord.__slots__)
+
+
+def test_batch_from_payloads_handles_missing_fields():
+    batch = WeatherBatch.from_payloads(PAYLOADS, fetched_at=FETCHED_AT, metrics=["humidity"])
+
+    assert len(batch) == 3
+    assert batch.metrics == ("temperature", "humidity")
+    assert batch.temperature.dtype == "float64"
+    assert batch.fetched_at.dtype == "datetime64[us]"
+    assert list(batch) == [
+        WeatherRecord("Oslo", -2.0, 81, FETCHED_AT, observed_at=datetime(2024, 3, 1, 12, 0)),
+        WeatherRecord("Paris", 9.5, None, FETCHED_AT),
+        WeatherRecord("Lima", 19.25, None, FETCHED_AT),
+    ]
+
+    observed = WeatherBatch.from_payloads(PAYLOADS, fetched_at=FETCHED_AT, use_observation_time=True)
+    assert observed.fetched_at.tolist()[:2] == [datetime(2024, 3, 1, 12, 0), FETCHED_AT]
+
+
+def test_batch_feeds_writer_and_analytics():
+    batch = WeatherBatch.concat([
+        WeatherBatch.from_payloads(PAYLOADS[:2], fetched_at=FETCHED_AT, metrics=["humidity"]),
+        WeatherBatch.from_records(
+            [{"city": "Rome", "temperature": 14.0, "humidity": 40, "fetched_at": FETCHED_AT}], metrics=["humidity"],
+        ),
+    ])
+
+    assert _CsvRecordStream(batch, batch.metrics).read() == (
+        "Oslo,-2.0,81,2024-03-01 12:00:00,2024-03-01 12:00:00\n"
+        "Paris,9.5,,,2024-03-01 12:00:00\n"
+        "Rome,14.0,40,,2024-03-01 12:00:00\n"
+    )
+
+    frame = batch.to_frame()
+    assert frame.dtypes.astype(str).to_dict() == {
+        "city": "category", "temperature": "float32", "humidity": "Int8", "fetched_at": "datetime64[ns]",
+    }
+    assert frame["humidity"].isna().tolist() == [False, True, False]
+
+
+FULL_PAYLOADS = [
+    {
+        "name": "Bergen", "dt": 1709294400,
+        "main": {"temp": 4.2, "humidity": 93, "pressure": 1002},
+        "wind": {"speed": 11.3, "deg": 250},
+        "clouds": {"all": 100},
+        "rain": {"1h": 2.54},
+    },
+    {
+        "name": "Madrid",
+        "main": {"temp": 21, "humidity": 30, "pressure": -1},         # impossible pressure
+        "wind": {"speed": 1.5},                                       # no direction
+        "clouds": {"all": 0},
+        "snow": {"3h": 1.0},                                          # only a 3h figure
+    },
+]
+
+
+def test_extended_metrics_match_between_record_and_batch_paths():
+    records = [parse_payload(item, FETCHED_AT) for item in FULL_PAYLOADS]
+    batch = WeatherBatch.from_payloads(FULL_PAYLOADS, fetched_at=FETCHED_AT, metrics=list(METRICS))
+
+    assert list(batch) == records
+    assert records[0] == WeatherRecord(
+        "Bergen", 4.2, 93, FETCHED_AT, observed_at=datetime(2024, 3, 1, 12, 0),
+        pressure=1002, wind_speed=11.3, wind_deg=250, clouds=100, rain_1h=2.54, snow_1h=0.0,
+    )
+    madrid = records[1]
+    assert (madrid.pressure, madrid.wind_deg, madrid.clouds, madrid.rain_1h, madrid.snow_1h) == (None, None, 0, 0.0, None)
+    assert isinstance(madrid.clouds, int)
+
+    frame = batch.to_frame()
+    assert list(frame.columns) == ["city", *METRICS, "fetched_at"]
+    assert frame["pressure"].dtype == "Int16" and frame["wind_speed"].dtype == "float32"
+
+
+def test_non_finite_readings_match_between_record_and_batch_paths():
+    payloads = [
+        {"name": "Oslo", "dt": float("inf"), "main": {"temp": 1.0, "humidity": float("nan"), "pressure": float("-inf")}},
+        {"name": "Rome", "main": {"temp": float("inf"), "humidity": 40}},
+        {"name": "Lima", "main": {"temp": 20, "humidity": True}},
+    ]
+    records = [r for r in (parse_payload(item, FETCHED_AT) for item in payloads) if r is not None]
+    batch = WeatherBatch.from_payloads(payloads, fetched_at=FETCHED_AT, metrics=list(METRICS))
+
+    assert list(batch) == records
+    assert [(r.city, r.humidity, r.pressure, r.observed_at) for r in records] == [
+        ("Oslo", None, None, None), ("Lima", None, None, None),
+    ]
+
+
+def test_batch_keeps_only_selected_metrics():
+    batch = WeatherBatch.from_payloads(FULL_PAYLOADS, fetched_at=FETCHED_AT, metrics=["wind_speed"])
+
+    assert batch.metrics == ("temperature", "wind_speed")
+    assert batch.wind_speed.tolist() == [11.3, 1.5]
+    # Metrics the batch did not collect are written as NULL
+    assert next(batch.rows(("temperature", "pressure"))) == ("Bergen", 4.2, None, datetime(2024, 3, 1, 12, 0), FETCHED_AT)
+
+
+def test_observation_cache_drops_unchanged_readings():
+    cache = ObservationCache()
+    first = WeatherBatch.from_payloads(
+        [PAYLOADS[0], PAYLOADS[0], PAYLOADS[1]], fetched_at=FETCHED_AT, metrics=["humidity"],
+    )
+
+    fresh = cache.fresh(first)
+    # The repeat within the batch goes; Paris has no dt and is always kept
+    assert fresh.city.tolist() == ["Oslo", "Paris"]
+    cache.remember(fresh)
+
+    later = WeatherBatch.from_payloads(
+        [PAYLOADS[0], {**PAYLOADS[0], "dt": PAYLOADS[0]["dt"] + 600}, PAYLOADS[1]],
+        fetched_at=FETCHED_AT, metrics=["humidity"],
+    )
+    assert cache.fresh(later).observed_at.tolist() == [datetime(2024, 3, 1, 12, 10), None]
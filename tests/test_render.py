@@ -0,0 +1,33 @@
+import pandas as pd
+
+from weather_analyzer.analytics.core import compute_trends
+from weather_analyzer.plotting.render import render_city_plots
+
+
+def _daily_stats(offset=0.0):
+    df = pd.DataFrame({
+        "city": ["Oslo", "Oslo", "Rome", "Rome"],
+        "temperature": [1.0, 3.0, 15.0 + offset, 18.0],
+        "fetched_at": pd.to_datetime(["2024-03-01", "2024-03-02", "2024-03-01", "2024-03-02"]),
+    })
+    return compute_trends(df)[1]
+
+
+def test_renders_in_pool_and_skips_unchanged_cities(tmp_path):
+    first = render_city_plots(_daily_stats(), output_dir=tmp_path, workers=2)
+    assert first == {"rendered": 2, "skipped": 0, "failed": 0}
+    assert (tmp_path / "temperature_trends_Oslo.png").exists()
+    assert (tmp_path / "temperature_trends_Rome.png").exists()
+
+    assert render_city_plots(_daily_stats(), output_dir=tmp_path, workers=2)["skipped"] == 2
+
+    # Only the city whose data changed is drawn again
+    changed = render_city_plots(_daily_stats(offset=1.0), output_dir=tmp_path, workers=1)
+    assert changed == {"rendered": 1, "skipped": 1, "failed": 0}
+
+
+def test_missing_png_is_rendered_again(tmp_path):
+    render_city_plots(_daily_stats(), output_dir=tmp_path, workers=1)
+    (tmp_path / "temperature_trends_Oslo.png").unlink()
+
+    assert render_city_plots(_daily_stats(), output_dir=tmp_path, workers=1)["rendered"] == 1
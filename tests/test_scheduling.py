@@ -0,0 +1,110 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from weather_analyzer.scheduling import Cadence, Scheduler
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_interval_ticks_sit_on_a_fixed_grid():
+    cadence = Cadence.minutes(10)
+
+    assert cadence.next_after(datetime(2024, 3, 1, 12, 3, 59)) == datetime(2024, 3, 1, 12, 10)
+    # Exactly on a tick: the next one, never the same one twice
+    assert cadence.next_after(datetime(2024, 3, 1, 12, 10)) == datetime(2024, 3, 1, 12, 20)
+
+
+def test_daily_cadence_rolls_over_to_tomorrow():
+    cadence = Cadence.daily("21:32")
+
+    assert cadence.next_after(datetime(2024, 3, 1, 8, 0)) == datetime(2024, 3, 1, 21, 32)
+    assert cadence.next_after(datetime(2024, 3, 1, 21, 32)) == datetime(2024, 3, 2, 21, 32)
+
+
+def test_skip_policy_runs_once_for_missed_ticks_and_records_lag():
+    clock = _Clock(datetime(2024, 3, 1, 12, 0, 30))
+    scheduler = Scheduler(clock=clock)
+    runs = []
+    scheduler.add("ingest", lambda: runs.append(clock()) or {"fetch": 0.5}, Cadence.minutes(10))
+
+    # Host was asleep through three ticks (12:10, 12:20, 12:30)
+    clock.now = datetime(2024, 3, 1, 12, 35)
+    assert scheduler.run_pending() == ["ingest"]
+    scheduler.wait()
+
+    metrics = scheduler.metrics()["ingest"]
+    assert len(runs) == 1
+    assert metrics["missed_ticks"] == 2
+    assert metrics["last_lag"] == pytest.approx(300)
+    assert metrics["stages"] == {"fetch": 0.5}
+    assert metrics["next_due"] == datetime(2024, 3, 1, 12, 40).isoformat()
+    scheduler.stop()
+
+
+def test_catch_up_policy_replays_missed_ticks_up_to_the_cap():
+    clock = _Clock(datetime(2024, 3, 1, 12, 0, 30))
+    scheduler = Scheduler(clock=clock)
+    scheduler.add("ingest", lambda: None, Cadence.minutes(10), policy="catch_up", max_catch_up=2)
+
+    clock.now = datetime(2024, 3, 1, 13, 5)  # ticks 12:10 ... 13:00 are due
+    runs = 0
+    while scheduler.run_pending():
+        scheduler.wait()
+        runs += 1
+
+    metrics = scheduler.metrics()["ingest"]
+    assert runs == 3  # the latest tick plus two replays
+    assert metrics["missed_ticks"] == 3
+    assert metrics["next_due"] == datetime(2024, 3, 1, 13, 10).isoformat()
+    scheduler.stop()
+
+
+def test_single_flight_never_stacks_runs():
+    clock = _Clock(datetime(2024, 3, 1, 12, 0, 30))
+    scheduler = Scheduler(clock=clock)
+    release = threading.Event()
+    started = []
+
+    def slow_job():
+        started.append(clock())
+        release.wait(5)
+
+    scheduler.add("ingest", slow_job, Cadence.minutes(10))
+
+    clock.now = datetime(2024, 3, 1, 12, 10)
+    assert scheduler.run_pending() == ["ingest"]
+    clock.now = datetime(2024, 3, 1, 12, 20)
+    assert scheduler.run_pending() == []
+
+    release.set()
+    scheduler.wait()
+    metrics = scheduler.metrics()["ingest"]
+    assert len(started) == 1
+    assert metrics["overlaps"] == 1
+    assert metrics["runs"] == 1
+    scheduler.stop()
+
+
+def test_jobs_keep_independent_cadences():
+    clock = _Clock(datetime(2024, 3, 1, 21, 25))
+    scheduler = Scheduler(clock=clock, max_sleep=3600)
+    scheduler.add("ingest", lambda: None, Cadence.minutes(10))
+    scheduler.add("analytics", lambda: None, Cadence.daily("21:32"))
+
+    clock.now = datetime(2024, 3, 1, 21, 30)
+    assert scheduler.run_pending() == ["ingest"]
+    scheduler.wait()
+    clock.now = datetime(2024, 3, 1, 21, 32)
+    assert scheduler.run_pending() == ["analytics"]
+    scheduler.wait()
+
+    assert scheduler.seconds_until_next() == pytest.approx(8 * 60)
+    scheduler.stop()
@@ -0,0 +1,211 @@
+import os
+from datetime import date, datetime
+
+import pytest
+
+from weather_analyzer.db.schema import (
+    PARTITION_NAME,
+    add_columns,
+    add_months,
+    apply_retention,
+    create_month_partition,
+    create_partitioned_table,
+    month_start,
+    partition_name,
+)
+
+
+def test_add_months_crosses_year_boundaries():
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert month_start(date(2024, 2, 29)) == date(2024, 2, 1)
+
+
+def test_partition_names_round_trip():
+    name = partition_name(date(2024, 3, 1))
+
+    assert name == "weather_summary_p2024_03"
+    assert PARTITION_NAME.match(name).groups() == ("2024", "03")
+    assert PARTITION_NAME.match("weather_summary_default") is None
+
+
+class _Cursor:
+    def __init__(self, columns):
+        self.columns = columns
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+
+    def fetchall(self):
+        return [(column,) for column in self.columns]
+
+
+def test_add_columns_only_alters_for_missing_columns():
+    cur = _Cursor(["city", "temperature", "humidity", "fetched_at", "pressure"])
+
+    added = add_columns(cur, metrics=["humidity", "pressure", "wind_speed", "clouds"])
+
+    assert added == ["wind_speed", "clouds", "observed_at"]
+    # One catalog lookup, then one ALTER per missing column
+    assert len(cur.statements) == 4
+
+
+class _RollupCursor:
+    """Answers to_regclass lookups from `exists`, one answer per lookup."""
+
+    def __init__(self, exists):
+        self.exists = list(exists)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+
+    def fetchone(self):
+        return (self.exists.pop(0),)
+
+
+def test_rollup_table_is_checked_again_after_a_rollback(monkeypatch):
+    from weather_analyzer.db import rollup
+
+    monkeypatch.setattr(rollup, "refresh_daily_rollup", lambda cur: 0)
+    rollup.forget_rollup_table()
+
+    # Missing, and still missing once the advisory lock is held: created here
+    cur = _RollupCursor([False, False])
+    rollup.ensure_rollup_table(cur)
+    assert any("pg_advisory_xact_lock" in s for s in cur.statements)
+    assert any("CREATE TABLE" in s for s in cur.statements)
+
+    cur = _RollupCursor([])
+    rollup.ensure_rollup_table(cur)
+    assert cur.statements == []  # checked once per process
+
+    # The creating transaction failed: the next writer checks (and creates) again
+    rollup.forget_rollup_table()
+    cur = _RollupCursor([False, True])  # another replica created it meanwhile
+    rollup.ensure_rollup_table(cur)
+    assert not any("CREATE TABLE" in s for s in cur.statements)
+    rollup.forget_rollup_table()
+
+
+# ----------------------
+# Integration: partition DDL against PostgreSQL
+# ----------------------
+TEST_DSN = os.environ.get("WEATHER_TEST_DSN")
+requires_postgres = pytest.mark.skipif(not TEST_DSN, reason="set WEATHER_TEST_DSN to run against PostgreSQL")
+
+
+@pytest.fixture
+def pg_cursor():
+    import psycopg2
+
+    conn = psycopg2.connect(TEST_DSN)
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute("DROP SCHEMA IF EXISTS weather_schema_test CASCADE")
+    cur.execute("CREATE SCHEMA weather_schema_test")
+    cur.execute("SET search_path TO weather_schema_test")
+    create_partitioned_table(cur)
+    try:
+        yield cur
+    finally:
+        cur.execute("DROP SCHEMA weather_schema_test CASCADE")
+        conn.close()
+
+
+def _insert(cur, *timestamps):
+    for i, fetched_at in enumerate(timestamps):
+        cur.execute(
+            "INSERT INTO weather_summary (city, temperature, fetched_at) VALUES (%s, 1.0, %s)",
+            (f"City{i}", fetched_at),
+        )
+
+
+def _count(cur, table):
+    cur.execute(f"SELECT count(*) FROM {table}")
+    return cur.fetchone()[0]
+
+
+@requires_postgres
+def test_new_partition_takes_its_rows_out_of_the_default_partition(pg_cursor):
+    cur = pg_cursor
+    _insert(cur, datetime(2024, 3, 5), datetime(2024, 3, 20), datetime(2024, 4, 1))
+
+    assert create_month_partition(cur, date(2024, 3, 1))
+    assert not create_month_partition(cur, date(2024, 3, 1))
+
+    assert _count(cur, "weather_summary_p2024_03") == 2
+    assert _count(cur, "weather_summary_default") == 1
+    assert _count(cur, "weather_summary") == 3
+
+
+@requires_postgres
+def test_retention_expires_partitions_and_default_rows(pg_cursor):
+    cur = pg_cursor
+    create_month_partition(cur, date(2024, 1, 1))
+    create_month_partition(cur, date(2024, 5, 1))
+    # January and May have partitions; February (old) and June (recent) land in the default one
+    _insert(cur, datetime(2024, 1, 10), datetime(2024, 2, 10), datetime(2024, 5, 10), datetime(2024, 6, 10))
+
+    expired = apply_retention(cur, retention_months=2, mode="detach", today=date(2024, 6, 15))
+
+    # Cutoff 2024-04-01: January is detached, February's row is archived
+    assert expired == ["weather_summary_p2024_01"]
+    assert _count(cur, "weather_summary_archive_p2024_01") == 1
+    assert _count(cur, "weather_summary_archive_default") == 1
+    assert _count(cur, "weather_summary") == 2
+
+    _insert(cur, datetime(2024, 3, 1))
+    apply_retention(cur, retention_months=2, mode="drop", today=date(2024, 6, 15))
+    assert _count(cur, "weather_summary") == 2
+    assert _count(cur, "weather_summary_archive_default") == 1
+
+
+@requires_postgres
+def test_concurrent_first_writers_create_the_write_schema_once(pg_cursor):
+    import threading
+
+    import psycopg2
+
+    from weather_analyzer.db import schema
+
+    def writer():
+        # search_path as a connection option: a SET would be undone by the rollback below
+        conn = psycopg2.connect(TEST_DSN, options="-c search_path=weather_schema_test")
+        return conn, conn.cursor()
+
+    pg_cursor.execute("DROP TABLE IF EXISTS weather_observation_keys")
+    first, second = writer(), writer()
+    try:
+        # A failed first attempt rolls its DDL back; the flag must not survive it
+        schema.forget_write_schema()
+        schema.ensure_write_schema(first[1])
+        first[0].rollback()
+        schema.forget_write_schema()
+
+        # The first writer holds the lock until it commits; the second waits, then finds everything in place
+        schema.ensure_write_schema(first[1])
+        errors = []
+
+        def second_writer():
+            try:
+                schema.forget_write_schema()
+                schema.ensure_write_schema(second[1])
+                second[0].commit()
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=second_writer)
+        thread.start()
+        thread.join(timeout=0.5)
+        assert thread.is_alive()  # queued on the advisory lock
+        first[0].commit()
+        thread.join(timeout=10)
+
+        assert errors == []
+        assert schema.table_exists(pg_cursor, "weather_observation_keys")
+    finally:
+        schema.forget_write_schema()
+        for conn, _ in (first, second):
+            conn.close()
@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from weather_analyzer.db.sharding import ShardCoordinator, fair_share, shard_of
+
+CITIES = [f"City{i}" for i in range(200)]
+
+
+def test_shard_of_is_stable_and_case_insensitive():
+    assert shard_of("Stockholm", 16) == shard_of(" stockholm ", 16)
+    slots = {shard_of(city, 16) for city in CITIES}
+    assert slots == set(range(16))
+
+
+def test_fair_share_covers_every_shard():
+    assert fair_share(16, 1) == 16
+    assert fair_share(16, 3) == 6
+    assert fair_share(16, 0) == 16
+
+
+# ----------------------
+# Integration: several worker processes against one PostgreSQL
+# ----------------------
+TEST_DSN = os.environ.get("WEATHER_TEST_DSN")
+requires_postgres = pytest.mark.skipif(not TEST_DSN, reason="set WEATHER_TEST_DSN to run against PostgreSQL")
+
+
+def _worker(name, namespace, results, commands):
+    import psycopg2
+
+    coordinator = ShardCoordinator(lambda: psycopg2.connect(TEST_DSN), shard_count=16,
+                                   namespace=namespace, worker_id=name)
+    while True:
+        command = commands.get()
+        if command == "stop":
+            return
+        results.put((name, coordinator.cities(CITIES), coordinator.leader))
+
+
+def _round(workers):
+    for _, commands, _ in workers.values():
+        commands.put("rebalance")
+    return {name: results.get(timeout=30)[1:] for name, (_, _, results) in workers.items()}
+
+
+@requires_postgres
+def test_workers_split_cities_and_rebalance_when_one_dies():
+    ctx = multiprocessing.get_context("spawn")
+    namespace = int(time.time()) % 100_000  # isolate from other runs on the same server
+    workers = {}
+    for name in ("a", "b", "c"):
+        # One results queue per worker: killing a worker mid-put must not
+        # leave a shared queue's write lock held for the survivors
+        commands, results = ctx.Queue(), ctx.Queue()
+        process = ctx.Process(target=_worker, args=(name, namespace, results, commands))
+        process.start()
+        workers[name] = (process, commands, results)
+
+    try:
+        # Two rounds: everyone registers, then everyone converges on the fair share
+        _round(workers)
+        claimed = _round(workers)
+        claimed = _round(workers)
+
+        assigned = [city for cities, _ in claimed.values() for city in cities]
+        assert sorted(assigned) == sorted(CITIES)  # disjoint and complete
+        assert sum(leader for _, leader in claimed.values()) == 1
+
+        # Kill one worker: its session ends and the survivors take over its shards
+        process, _, _ = workers.pop("a")
+        process.kill()
+        process.join()
+        _round(workers)
+        claimed = _round(workers)
+
+        assigned = [city for cities, _ in claimed.values() for city in cities]
+        assert sorted(assigned) == sorted(CITIES)
+    finally:
+        for process, commands, _ in workers.values():
+            commands.put("stop")
+            process.join(timeout=10)
+
+
+@requires_postgres
+def test_no_city_is_skipped_while_a_worker_joins_and_leaves():
+    import psycopg2
+
+    namespace = int(time.time()) % 100_000 + 100_000
+    a, b = (ShardCoordinator(lambda: psycopg2.connect(TEST_DSN), shard_count=16, namespace=namespace, worker_id=name)
+            for name in ("a", "b"))
+
+    def tick(*workers):
+        fetched = [city for worker in workers for city in worker.cities(CITIES)]
+        assert set(fetched) == set(CITIES)
+        return fetched
+
+    try:
+        assert len(tick(a)) == len(CITIES)
+        # b registers and finds every slot held; a hands half over and still fetches it
+        tick(b, a)
+        tick(b, a)
+        assert len(tick(a, b)) == len(CITIES)
+        assert a.owned and b.owned and not a.owned & b.owned
+
+        # b leaves: its session ends and a takes its slots on the next tick
+        b.close()
+        assert len(tick(a)) == len(CITIES)
+    finally:
+        a.close()
+        b.close()
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Heavy dependencies an entry point must not pull in at import time
+HEAVY = {"pandas", "numpy", "matplotlib", "psycopg2", "pyarrow", "aiohttp", "asyncpg"}
+
+# Generous wall-clock ceiling on the cumulative import of each entry point;
+# catches a heavy dependency slipping back in, not small fluctuations
+IMPORT_BUDGET_SECONDS = 1.5
+
+
+def import_profile(module: str, cwd: Path) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, from `-X importtime`."""
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            profile[name.strip()] = int(cumulative)
+    return profile
+
+
+@pytest.mark.parametrize("module", [
+    "weather_analyzer.main",
+    "weather_analyzer.scheduler",
+    "weather_analyzer.backfill",
+])
+def test_entry_point_import_stays_light(module, tmp_path):
+    profile = import_profile(module, tmp_path)
+
+    loaded_heavy = {name.split(".")[0] for name in profile} & HEAVY
+    if module == "weather_analyzer.backfill":
+        loaded_heavy -= {"psycopg2"}  # backfill exists to write to the database
+    assert not loaded_heavy, f"{module} imports {sorted(loaded_heavy)} at startup"
+    assert profile[module] / 1e6 < IMPORT_BUDGET_SECONDS
+
+
+def test_scheduler_import_has_no_side_effects(tmp_path):
+    import_profile("weather_analyzer.scheduler", tmp_path)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,171 @@
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+AGGREGATE_COLUMNS = ["city", "date", "count", "sum", "min", "max"]
+STATS_COLUMNS = ["min", "max", "mean"]
+
+
+def _city_codes(city: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    """Integer codes + labels for the city column (free for categorical input)."""
+    if isinstance(city.dtype, pd.CategoricalDtype):
+        return city.cat.codes.to_numpy(), city.cat.categories
+    codes, labels = pd.factorize(city, sort=True)
+    return codes, pd.Index(labels)
+
+
+def _segment_starts(*keys: np.ndarray) -> np.ndarray:
+    """Start offsets of runs of equal keys in already-sorted key arrays."""
+    if len(keys[0]) == 0:
+        return np.zeros(0, dtype=np.intp)
+    change = np.zeros(len(keys[0]) - 1, dtype=bool)
+    for key in keys:
+        change |= key[1:] != key[:-1]
+    return np.concatenate(([0], np.flatnonzero(change) + 1))
+
+
+def _reduce(values: np.ndarray, starts: np.ndarray) -> dict[str, np.ndarray]:
+    """NaN-aware count / sum / min / max per segment in one pass each."""
+    missing = np.isnan(values)
+    return {
+        "count": np.add.reduceat(~missing, starts).astype(np.int64),
+        "sum": np.add.reduceat(np.where(missing, 0.0, values), starts),
+        "min": np.fmin.reduceat(values, starts),
+        "max": np.fmax.reduceat(values, starts),
+    }
+
+
+def metric_daily_aggregates(df: pd.DataFrame, metrics: list[str]) -> dict[str, pd.DataFrame]:
+    """
+    Per-city, per-day count / sum / min / max of every metric in `metrics`
+    from raw rows, as {metric: frame like daily_aggregates}.
+
+    The sort on the integer (city code, day) key and the segment
+    boundaries are computed once and shared; each extra metric only adds
+    one reduceat pass over an already ordered column. Days come from a
+    datetime64[D] floor, never Python date objects. Frames are ordered by
+    city, then date.
+    """
+    empty = {metric: pd.DataFrame(columns=AGGREGATE_COLUMNS) for metric in metrics}
+    if df.empty:
+        return empty
+
+    fetched_at = pd.to_datetime(df["fetched_at"], errors="coerce").to_numpy()
+    valid = ~np.isnat(fetched_at)
+    codes, cities = _city_codes(df["city"])
+    valid &= codes >= 0
+
+    days = fetched_at[valid].astype("datetime64[D]").view(np.int64)
+    codes = codes[valid].astype(np.int64)
+    if len(days) == 0:
+        return empty
+
+    span = days.max() - days.min() + 1
+    order = np.argsort(codes * span + (days - days.min()), kind="stable")
+    codes, days = codes[order], days[order]
+
+    starts = _segment_starts(codes, days)
+    city = cities.take(codes[starts])
+    date = days[starts].astype("datetime64[D]").astype("datetime64[ns]")
+
+    aggregates = {}
+    for metric in metrics:
+        values = df[metric].to_numpy(dtype=np.float64, na_value=np.nan)[valid][order]
+        aggregates[metric] = pd.DataFrame({"city": city, "date": date, **_reduce(values, starts)})
+    return aggregates
+
+
+def daily_aggregates(df: pd.DataFrame, value: str = "temperature") -> pd.DataFrame:
+    """Per-city, per-day count / sum / min / max of `value` from raw rows (one metric_daily_aggregates pass)."""
+    return metric_daily_aggregates(df, [value])[value]
+
+
+def trends_from_daily(daily: pd.DataFrame) -> tuple[pd.DataFrame | None, pd.DataFrame | None]:
+    """
+    (overall_stats, daily_stats) from per-day aggregates: overall figures
+    are folded from the daily rows, not from raw data again.
+    """
+    if daily.empty:
+        return None, None
+
+    codes, cities = _city_codes(daily["city"])
+    if np.any(codes[1:] < codes[:-1]):
+        order = np.argsort(codes, kind="stable")
+        daily, codes = daily.iloc[order], codes[order]
+    daily = daily.reset_index(drop=True)
+    # A day (or city) without a single reading has mean NaN, not a warning
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _fold_daily(daily, codes, cities)
+
+
+def _fold_daily(daily: pd.DataFrame, codes: np.ndarray, cities: pd.Index) -> tuple[pd.DataFrame, pd.DataFrame]:
+    daily_stats = pd.DataFrame({
+        "city": daily["city"],
+        "date": daily["date"],
+        "min": daily["min"].to_numpy(dtype=np.float64),
+        "max": daily["max"].to_numpy(dtype=np.float64),
+        "mean": daily["sum"].to_numpy(dtype=np.float64) / daily["count"].to_numpy(dtype=np.float64),
+    })
+
+    starts = _segment_starts(codes)
+    count = np.add.reduceat(daily["count"].to_numpy(dtype=np.float64), starts)
+    overall_stats = pd.DataFrame({
+        "city": cities.take(codes[starts]),
+        "min": np.fmin.reduceat(daily["min"].to_numpy(dtype=np.float64), starts),
+        "max": np.fmax.reduceat(daily["max"].to_numpy(dtype=np.float64), starts),
+        "mean": np.add.reduceat(daily["sum"].to_numpy(dtype=np.float64), starts) / count,
+    })
+
+    return overall_stats, daily_stats
+
+
+def compute_metric_trends(
+    df: pd.DataFrame, metrics: list[str]
+) -> dict[str, tuple[pd.DataFrame | None, pd.DataFrame | None]]:
+    """
+    {metric: (overall_stats, daily_stats)} for every metric in `metrics`,
+    from one shared sort of the raw rows (see metric_daily_aggregates).
+    Missing readings (NULL / NaN) are left out of each metric's figures.
+    """
+    if df.empty:
+        return {metric: (None, None) for metric in metrics}
+    return {metric: trends_from_daily(daily) for metric, daily in metric_daily_aggregates(df, metrics).items()}
+
+
+def compute_trends(df: pd.DataFrame) -> tuple[pd.DataFrame | None, pd.DataFrame | None]:
+    """
+    Overall per-city and daily per-city min / max / mean temperature
+    in a single vectorized pass over the raw rows.
+    """
+    return compute_metric_trends(df, ["temperature"])["temperature"]
+
+
+def city_slices(df: pd.DataFrame) -> Iterator[tuple[str, pd.DataFrame]]:
+    """
+    Yield (city, rows) per city without a boolean scan per city.
+
+    Frames from daily_aggregates / trends_from_daily are already grouped by
+    city and are sliced in place (positional views). Anything else is
+    stable-sorted by city once first, so per-city time order is kept.
+    Rows without a city (NaN / None) belong to no slice.
+    """
+    if df.empty:
+        return
+
+    codes, cities = _city_codes(df["city"])
+    if np.any(codes < 0):
+        keep = codes >= 0
+        df = df[keep]
+        codes = codes[keep]
+        if not len(codes):
+            return
+    if len(codes) > 1 and np.any(codes[1:] < codes[:-1]):
+        order = np.argsort(codes, kind="stable")
+        df = df.iloc[order]
+        codes = codes[order]
+
+    starts = _segment_starts(codes)
+    stops = np.append(starts[1:], len(codes))
+    for start, stop in zip(starts, stops):
+        yield cities[codes[start]], df.iloc[start:stop]
@@ -0,0 +1,125 @@
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from weather_analyzer.analytics.core import AGGREGATE_COLUMNS, daily_aggregates, trends_from_daily
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+
+def aggregate_daily(df: pd.DataFrame) -> pd.DataFrame:
+    """Mergeable per-city, per-day temperature aggregates: count, sum, min, max."""
+    return daily_aggregates(df)
+
+
+def trends_from_aggregates(daily: pd.DataFrame) -> tuple[pd.DataFrame | None, pd.DataFrame | None]:
+    """Same (overall_stats, daily_stats) shape compute_trends returns."""
+    return trends_from_daily(daily)
+
+
+class IncrementalTrends:
+    """
+    Keeps persisted per-city, per-day aggregates plus a watermark (the
+    newest fetched_at seen), so each run only pulls and aggregates recent rows.
+
+    - Each run re-reads whole days from ANALYTICS_LOOKBACK_DAYS before the
+      watermark and recomputes them, so rows that commit after a newer
+      row was read (concurrent or sharded writers, replays stamped with
+      observation time) are still counted; older backfills need reset()
+    - State is a small SQLite file: only the days whose aggregates changed
+      are written, together with the watermark in one transaction, so the
+      two can never drift apart
+    """
+
+    def __init__(self, state_path: str | Path | None = None, lookback_days: int | None = None):
+        self.state_path = Path(state_path or settings.ANALYTICS_STATE_PATH)
+        self.lookback = pd.Timedelta(days=settings.ANALYTICS_LOOKBACK_DAYS if lookback_days is None else lookback_days)
+        self.watermark: pd.Timestamp | None = None
+        self.daily = pd.DataFrame(columns=AGGREGATE_COLUMNS)
+        self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.state_path)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS daily ("
+            "city TEXT, date TEXT, count INTEGER, sum REAL, min REAL, max REAL, PRIMARY KEY (city, date))"
+        )
+        db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        return db
+
+    def _load(self) -> None:
+        if not self.state_path.exists():
+            return
+        try:
+            with closing(self._connect()) as db:
+                rows = db.execute(f"SELECT {', '.join(AGGREGATE_COLUMNS)} FROM daily").fetchall()
+                watermark = db.execute("SELECT value FROM meta WHERE key = 'watermark'").fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Ignoring unreadable analytics state {self.state_path}: {e}")
+            return
+
+        self.watermark = pd.Timestamp(watermark[0]) if watermark else None
+        daily = pd.DataFrame(rows, columns=AGGREGATE_COLUMNS)
+        daily["date"] = pd.to_datetime(daily["date"])
+        self.daily = daily
+
+    def _save(self, changed: pd.DataFrame) -> None:
+        rows = changed.assign(date=changed["date"].dt.strftime("%Y-%m-%d"))
+        with closing(self._connect()) as db, db:
+            db.executemany(
+                f"INSERT OR REPLACE INTO daily ({', '.join(AGGREGATE_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                zip(*(rows[column].tolist() for column in AGGREGATE_COLUMNS)),
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('watermark', ?)",
+                (self.watermark.isoformat() if self.watermark is not None else None,),
+            )
+
+    def reset(self) -> None:
+        self.watermark = None
+        self.daily = pd.DataFrame(columns=AGGREGATE_COLUMNS)
+        self.state_path.unlink(missing_ok=True)
+
+    def update(self, fetch: Callable[..., pd.DataFrame]) -> tuple[pd.DataFrame | None, pd.DataFrame | None]:
+        """
+        Pull rows from the start of the lookback window with `fetch(start=...)`
+        (everything on the first run), recompute the days they fall on and
+        return (overall_stats, daily_stats).
+        """
+        start = None if self.watermark is None else (self.watermark - self.lookback).normalize()
+        rows = fetch(start=start)
+        if rows.empty:
+            logger.info("Incremental analytics: no rows in the lookback window")
+            return trends_from_aggregates(self.daily)
+
+        # The re-read days are complete: their fresh aggregates replace the stored ones
+        fresh = aggregate_daily(rows)
+        fresh["city"] = fresh["city"].astype(str)
+        if self.daily.empty:
+            changed = fresh
+        else:
+            matched = fresh.merge(self.daily, on=AGGREGATE_COLUMNS, how="left", indicator=True)
+            changed = fresh[(matched["_merge"] == "left_only").to_numpy()]
+
+        newest = pd.to_datetime(rows["fetched_at"], errors="coerce").max()
+        if pd.notna(newest) and (self.watermark is None or newest > self.watermark):
+            self.watermark = newest
+
+        if self.daily.empty:
+            self.daily = changed.reset_index(drop=True)
+        elif not changed.empty:
+            keys = pd.MultiIndex.from_frame(changed[["city", "date"]])
+            stale = pd.MultiIndex.from_frame(self.daily[["city", "date"]]).isin(keys)
+            self.daily = pd.concat([self.daily[~stale], changed], ignore_index=True)
+        self._save(changed)
+        logger.info(
+            f"Incremental analytics re-read {len(rows)} rows, {len(changed)} city-days changed "
+            f"(watermark {self.watermark})"
+        )
+        return trends_from_aggregates(self.daily)
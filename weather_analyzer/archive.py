@@ -0,0 +1,201 @@
+import gzip
+import itertools
+import json
+import os
+import threading
+import zlib
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX: single writer assumed
+    fcntl = None
+
+from weather_analyzer.logger import get_logger
+
+logger = get_logger(__name__)
+
+PREFIX = "raw_weather"
+SUFFIX = ".ndjson.gz"
+
+
+def archive_path(folder: str | Path, day: date, part: str | None = None) -> Path:
+    name = f"{PREFIX}_{day.isoformat()}" + (f".{part}" if part else "")
+    return Path(folder) / f"{name}{SUFFIX}"
+
+
+def _part_of(path: Path) -> int:
+    # raw_weather_<day>.<part>.ndjson.gz; the day file itself is part 0
+    part = path.name[: -len(SUFFIX)].split(".", 1)[1:]
+    return int(part[0]) if part and part[0].isdigit() else 0
+
+
+def _day_of(path: Path) -> date | None:
+    stem = path.name[len(PREFIX) + 1:].split(".", 1)[0]
+    try:
+        return date.fromisoformat(stem)
+    except ValueError:
+        return None
+
+
+class RawArchive:
+    """
+    Append-only archive of raw API payloads: one gzip-compressed NDJSON
+    file per UTC day (raw_weather_YYYY-MM-DD.ndjson.gz).
+
+    - write() compresses each payload as it arrives; nothing is collected
+      per run, and a run's lines end up as one gzip member of the day file
+    - Every line is {"fetched_at", "city", "data"}, so replays know when
+      and for which requested city the payload was fetched
+    - The day file is rotated when the UTC date changes mid-run
+    - The day file is locked while written; a concurrent writer (another
+      scheduler replica) gets its own part file for that day instead
+    - A crash leaves a truncated trailing member. The reader keeps the data
+      before it, and the next run does not append after it but moves on to
+      a new part file, so later runs stay readable
+    """
+
+    def __init__(self, folder: str | Path = "data/history/raw", clock: Callable[[], datetime] | None = None):
+        self.folder = Path(folder)
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._lock = threading.Lock()
+        self._day: date | None = None
+        self._file = None
+        self._compressor = None
+        self.path: Path | None = None
+        self.written = 0
+
+    # ----------------------
+    # Day files
+    # ----------------------
+    def _open(self, day: date) -> None:
+        self.folder.mkdir(parents=True, exist_ok=True)
+        # The day file, or else the first part file that no other writer
+        # holds and that does not end in a member cut short by a crash
+        for part in itertools.count():
+            path = archive_path(self.folder, day, part=str(part) if part else None)
+            f = open(path, "a+b")
+            if fcntl is not None:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    f.close()
+                    continue
+            if ends_with_complete_member(f):
+                break
+            logger.warning(f"Archive {path} ends in an incomplete gzip member; writing to the next part file")
+            f.close()
+
+        self._file = f
+        self._day = day
+        self.path = path
+        # wbits=31: a complete gzip member (header + deflate + trailer)
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def _close_file(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.write(self._compressor.flush())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            self._file.close()  # releases the lock
+            self._file = None
+            self._compressor = None
+
+    # ----------------------
+    # Writing
+    # ----------------------
+    def write(self, city: str | None, data: dict) -> None:
+        """Append one raw payload. Thread-safe; matches the fetch `on_result(city, data)` callback."""
+        fetched_at = self._clock()
+        line = json.dumps(
+            {"fetched_at": fetched_at.isoformat(), "city": city, "data": data},
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        with self._lock:
+            day = fetched_at.astimezone(timezone.utc).date() if fetched_at.tzinfo else fetched_at.date()
+            if day != self._day:
+                self._close_file()
+                self._open(day)
+            self._file.write(self._compressor.compress(line.encode("utf-8") + b"\n"))
+            self.written += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_file()
+        if self.written:
+            logger.info(f"Raw archive: {self.written} payloads appended under {self.folder}")
+
+    def __enter__(self) -> "RawArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ----------------------
+# Reading
+# ----------------------
+def ends_with_complete_member(f, chunk_size: int = 1 << 20) -> bool:
+    """
+    True when the open binary file `f` is empty or a run of complete gzip
+    members, i.e. more members can be appended and still be read.
+    Decompresses the whole file, discarding the output.
+    """
+    f.seek(0)
+    member = zlib.decompressobj(31)
+    pending = False  # bytes fed to the current member, which has not ended yet
+    while chunk := f.read(chunk_size):
+        while chunk:
+            try:
+                member.decompress(chunk)
+            except zlib.error:
+                return False
+            pending = True
+            if not member.eof:
+                break
+            chunk = member.unused_data
+            member = zlib.decompressobj(31)
+            pending = False
+    return not pending
+
+
+def archive_files(folder: str | Path, start: date | None = None, end: date | None = None) -> list[Path]:
+    """Day files (and part files) between `start` and `end` inclusive, oldest first, each day file before its parts."""
+    files = []
+    for path in Path(folder).glob(f"{PREFIX}_*{SUFFIX}"):
+        day = _day_of(path)
+        if day is None or (start and day < start) or (end and day > end):
+            continue
+        files.append((day, _part_of(path), path.name, path))
+    return [path for *_, path in sorted(files)]
+
+
+def iter_archive(folder: str | Path, start: date | None = None, end: date | None = None) -> Iterator[dict]:
+    """
+    Stream archived entries ({"fetched_at", "city", "data"}) in file order.
+    Files outside [start, end] are never opened; each file is decompressed
+    incrementally, so memory stays flat whatever the archive size.
+    """
+    for path in archive_files(folder, start, end):
+        yield from iter_archive_file(path)
+
+
+def iter_archive_file(path: Path) -> Iterator[dict]:
+    """Entries of one archive file; a truncated tail ends the file early."""
+    try:
+        with gzip.open(path, "rb") as f:
+            for lineno, line in enumerate(f, 1):
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping unreadable line {lineno} in {path}")
+    except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+        # Truncated trailing member from an interrupted run: keep what was
+        # read. Writers never append after it (see RawArchive._open)
+        logger.warning(f"Archive {path} ends early ({e}); remaining data skipped")
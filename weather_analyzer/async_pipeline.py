@@ -0,0 +1,439 @@
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable, Iterable
+
+from weather_analyzer.archive import RawArchive
+from weather_analyzer.cache import WeatherCache, get_cache
+from weather_analyzer.fetch_weather import _city_params, validate_weather_payload
+from weather_analyzer.http_client import HttpStatusError, RetryPolicy, get_client
+from weather_analyzer.metrics import selected_metrics
+from weather_analyzer.rate_limit import TokenBucket, parse_retry_after
+from weather_analyzer.records import ObservationCache, WeatherBatch, row_columns
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+FetchCity = Callable[[str], Awaitable[dict | None]]
+WriteBatch = Callable[[WeatherBatch], Awaitable[int]]
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+
+# ----------------------
+# Streaming stages
+# ----------------------
+class AsyncPipeline:
+    """
+    One run as three stages on a single event loop, so a city's row is
+    stored as soon as its payload arrives instead of after the slowest city.
+
+    - `concurrency` fetch workers pull cities and hand each payload to a
+      bounded queue (and to `on_payload`, e.g. the raw archive, which runs
+      in a worker thread since it may block on disk)
+    - one batcher turns payloads into a WeatherBatch every `batch_rows`
+      payloads or `batch_ms` after the oldest waiting one, whichever
+      comes first, and drops repeats seen by `observations`
+    - `writers` insert tasks take batches from a second bounded queue
+    Full queues make the stage before them wait: memory stays bounded by
+    the queue sizes whatever the number of cities, and a slow database
+    slows fetching down instead of piling up payloads.
+    """
+
+    def __init__(
+        self,
+        fetch: FetchCity,
+        write: WriteBatch,
+        concurrency: int | None = None,
+        batch_rows: int | None = None,
+        batch_ms: int | None = None,
+        queue_size: int | None = None,
+        writers: int | None = None,
+        on_payload: Callable[[str, dict], None] | None = None,
+        observations: ObservationCache | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.fetch = fetch
+        self.write = write
+        self.concurrency = max(1, concurrency or settings.FETCH_CONCURRENCY)
+        self.batch_rows = max(1, batch_rows or settings.ASYNC_BATCH_ROWS)
+        self.batch_seconds = (settings.ASYNC_BATCH_MS if batch_ms is None else batch_ms) / 1000
+        self.queue_size = max(1, queue_size or settings.ASYNC_QUEUE_SIZE)
+        self.writers = max(1, writers or settings.ASYNC_DB_WRITERS)
+        self.on_payload = on_payload
+        self.observations = observations
+        self._clock = clock
+        self._start = 0.0
+        self.stats = {
+            "fetched": 0,      # payloads received
+            "failed": 0,       # cities without a payload
+            "skipped": 0,      # unusable payloads and unchanged observations
+            "batches": 0,      # batches stored
+            "inserted": 0,     # new rows
+            "unsaved": 0,      # rows of batches whose insert failed
+            "max_queued": 0,   # payload queue high-water mark
+            "first_row_seconds": None,  # run start → first committed batch
+            "seconds": 0.0,
+        }
+
+    async def run(self, cities: Iterable[str]) -> dict:
+        """Fetch, process and store `cities`; returns the run's stats."""
+        self._start = self._clock()
+        payloads: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        batches: asyncio.Queue = asyncio.Queue(maxsize=self.writers)
+        todo = iter(cities)  # shared by the fetch workers; one loop, no lock needed
+
+        fetchers = [asyncio.create_task(self._fetch_worker(todo, payloads)) for _ in range(self.concurrency)]
+        batcher = asyncio.create_task(self._batcher(payloads, batches))
+        writers = [asyncio.create_task(self._writer(batches)) for _ in range(self.writers)]
+        try:
+            await asyncio.gather(*fetchers)
+            await payloads.put(_DONE)
+            await batcher
+            for _ in writers:
+                await batches.put(_DONE)
+            await asyncio.gather(*writers)
+        finally:
+            for task in (*fetchers, batcher, *writers):
+                task.cancel()
+
+        self.stats["seconds"] = self._clock() - self._start
+        return dict(self.stats)
+
+    async def _fetch_worker(self, cities: Iterable[str], payloads: asyncio.Queue) -> None:
+        for city in cities:
+            try:
+                data = await self.fetch(city)
+            except Exception as e:
+                logger.error(f"Fetching {city} failed: {e}")
+                data = None
+            if not data:
+                self.stats["failed"] += 1
+                logger.warning(f"No data returned for {city}")
+                continue
+
+            self.stats["fetched"] += 1
+            if self.on_payload is not None:
+                await asyncio.to_thread(self.on_payload, city, data)
+            await payloads.put(data)
+            self.stats["max_queued"] = max(self.stats["max_queued"], payloads.qsize())
+
+    async def _batcher(self, payloads: asyncio.Queue, batches: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        pending: list[dict] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - loop.time()) if pending else None
+            try:
+                item = await asyncio.wait_for(payloads.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None  # the oldest pending payload has waited long enough
+            if item is _DONE:
+                break
+            if item is not None:
+                if not pending:
+                    deadline = loop.time() + self.batch_seconds
+                pending.append(item)
+            if len(pending) >= self.batch_rows or (pending and loop.time() >= deadline):
+                await self._flush(pending, batches)
+                pending = []
+        if pending:
+            await self._flush(pending, batches)
+
+    async def _flush(self, pending: list[dict], batches: asyncio.Queue) -> None:
+        try:
+            batch = WeatherBatch.from_payloads(pending)
+        except Exception as e:
+            logger.error(f"Processing {len(pending)} payloads failed: {e}")
+            self.stats["skipped"] += len(pending)
+            return
+        if len(batch) < len(pending):
+            logger.warning(f"Skipped {len(pending) - len(batch)} incomplete weather payloads")
+
+        if self.observations is not None and settings.OBSERVATION_DEDUP:
+            batch = self.observations.fresh(batch)
+        self.stats["skipped"] += len(pending) - len(batch)
+        if len(batch):
+            await batches.put(batch)
+
+    async def _writer(self, batches: asyncio.Queue) -> None:
+        while (batch := await batches.get()) is not _DONE:
+            try:
+                inserted = await self.write(batch)
+            except Exception as e:
+                logger.error(f"Insert of {len(batch)} records failed: {e}")
+                self.stats["unsaved"] += len(batch)
+                continue
+
+            # Only remember observations that were really written
+            if self.observations is not None and settings.OBSERVATION_DEDUP:
+                self.observations.remember(batch)
+            self.stats["batches"] += 1
+            self.stats["inserted"] += inserted
+            if self.stats["first_row_seconds"] is None:
+                self.stats["first_row_seconds"] = self._clock() - self._start
+
+
+# ----------------------
+# aiohttp fetch
+# ----------------------
+class AsyncWeatherFetcher:
+    """
+    Per-city API calls on an aiohttp session, following the same rules as
+    fetch_weather_once / call_with_retries:
+
+    - Response cache, with conditional revalidation of stale entries
+    - Client-side quota: the token bucket is polled with try_acquire()
+      and the wait is awaited, so it never blocks the event loop
+    - A 429's Retry-After pauses the quota for every caller
+    - RetryPolicy backoff for transient errors; other 4xx are final
+    The in-flight limit is the number of fetch workers (the AIMD limit of
+    the threaded client is not applied here).
+    """
+
+    def __init__(
+        self,
+        session,
+        rate_limiter: TokenBucket | None = None,
+        retry_policy: RetryPolicy | None = None,
+        cache: WeatherCache | None = None,
+    ):
+        self.session = session
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
+        self.cache = cache
+        self.stats = {"requests": 0, "throttle_wait": 0.0, "throttled": 0, "server_errors": 0, "retried": 0, "dropped": 0}
+
+    async def _throttle(self) -> None:
+        if self.rate_limiter is None:
+            return
+        while (wait := self.rate_limiter.try_acquire()) > 0:
+            self.stats["throttle_wait"] += wait
+            await asyncio.sleep(wait)
+
+    async def fetch_once(self, city: str) -> dict:
+        """
+        Single API call without retries; raises like fetch_weather_once.
+        Response cache calls run in worker threads: the disk backend is
+        SQLite and would block the event loop.
+        """
+        cache = self.cache
+        headers = None
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, city)
+            if cached is not None:
+                return cached
+            headers = await asyncio.to_thread(cache.revalidation_headers, city)
+
+        await self._throttle()
+        async with self.session.get(settings.WEATHER_API_URL, params=_city_params(city), headers=headers) as response:
+            body = await response.read()
+            status = response.status
+            response_headers = response.headers
+        self.stats["requests"] += 1
+
+        retry_after = parse_retry_after(response_headers.get("Retry-After"))
+        if status == 429 or status >= 500:
+            self.stats["throttled" if status == 429 else "server_errors"] += 1
+            if status == 429 and retry_after and self.rate_limiter is not None:
+                self.rate_limiter.pause(retry_after)
+
+        if status == 304 and cache is not None:
+            data = await asyncio.to_thread(cache.revalidated, city)
+            if data is not None:
+                return data
+
+        if status != 200:
+            raise HttpStatusError(status, body.decode("utf-8", "replace"), retry_after=retry_after)
+        data = json.loads(body)
+        validate_weather_payload(data)
+        if cache is not None:
+            await asyncio.to_thread(cache.put, city, data, response_headers)
+        return data
+
+    async def fetch(self, city: str) -> dict | None:
+        """fetch_once under the retry policy; None after all attempts fail."""
+        policy = self.retry_policy
+        for attempt in range(1, policy.attempts + 1):
+            try:
+                return await self.fetch_once(city)
+            except Exception as exc:
+                logger.warning(f"API attempt {attempt}/{policy.attempts} failed for {city}: {exc}")
+                if not policy.should_retry(attempt, exc):
+                    self.stats["dropped"] += 1
+                    logger.error(f"API permanently failed for {city}")
+                    return None
+                self.stats["retried"] += 1
+                await asyncio.sleep(policy.delay(attempt, exc))
+        return None
+
+    def log_stats(self) -> None:
+        stats = self.stats
+        if not stats["requests"]:
+            return
+        logger.info(
+            f"HTTP (async): {stats['requests']} requests, quota wait {stats['throttle_wait']:.3f}s; "
+            f"{stats['throttled']} throttled, {stats['server_errors']} server errors, "
+            f"{stats['retried']} retried, {stats['dropped']} dropped"
+        )
+
+
+# ----------------------
+# asyncpg insert
+# ----------------------
+class AsyncpgWriter:
+    """
+    Store a WeatherBatch through an asyncpg pool: COPY into the temporary
+    staging table, then merge_statement, in one transaction. Duplicate
+    handling and the rollup are the same as bulk_insert_weather_records.
+    Returns the number of new rows; connection errors are retried
+    DB_RETRIES times, other database errors raise.
+    """
+
+    def __init__(self, pool, metrics: tuple[str, ...] | None = None):
+        from weather_analyzer.db.insert_weather import STAGE_TABLE, merge_statement, stage_table_ddl
+
+        self.pool = pool
+        self.metrics = selected_metrics() if metrics is None else metrics
+        self.columns = list(row_columns(self.metrics))
+        self.stage_table = STAGE_TABLE
+        self.stage_ddl = stage_table_ddl(self.metrics)
+        self.merge = merge_statement(STAGE_TABLE, tuple(self.columns))
+
+    async def __call__(self, batch: WeatherBatch) -> int:
+        import asyncpg
+
+        attempts = max(1, settings.DB_RETRIES)
+        for attempt in range(1, attempts + 1):
+            try:
+                async with self.pool.acquire() as conn:
+                    async with conn.transaction():
+                        await conn.execute(self.stage_ddl)
+                        await conn.copy_records_to_table(
+                            self.stage_table, records=batch.rows(self.metrics), columns=self.columns
+                        )
+                        return await conn.fetchval(self.merge)
+
+            except (OSError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError) as e:
+                logger.warning(f"DB connection attempt {attempt}/{attempts} failed: {e}")
+                if attempt == attempts:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+
+def prepare_write_schema() -> None:
+    """ensure_write_schema (and the rollup table) once, before writers start."""
+    from weather_analyzer.db.pool import connection
+    from weather_analyzer.db.rollup import ensure_rollup_table, forget_rollup_table
+    from weather_analyzer.db.schema import ensure_write_schema, forget_write_schema
+
+    try:
+        with connection() as db:
+            with db.cursor() as cur:
+                ensure_write_schema(cur)
+                if settings.ROLLUP_ENABLED:
+                    ensure_rollup_table(cur)
+    except Exception:
+        # Rolled back: whatever was created in this transaction is gone
+        forget_write_schema()
+        forget_rollup_table()
+        raise
+
+
+async def create_pool(size: int | None = None, **kwargs):
+    """asyncpg pool from the DB_* settings; extra kwargs go to asyncpg.create_pool."""
+    import asyncpg
+
+    size = size or settings.ASYNC_DB_WRITERS
+    return await asyncpg.create_pool(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        database=settings.DB_NAME,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        min_size=1,
+        max_size=size,
+        **kwargs,
+    )
+
+
+# ----------------------
+# Entry point
+# ----------------------
+async def run_async_pipeline(
+    cities: list[str],
+    raw_output: str | None = None,
+    concurrency: int | None = None,
+    observations: ObservationCache | None = None,
+    pool=None,
+) -> dict:
+    """
+    Fetch and store `cities` with AsyncPipeline over aiohttp and asyncpg.
+
+    - raw_output: raw archive folder; every payload is appended as it arrives
+    - observations: per-process ObservationCache for OBSERVATION_DEDUP
+    - pool: an asyncpg pool to use instead of one built from DB_* settings
+    Returns the AsyncPipeline stats (fetched, inserted, first_row_seconds ...).
+    """
+    import aiohttp
+
+    concurrency = concurrency or settings.FETCH_CONCURRENCY
+    writers = settings.ASYNC_DB_WRITERS
+
+    # The schema checks use the synchronous helpers; run them off the loop
+    await asyncio.to_thread(prepare_write_schema)
+
+    archive = None
+    if raw_output:
+        try:
+            archive = RawArchive(raw_output)
+        except Exception as e:
+            logger.warning(f"Raw archive unavailable: {e}")
+
+    def archive_payload(city: str, data: dict) -> None:
+        try:
+            archive.write(city, data)
+        except Exception as e:
+            logger.warning(f"Failed to archive raw payload for {city}: {e}")
+
+    own_pool = pool is None
+    if own_pool:
+        pool = await create_pool(writers)
+    try:
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=concurrency),
+            timeout=aiohttp.ClientTimeout(total=settings.REQUEST_TIMEOUT),
+        ) as session:
+            # Same quota as the threaded client: one API key, one budget
+            fetcher = AsyncWeatherFetcher(session, rate_limiter=get_client().rate_limiter, cache=get_cache())
+            pipeline = AsyncPipeline(
+                fetcher.fetch,
+                AsyncpgWriter(pool),
+                concurrency=concurrency,
+                writers=writers,
+                on_payload=archive_payload if archive is not None else None,
+                observations=observations,
+            )
+            stats = await pipeline.run(cities)
+    finally:
+        if own_pool:
+            await pool.close()
+        if archive is not None:
+            try:
+                await asyncio.to_thread(archive.close)
+            except Exception as e:
+                logger.warning(f"Failed to finalize raw archive: {e}")
+
+    fetcher.log_stats()
+    if get_cache() is not None:
+        get_cache().log_stats()
+    first_row = stats["first_row_seconds"]
+    logger.info(
+        f"Async pipeline: {stats['inserted']} new rows from {stats['fetched']}/{len(cities)} cities "
+        f"in {stats['batches']} batches; first row after "
+        + (f"{first_row:.3f}s" if first_row is not None else "never")
+        + f", total {stats['seconds']:.2f}s"
+    )
+    return stats
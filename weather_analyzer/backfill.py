@@ -0,0 +1,337 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from weather_analyzer.archive import archive_files, iter_archive_file
+from weather_analyzer.db.insert_weather import insert_weather_records, bulk_insert_weather_records
+from weather_analyzer.metrics import METRICS
+from weather_analyzer.records import WeatherBatch
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Backfill historical weather records into PostgreSQL"
+    )
+
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--input",
+        help="CSV file with columns city,temperature,fetched_at and optionally humidity or other metrics"
+    )
+    source.add_argument(
+        "--archive",
+        help="Folder of raw API payloads: daily raw_weather_*.ndjson.gz files and legacy raw_weather_*.json snapshots"
+    )
+
+    parser.add_argument(
+        "--insert-mode",
+        choices=["batch", "copy"],
+        default="copy",
+        help="copy (default): COPY into a staging table then merge, batch: multi-row INSERT"
+    )
+
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=None,
+        help="Rows per load transaction (default: BULK_BATCH_ROWS)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Archive parsing processes (default: BACKFILL_WORKERS, 0 = one per CPU)"
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Progress file for resuming an archive backfill (default: BACKFILL_CHECKPOINT_PATH)"
+    )
+
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint and replay the whole archive"
+    )
+
+    return parser.parse_args()
+
+
+def _optional(value: str, cast):
+    return cast(value) if value not in ("", None) else None
+
+
+def read_csv_records(path: str) -> Iterator[dict]:
+    """Stream processed records from a CSV file without loading it whole."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                yield {
+                    "city": row["city"],
+                    # Metric columns are optional: absent or empty reads as NULL
+                    **{
+                        name: _optional(row.get(name), int if metric.integer else float)
+                        for name, metric in METRICS.items()
+                    },
+                    "observed_at": _optional(row.get("observed_at"), datetime.fromisoformat),
+                    "fetched_at": datetime.fromisoformat(row["fetched_at"]),
+                }
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping malformed CSV row {row}: {e}")
+
+
+def load_records(records: Iterator[dict], insert_mode: str = "copy", batch_rows: int | None = None) -> int:
+    """
+    Load records in transactions of `batch_rows`, logging throughput as it goes.
+    Returns the number of new rows (duplicates are skipped by ON CONFLICT).
+    """
+    batch_rows = batch_rows or settings.BULK_BATCH_ROWS
+    insert = bulk_insert_weather_records if insert_mode == "copy" else insert_weather_records
+
+    start = time.perf_counter()
+    total_read = total_inserted = 0
+
+    while True:
+        batch = list(islice(records, batch_rows))
+        if not batch:
+            break
+
+        total_inserted += insert(batch)
+        total_read += len(batch)
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Backfill progress: {total_read} rows read, {total_inserted} inserted "
+            f"({total_read / elapsed:,.0f} rows/sec)"
+        )
+
+    return total_inserted
+
+
+# ----------------------
+# Raw archive replay
+# ----------------------
+LEGACY_PATTERN = "raw_weather_*.json"
+
+
+def raw_files(folder: str | Path) -> list[Path]:
+    """Legacy per-run JSON snapshots, then the daily gzip NDJSON archive."""
+    return sorted(Path(folder).glob(LEGACY_PATTERN)) + archive_files(folder)
+
+
+def _legacy_snapshot_time(path: Path) -> datetime | None:
+    # raw_weather_YYYYmmdd_HHMMSS.json is named from the writer's local clock;
+    # read it in this machine's local zone (TZ) and store it as naive UTC
+    try:
+        local = datetime.strptime(path.stem[len("raw_weather_"):], "%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _naive_utc(value: str) -> datetime:
+    moment = datetime.fromisoformat(value)
+    return moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def parse_raw_file(path: str | Path) -> tuple[WeatherBatch, int]:
+    """
+    Records from one raw file as a columnar batch (cheap to send back from
+    a worker process), each stamped with its payload's observation time
+    (`dt`); the snapshot / archive time is only a fallback.
+    Returns (batch, payloads skipped as malformed); an unreadable file
+    (truncated or invalid JSON) is skipped and counts as one.
+    """
+    path = Path(path)
+
+    if path.name.endswith(".json"):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payloads = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable raw file {path}: {e}")
+            return WeatherBatch.from_payloads([]), 1
+        if not isinstance(payloads, list):
+            payloads = [payloads]
+        fetched_at = _legacy_snapshot_time(path)
+    else:
+        payloads, fetched_at = [], []
+        for entry in iter_archive_file(path):
+            payloads.append(entry.get("data") if isinstance(entry, dict) else None)
+            fetched_at.append(_naive_utc(entry["fetched_at"]) if isinstance(entry, dict) and entry.get("fetched_at") else None)
+
+    batch = WeatherBatch.from_payloads(payloads, fetched_at=fetched_at, use_observation_time=True)
+    return batch, len(payloads) - len(batch)
+
+
+class BackfillCheckpoint:
+    """
+    Raw files already loaded, saved atomically after every committed batch.
+    A file counts as done only while its size and mtime are unchanged, so
+    a day file that kept growing after it was loaded is replayed (safely:
+    loads are idempotent).
+    """
+
+    def __init__(self, path: str | Path, restart: bool = False):
+        self.path = Path(path)
+        self._done: dict[str, dict] = {}
+        if self.path.exists() and not restart:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._done = json.load(f).get("done", {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable backfill checkpoint {self.path}: {e}")
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(path.resolve())
+
+    @staticmethod
+    def _signature(path: Path) -> dict:
+        stat = path.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def is_done(self, path: Path) -> bool:
+        return self._done.get(self._key(path)) == self._signature(path)
+
+    def mark(self, paths: Iterable[Path]) -> None:
+        for path in paths:
+            self._done[self._key(path)] = self._signature(path)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"done": self._done}, f, sort_keys=True)
+        tmp_path.replace(self.path)
+
+
+def _parsed(files: list[Path], workers: int) -> Iterator[tuple[Path, tuple[WeatherBatch, int]]]:
+    """(path, parse_raw_file(path)) in file order, at most 2 × workers files parsed ahead."""
+    if workers <= 1:
+        for path in files:
+            yield path, parse_raw_file(path)
+        return
+
+    # spawn: workers start clean instead of inheriting pool connections and threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending: deque = deque()
+        remaining = iter(files)
+        for path in islice(remaining, 2 * workers):
+            pending.append((path, pool.submit(parse_raw_file, path)))
+        while pending:
+            path, future = pending.popleft()
+            result = future.result()
+            for next_path in islice(remaining, 1):
+                pending.append((next_path, pool.submit(parse_raw_file, next_path)))
+            yield path, result
+
+
+def backfill_archive(
+    folder: str | Path,
+    insert_mode: str = "copy",
+    batch_rows: int | None = None,
+    workers: int | None = None,
+    checkpoint_path: str | Path | None = None,
+    restart: bool = False,
+    insert: Callable[..., int] | None = None,
+) -> dict[str, int]:
+    """
+    Replay archived raw payloads into weather_summary.
+
+    - Files are parsed in parallel worker processes (BACKFILL_WORKERS)
+    - fetched_at is the observation time from each payload's `dt`
+    - Records are loaded in strict transactions of about `batch_rows`
+      (COPY + merge by default); ON CONFLICT makes reloads harmless
+    - After each committed batch its files are added to the checkpoint,
+      so a crashed backfill resumes with the first unloaded file
+    Returns counts of files, loaded files, records, new rows and malformed payloads.
+    """
+    batch_rows = batch_rows or settings.BULK_BATCH_ROWS
+    workers = workers if workers is not None else settings.BACKFILL_WORKERS
+    workers = workers or os.cpu_count() or 1
+    if insert is None:
+        insert = bulk_insert_weather_records if insert_mode == "copy" else insert_weather_records
+
+    checkpoint = BackfillCheckpoint(checkpoint_path or settings.BACKFILL_CHECKPOINT_PATH, restart=restart)
+    files = raw_files(folder)
+    todo = [path for path in files if not checkpoint.is_done(path)]
+    logger.info(f"Archive backfill: {len(todo)} of {len(files)} files to load from {folder} ({workers} workers)")
+
+    stats = {"files": len(files), "loaded_files": 0, "records": 0, "inserted": 0, "malformed": 0}
+    batches: list[WeatherBatch] = []
+    batch_files: list[Path] = []
+    start = time.perf_counter()
+
+    def commit() -> None:
+        batch = WeatherBatch.concat(batches)
+        if len(batch):
+            stats["inserted"] += insert(batch, strict=True)
+        checkpoint.mark(batch_files)
+        checkpoint.save()
+        stats["loaded_files"] += len(batch_files)
+        stats["records"] += len(batch)
+        batches.clear()
+        batch_files.clear()
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Backfill progress: {stats['loaded_files']}/{len(todo)} files, {stats['records']} records, "
+            f"{stats['inserted']} inserted ({stats['records'] / elapsed:,.0f} records/sec)"
+        )
+
+    for path, (parsed, malformed) in _parsed(todo, workers):
+        batches.append(parsed)
+        batch_files.append(path)
+        stats["malformed"] += malformed
+        if sum(map(len, batches)) >= batch_rows:
+            commit()
+    if batch_files:
+        commit()
+
+    return stats
+
+
+def main():
+    args = parse_args()
+
+    if args.archive:
+        logger.info(f"Backfill started from archive {args.archive} ({args.insert_mode} mode)")
+        stats = backfill_archive(
+            args.archive,
+            insert_mode=args.insert_mode,
+            batch_rows=args.batch_rows,
+            workers=args.workers,
+            checkpoint_path=args.checkpoint,
+            restart=args.restart,
+        )
+        logger.info(
+            f"Backfill completed: {stats['inserted']} new records from {stats['loaded_files']} files "
+            f"({stats['malformed']} malformed payloads skipped)"
+        )
+        return
+
+    logger.info(f"Backfill started from {args.input} ({args.insert_mode} mode)")
+
+    inserted = load_records(read_csv_records(args.input), args.insert_mode, args.batch_rows)
+
+    logger.info(f"Backfill completed: {inserted} new records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Protocol
+
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    payload: dict
+    stored_at: float
+    expires_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> CacheEntry | None: ...
+    def put(self, key: str, entry: CacheEntry) -> None: ...
+
+
+# ----------------------
+# Backends
+# ----------------------
+class MemoryCache:
+    """In-process LRU: only helps long-lived processes such as the scheduler."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DiskCache:
+    """
+    SQLite-backed LRU shared by every process on the host
+    (scheduler, manual runs, backfills).
+    """
+
+    def __init__(self, path: str | Path, max_entries: int, clock: Callable[[], float] = time.time):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS weather_cache (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, stored_at, expires_at, etag, last_modified FROM weather_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE weather_cache SET last_access = ? WHERE key = ?", (self.clock(), key))
+            self._conn.commit()
+
+        payload, stored_at, expires_at, etag, last_modified = row
+        return CacheEntry(json.loads(payload), stored_at, expires_at, etag, last_modified)
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO weather_cache
+                    (key, payload, stored_at, expires_at, etag, last_modified, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, json.dumps(entry.payload), entry.stored_at, entry.expires_at,
+                 entry.etag, entry.last_modified, self.clock()),
+            )
+            self._conn.execute(
+                """
+                DELETE FROM weather_cache WHERE key IN (
+                    SELECT key FROM weather_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+
+# ----------------------
+# Weather cache
+# ----------------------
+class WeatherCache:
+    """
+    Response cache in front of the API, keyed by (city, units).
+
+    - An entry is fresh until the provider is expected to publish the next
+      observation (payload `dt` + OBSERVATION_REFRESH_SECONDS), clamped
+      between CACHE_MIN_TTL_SECONDS and CACHE_TTL_SECONDS after storing
+    - Stale entries with an ETag / Last-Modified are revalidated with a
+      conditional request instead of a full download
+    - Hit / miss / revalidation counters are reported through the logger
+    """
+
+    def __init__(self, backend: CacheBackend, clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "revalidated": 0}
+
+    @staticmethod
+    def key(city: str, units: str | None = None) -> str:
+        return f"{city.strip().lower()}|{units or settings.UNITS}"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _expires_at(self, payload: dict, stored_at: float) -> float:
+        ttl_expiry = stored_at + settings.CACHE_TTL_SECONDS
+        observed_at = payload.get("dt")
+        if not isinstance(observed_at, (int, float)):
+            return ttl_expiry
+
+        next_observation = observed_at + settings.OBSERVATION_REFRESH_SECONDS
+        return min(max(next_observation, stored_at + settings.CACHE_MIN_TTL_SECONDS), ttl_expiry)
+
+    def get(self, city: str) -> dict | None:
+        """Fresh cached payload for a city, or None (counted as a miss)."""
+        entry = self.backend.get(self.key(city))
+        if entry is not None and entry.expires_at > self.clock():
+            self._count("hits")
+            return entry.payload
+
+        self._count("misses")
+        return None
+
+    def revalidation_headers(self, city: str) -> dict:
+        """Conditional request headers for a stale entry, if the server gave us validators."""
+        entry = self.backend.get(self.key(city))
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def revalidated(self, city: str) -> dict | None:
+        """Server answered 304: extend the stored entry and return its payload."""
+        entry = self.backend.get(self.key(city))
+        if entry is None:
+            return None
+
+        now = self.clock()
+        entry.stored_at = now
+        entry.expires_at = max(self._expires_at(entry.payload, now), now + settings.CACHE_MIN_TTL_SECONDS)
+        self.backend.put(self.key(city), entry)
+        self._count("revalidated")
+        return entry.payload
+
+    def put(self, city: str, payload: dict, headers: dict | None = None) -> None:
+        headers = headers or {}
+        now = self.clock()
+        self.backend.put(
+            self.key(city),
+            CacheEntry(
+                payload=payload,
+                stored_at=now,
+                expires_at=self._expires_at(payload, now),
+                etag=headers.get("ETag"),
+                last_modified=headers.get("Last-Modified"),
+            ),
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def log_stats(self) -> None:
+        stats = self.stats()
+        lookups = stats["hits"] + stats["misses"]
+        if not lookups:
+            return
+        logger.info(
+            f"Weather cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['revalidated']} revalidated ({stats['hits'] / lookups:.0%} hit rate)"
+        )
+
+
+_cache: WeatherCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> WeatherCache | None:
+    """Process-wide cache for the configured CACHE_BACKEND, or None when disabled."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            backend = settings.CACHE_BACKEND.lower()
+            if backend == "memory":
+                _cache = WeatherCache(MemoryCache(settings.CACHE_MAX_ENTRIES))
+            elif backend == "disk":
+                _cache = WeatherCache(DiskCache(settings.CACHE_PATH, settings.CACHE_MAX_ENTRIES))
+            elif backend != "none":
+                raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
+        return _cache
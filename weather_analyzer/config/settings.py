@@ -22,6 +22,7 @@ class Settings(BaseSettings):
     # ----------------------
     WEATHER_API_KEY: str
     WEATHER_API_URL: str = "https://api.openweathermap.org/data/2.5/weather"
+    WEATHER_GROUP_API_URL: str = "https://api.openweathermap.org/data/2.5/group"
     UNITS: str = "metric"
 
     # ----------------------
@@ -30,6 +31,13 @@ class Settings(BaseSettings):
     # Default cities if nothing is provided in .env or CLI
     CITIES: List[str] = ["Stockholm", "London", "New York"]
 
+    # ----------------------
+    # Metrics
+    # ----------------------
+    # Observation fields stored per row (registry: weather_analyzer/metrics.py);
+    # new ones become nullable weather_summary columns on first use
+    METRICS: List[str] = ["temperature", "humidity", "pressure", "wind_speed", "wind_deg", "clouds", "rain_1h", "snow_1h"]
+
     # ----------------------
     # PostgreSQL
     # ----------------------
@@ -38,22 +46,78 @@ class Settings(BaseSettings):
     DB_NAME: str
     DB_USER: str
     DB_PASSWORD: str
+    DB_CONNECT_TIMEOUT: int = 10
+    DB_POOL_MIN_SIZE: int = 0
+    DB_POOL_MAX_SIZE: int = 5
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_HEALTH_CHECK_SECONDS: float = 30.0
 
     # ----------------------
     # Pipeline Behavior
     # ----------------------
     REQUEST_TIMEOUT: int = 10
     API_RETRIES: int = 3
+    API_BACKOFF_FACTOR: float = 1.0
+    FETCH_CONCURRENCY: int = 8
+    API_RATE_LIMIT_PER_MINUTE: int = Field(60, description="client-side API quota, 0 = unlimited")
+    API_RATE_BURST: int = 5
+    API_ADAPTIVE_CONCURRENCY: bool = True
+    API_MIN_CONCURRENCY: int = 1
+    FETCH_MODE: str = Field("single", description="single | group")
+    GROUP_CHUNK_SIZE: int = 20
+    CITY_ID_CACHE_PATH: str = "data/cache/city_ids.json"
+    CACHE_BACKEND: str = Field("memory", description="none | memory | disk")
+    CACHE_PATH: str = "data/cache/weather_cache.sqlite3"
+    CACHE_TTL_SECONDS: int = 600
+    CACHE_MIN_TTL_SECONDS: int = 60
+    CACHE_MAX_ENTRIES: int = 10000
+    OBSERVATION_REFRESH_SECONDS: int = 600
+    HTTP_POOL_CONNECTIONS: int = 4
+    HTTP_POOL_MAXSIZE: int = 16
+    HTTP_KEEPALIVE: bool = True
     DB_RETRIES: int = 3
-    SCHEDULER_INTERVAL_MINUTES: int = 10
+    INSERT_MODE: str = Field("batch", description="batch | copy")
+    OBSERVATION_DEDUP: bool = Field(True, description="store each (city, provider dt) observation once")
+    BULK_BATCH_ROWS: int = 100_000
+    PIPELINE_MODE: str = Field("phased", description="phased | async")
+    ASYNC_BATCH_ROWS: int = 200
+    ASYNC_BATCH_MS: int = Field(200, description="longest a fetched payload waits for its insert batch")
+    ASYNC_QUEUE_SIZE: int = Field(256, description="payloads buffered between the async fetch and insert stages")
+    ASYNC_DB_WRITERS: int = 2
+    BACKFILL_WORKERS: int = Field(0, description="0 = one archive parsing process per CPU")
+    BACKFILL_CHECKPOINT_PATH: str = "data/cache/backfill_checkpoint.json"
+    ROLLUP_ENABLED: bool = True
+    PARTITION_PREMAKE_MONTHS: int = 3
+    RETENTION_MONTHS: int = Field(0, description="0 keeps raw history forever")
+    RETENTION_MODE: str = Field("detach", description="drop | detach")
+    SCHEDULER_INTERVAL_MINUTES: int = Field(10, description="ingestion cadence (fetch + persist)")
+    ANALYTICS_SCHEDULE_AT: str = Field("21:32", description="HH:MM local time for the nightly analytics run")
+    ANALYTICS_INTERVAL_MINUTES: int = Field(0, description="0 = daily at ANALYTICS_SCHEDULE_AT")
+    SCHEDULER_MISSED_POLICY: str = Field("skip", description="skip | catch_up")
+    SCHEDULER_MAX_CATCH_UP: int = 3
+    SHARDING_ENABLED: bool = Field(False, description="split CITIES across scheduler replicas")
+    SHARD_COUNT: int = 64
+    SHARD_LOCK_NAMESPACE: int = Field(57_717, description="first advisory-lock key used for shard locks")
+    ANALYTICS_MODE: str = Field("full", description="full | incremental | rollup")
+    ANALYTICS_STATE_PATH: str = "data/analytics/trend_state.sqlite3"
+    ANALYTICS_LOOKBACK_DAYS: int = Field(1, description="whole days before the watermark re-read each incremental run")
+    HISTORY_CHUNK_ROWS: int = 100_000
+    HISTORY_SOURCE: str = Field("postgres", description="postgres | parquet")
+    PARQUET_EXPORT: bool = False
+    PARQUET_ROOT: str = "data/parquet/weather_summary"
+    PARQUET_COMPRESSION: str = Field("zstd", description="zstd | snappy | gzip | none")
+    PARQUET_ROW_GROUP_ROWS: int = 1_000_000
+    PLOT_WORKERS: int = Field(0, description="0 = one rendering process per CPU")
+    RENDER_MODE: str = Field("inprocess", description="inprocess | subprocess")
+    OVERVIEW_DAYS: int = Field(7, description="days of raw rows on the overview chart unless ANALYTICS_MODE=full; 0 = all")
 
     # ----------------------
     # Validators
     # ----------------------
-    @validator("CITIES", pre=True)
+    @validator("CITIES", "METRICS", pre=True)
     def split_cities(cls, value):
         """
-        Allows CITIES to be defined as:
+        Allows CITIES (and METRICS) to be defined as:
         CITIES=Berlin,Paris,Tokyo
         in .env or environment variables.
         """
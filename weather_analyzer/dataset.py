@@ -0,0 +1,249 @@
+import argparse
+import os
+from datetime import date, datetime, time as dt_time, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+# pyarrow, pandas and the database layer are imported on first use, so
+# entry points that never touch the dataset do not pay for them
+
+PARTITION = "date"
+PART_FILE = "part-0.parquet"
+
+
+def _arrow_type(column: str):
+    import pyarrow as pa
+    from weather_analyzer.db.history import HISTORY_DTYPES
+
+    if column == "city":
+        return pa.dictionary(pa.int32(), pa.string())
+    if column in ("fetched_at", "observed_at"):
+        return pa.timestamp("us")
+    # float32 / Int8 / Int16 history dtypes map onto the same-width Arrow types
+    return pa.type_for_alias(HISTORY_DTYPES[column].lower())
+
+
+def _schema(columns: list[str]):
+    import pyarrow as pa
+
+    return pa.schema([(column, _arrow_type(column)) for column in columns])
+
+
+def partition_path(root: str | Path, day: date) -> Path:
+    return Path(root) / f"{PARTITION}={day.isoformat()}" / PART_FILE
+
+
+def partitions(root: str | Path) -> list[date]:
+    """Days present in the dataset, oldest first."""
+    days = []
+    for path in Path(root).glob(f"{PARTITION}=*/{PART_FILE}"):
+        try:
+            days.append(date.fromisoformat(path.parent.name.split("=", 1)[1]))
+        except ValueError:
+            continue
+    return sorted(days)
+
+
+# ----------------------
+# Export
+# ----------------------
+def _write_day(frame: "pd.DataFrame", root: Path, day: date) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(frame, schema=_schema(list(frame.columns)), preserve_index=False)
+    path = partition_path(root, day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{PART_FILE}.tmp")  # dot files are ignored by dataset discovery
+    pq.write_table(
+        table,
+        tmp_path,
+        compression=settings.PARQUET_COMPRESSION,
+        use_dictionary=["city"],
+        row_group_size=settings.PARQUET_ROW_GROUP_ROWS,
+    )
+    # Readers see either the previous or the new file, never a partial one
+    os.replace(tmp_path, path)
+    return table.num_rows
+
+
+def export_history(
+    root: str | Path | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    full: bool = False,
+    conn=None,
+) -> dict[str, int]:
+    """
+    Export weather_summary into a Parquet dataset partitioned by day
+    (<root>/date=YYYY-MM-DD/part-0.parquet).
+
+    - Whole days are written; start / end are inclusive dates
+    - Without start, export resumes at the newest exported day (it may have
+      been partial) unless `full` re-exports everything
+    - Rows are streamed from a server-side cursor; one day is held in memory
+    - Each day file is rewritten atomically, so re-exports are idempotent
+    - city is dictionary-encoded, data compressed with PARQUET_COMPRESSION
+    - Days dropped from Postgres by retention stay in the dataset
+    Returns {"days", "rows"} written.
+    """
+    import numpy as np
+    from weather_analyzer.db.history import concat_history, iter_history
+
+    root = Path(root or settings.PARQUET_ROOT)
+    if start is None and not full:
+        exported = partitions(root)
+        start = exported[-1] if exported else None
+
+    window_start = datetime.combine(start, dt_time.min) if start else None
+    window_end = datetime.combine(end + timedelta(days=1), dt_time.min) if end else None
+
+    written = {"days": 0, "rows": 0}
+    pending: list = []
+    pending_day: date | None = None
+
+    def flush() -> None:
+        if pending:
+            written["rows"] += _write_day(concat_history(pending), root, pending_day)
+            written["days"] += 1
+            pending.clear()
+
+    for chunk in iter_history(start=window_start, end=window_end, conn=conn):
+        if chunk.empty:
+            continue
+        # Chunks arrive ordered by fetched_at, so each day is one contiguous run
+        days = chunk["fetched_at"].to_numpy().astype("datetime64[D]")
+        bounds = np.concatenate(([0], np.flatnonzero(days[1:] != days[:-1]) + 1, [len(chunk)]))
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            day = days[a].astype(object)  # datetime.date
+            if day != pending_day:
+                flush()
+                pending_day = day
+            pending.append(chunk.iloc[a:b].copy())  # concat_history aligns categories in place
+    flush()
+
+    logger.info(f"Exported {written['rows']} rows in {written['days']} day partitions to {root}")
+    return written
+
+
+# ----------------------
+# Read
+# ----------------------
+def read_dataset(
+    root: str | Path | None = None,
+    cities: list[str] | None = None,
+    start=None,
+    end=None,
+    since=None,
+    columns: list[str] | None = None,
+) -> "pd.DataFrame":
+    """
+    History from the Parquet dataset, with the same filters and compact
+    dtypes as db.history.read_history.
+
+    - Time bounds prune whole day partitions before any file is opened,
+      and are pushed down to row-group statistics inside the files
+    - Only the requested columns are decoded
+    - Metric columns missing from older day files (or the whole dataset)
+      read as missing values
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from weather_analyzer.db.history import HISTORY_DTYPES, concat_history, history_columns
+
+    root = Path(root or settings.PARQUET_ROOT)
+    columns = list(columns or history_columns())
+    unknown = set(columns) - set(HISTORY_DTYPES)
+    if unknown:
+        raise ValueError(f"Unknown history columns: {sorted(unknown)}")
+    if not partitions(root):
+        logger.warning(f"No Parquet history under {root}")
+        return concat_history([], columns)
+
+    conditions = []
+    lower = max((pd.Timestamp(t) for t in (start, since) if t is not None), default=None)
+    if lower is not None:
+        conditions.append(ds.field(PARTITION) >= pa.scalar(lower.date()))
+    if end is not None:
+        conditions.append(ds.field(PARTITION) <= pa.scalar(pd.Timestamp(end).date()))
+    if cities:
+        conditions.append(ds.field("city").isin(list(cities)))
+    if start is not None:
+        conditions.append(ds.field("fetched_at") >= pa.scalar(pd.Timestamp(start).to_pydatetime(), pa.timestamp("us")))
+    if end is not None:
+        conditions.append(ds.field("fetched_at") < pa.scalar(pd.Timestamp(end).to_pydatetime(), pa.timestamp("us")))
+    if since is not None:
+        conditions.append(ds.field("fetched_at") > pa.scalar(pd.Timestamp(since).to_pydatetime(), pa.timestamp("us")))
+
+    # An explicit schema lets day files written before a metric was added
+    # be read alongside newer ones: their missing columns come back null
+    partitioning = ds.partitioning(pa.schema([(PARTITION, pa.date32())]), flavor="hive")
+    schema = pa.schema([(column, _arrow_type(column)) for column in HISTORY_DTYPES] + [(PARTITION, pa.date32())])
+    dataset = ds.dataset(root, schema=schema, format="parquet", partitioning=partitioning)
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    table = dataset.to_table(columns=columns, filter=expression)
+
+    df = table.to_pandas(types_mapper={pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype()}.get)
+    if "city" in df:
+        df["city"] = df["city"].astype("category")
+    if "observed_at" in df:
+        df["observed_at"] = df["observed_at"].astype("datetime64[ns]")
+    if "fetched_at" in df:
+        df["fetched_at"] = df["fetched_at"].astype("datetime64[ns]")
+        if not df["fetched_at"].is_monotonic_increasing:
+            df = df.sort_values("fetched_at", kind="stable", ignore_index=True)
+
+    logger.info(f"Read {len(df)} history rows from Parquet ({df.memory_usage(deep=True).sum() / 1e6:.1f} MB)")
+    return df
+
+
+def load_history(
+    cities: list[str] | None = None,
+    start=None,
+    end=None,
+    since=None,
+    columns: list[str] | None = None,
+    conn=None,
+    source: str | None = None,
+) -> "pd.DataFrame":
+    """History from HISTORY_SOURCE: "postgres" (read_history) or "parquet" (read_dataset)."""
+    source = source or settings.HISTORY_SOURCE
+    if source == "parquet":
+        return read_dataset(cities=cities, start=start, end=end, since=since, columns=columns)
+    if source != "postgres":
+        raise ValueError(f"Unknown history source: {source}")
+
+    from weather_analyzer.db.history import read_history
+    return read_history(cities=cities, start=start, end=end, since=since, columns=columns, conn=conn)
+
+
+# ----------------------
+# CLI
+# ----------------------
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export weather_summary to a date-partitioned Parquet dataset")
+    parser.add_argument("--root", default=None, help="Dataset directory (default: PARQUET_ROOT)")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="First day to export (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last day to export (YYYY-MM-DD)")
+    parser.add_argument("--full", action="store_true", help="Re-export all history instead of resuming")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    export_history(root=args.root, start=args.start, end=args.end, full=args.full)
+
+
+if __name__ == "__main__":
+    main()
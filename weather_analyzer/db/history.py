@@ -0,0 +1,151 @@
+from itertools import count
+from typing import Iterator
+
+import pandas as pd
+
+from weather_analyzer.db.pool import connection
+from weather_analyzer.db.schema import table_columns
+from weather_analyzer.metrics import METRICS, selected_metrics
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+# Compact in-memory types for history reads
+HISTORY_DTYPES = {
+    "city": "category",
+    **{name: metric.dtype for name, metric in METRICS.items()},
+    "observed_at": "datetime64[ns]",  # read on request only
+    "fetched_at": "datetime64[ns]",
+}
+
+
+def history_columns() -> list[str]:
+    """Columns read by default: city, the stored metrics (settings.METRICS), fetched_at."""
+    return ["city", *selected_metrics(), "fetched_at"]
+
+_cursor_ids = count()
+
+
+def _where(cities, since, start, end) -> tuple[str, dict]:
+    """fetched_at predicates stay plain comparisons so partitions can be pruned."""
+    conditions = []
+    params = {}
+    if cities:
+        conditions.append("city = ANY(%(cities)s)")
+        params["cities"] = list(cities)
+    if since is not None:
+        conditions.append("fetched_at > %(since)s")
+        params["since"] = since
+    if start is not None:
+        conditions.append("fetched_at >= %(start)s")
+        params["start"] = start
+    if end is not None:
+        conditions.append("fetched_at < %(end)s")
+        params["end"] = end
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+def _typed_frame(rows: list[tuple], columns: list[str]) -> pd.DataFrame:
+    data = {}
+    for column, values in zip(columns, zip(*rows)):
+        dtype = HISTORY_DTYPES.get(column)
+        if column in ("fetched_at", "observed_at"):
+            data[column] = pd.to_datetime(values)
+        elif dtype is not None:
+            data[column] = pd.array(values, dtype=dtype)
+        else:
+            data[column] = values
+    return pd.DataFrame(data, columns=columns)
+
+
+def iter_history(
+    cities: list[str] | None = None,
+    start=None,
+    end=None,
+    since=None,
+    columns: list[str] | None = None,
+    chunk_size: int | None = None,
+    conn=None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream weather_summary rows in chunks through a server-side cursor.
+
+    - cities: optional city filter
+    - start / end: half-open fetched_at window [start, end); since: strictly after
+    - columns: subset of HISTORY_DTYPES (default: history_columns())
+    Each chunk is a DataFrame with compact dtypes (categorical city,
+    float32 / nullable integer metrics, datetime64 fetched_at),
+    ordered by fetched_at. Only one chunk is held in memory at a time.
+    Selected metrics the table has no column for yet read as missing.
+    - conn: read on this connection instead of borrowing one from the pool
+    """
+    columns = list(columns or history_columns())
+    unknown = set(columns) - set(HISTORY_DTYPES)
+    if unknown:
+        raise ValueError(f"Unknown history columns: {sorted(unknown)}")
+    chunk_size = chunk_size or settings.HISTORY_CHUNK_ROWS
+    where, params = _where(cities, since, start, end)
+
+    with connection(conn) as conn:
+        finished = False
+        try:
+            with conn.cursor() as setup:
+                # The whole result is read, so plan for total time rather than
+                # the fast-start plans server-side cursors default to
+                setup.execute("SET LOCAL cursor_tuple_fraction = 1.0")
+                stored = set(table_columns(setup))
+
+            query = f"""
+                SELECT {", ".join(c if c in stored else f"NULL AS {c}" for c in columns)}
+                FROM weather_summary
+                {where}
+                ORDER BY fetched_at ASC
+            """
+            with conn.cursor(name=f"weather_history_{next(_cursor_ids)}") as cur:
+                cur.itersize = chunk_size
+                cur.execute(query, params)
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield _typed_frame(rows, columns)
+            finished = True
+        finally:
+            if not finished:
+                # The caller stopped early (GeneratorExit is not an Exception, so
+                # connection() would commit nothing and roll back nothing): end
+                # the transaction here before the connection is reused
+                conn.rollback()
+
+
+def concat_history(chunks, columns: list[str] | None = None) -> pd.DataFrame:
+    """Concatenate history chunks, keeping categorical columns categorical across chunks."""
+    chunks = list(chunks)
+    if not chunks:
+        columns = list(columns or history_columns())
+        return pd.DataFrame({c: pd.Series(dtype=HISTORY_DTYPES[c]) for c in columns})
+
+    for column in chunks[0].columns:
+        if isinstance(chunks[0][column].dtype, pd.CategoricalDtype):
+            # Align every chunk on the union of categories so concat stays compact
+            categories = pd.Index(sorted(set().union(*(chunk[column].cat.categories for chunk in chunks))))
+            for chunk in chunks:
+                chunk[column] = chunk[column].cat.set_categories(categories)
+
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_history(
+    cities: list[str] | None = None,
+    start=None,
+    end=None,
+    since=None,
+    columns: list[str] | None = None,
+    chunk_size: int | None = None,
+    conn=None,
+) -> pd.DataFrame:
+    """iter_history() collected into one compact DataFrame."""
+    df = concat_history(iter_history(cities, start, end, since, columns, chunk_size, conn), columns)
+    logger.info(f"Read {len(df)} history rows ({df.memory_usage(deep=True).sum() / 1e6:.1f} MB)")
+    return df
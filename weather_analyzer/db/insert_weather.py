@@ -1,79 +1,263 @@
+import csv
+import io
 import time
+from itertools import islice
+from typing import Iterable, Iterator
+
 import psycopg2
-from psycopg2.extras import execute_batch
+from psycopg2.extras import execute_values
+from weather_analyzer.db.pool import connection
+from weather_analyzer.db.rollup import ROLLUP_UPSERT, ensure_rollup_table, forget_rollup_table
+from weather_analyzer.db.schema import OBSERVATION_KEYS, ensure_write_schema, forget_write_schema
+from weather_analyzer.metrics import METRICS, selected_metrics
+from weather_analyzer.records import WeatherBatch, row_columns
 from weather_analyzer.logger import get_logger
 from weather_analyzer.config.settings import settings
 
 logger = get_logger(__name__)
 
+STAGE_TABLE = "weather_summary_stage"
+
+
+def values_template(metrics: tuple[str, ...]) -> str:
+    # Explicit casts keep all-NULL columns typed inside the VALUES list of a CTE
+    casts = "".join(f", %s::{METRICS[metric].sql_type.lower()}" for metric in metrics)
+    return f"(%s{casts}, %s::timestamp, %s::timestamp)"
+
 
-def insert_weather_records(records: list[dict]) -> int:
+def stage_table_ddl(metrics: tuple[str, ...]) -> str:
+    """Transaction-scoped staging table that COPY writers load before merge_statement."""
+    metric_ddl = "".join(f"{metric} {METRICS[metric].sql_type}, " for metric in metrics)
+    return f"""
+        CREATE TEMP TABLE {STAGE_TABLE} (
+            city TEXT, {metric_ddl}observed_at TIMESTAMP, fetched_at TIMESTAMP
+        ) ON COMMIT DROP
+    """
+
+
+def merge_statement(source: str, columns: tuple[str, ...], prefix: str | None = None) -> str:
+    """
+    One statement moving rows from `source` (a CTE or table with
+    `columns`) into weather_summary, returning the number of new rows.
+
+    - With OBSERVATION_DEDUP, an observation (city, observed_at) already
+      in weather_observation_keys is skipped, as is a repeat within the
+      batch; rows without observed_at fall back to (city, fetched_at)
+    - With ROLLUP_ENABLED, new rows are folded into the daily rollup
+    - prefix: a leading CTE, e.g. the VALUES list `source` names
+    Data-modifying CTEs must sit at the top level, hence one flat WITH.
+    """
+    column_list = ", ".join(columns)
+    ctes = [prefix] if prefix else []
+    keep = "TRUE"
+    if settings.OBSERVATION_DEDUP:
+        # Claiming the key first makes concurrent writers of the same
+        # observation wait on each other; only the winner gets it back
+        ctes.append(f"""new_keys AS (
+            INSERT INTO {OBSERVATION_KEYS} (city, observed_at)
+            SELECT DISTINCT city, observed_at FROM {source} WHERE observed_at IS NOT NULL
+            ON CONFLICT DO NOTHING
+            RETURNING city, observed_at
+        )""")
+        keep = "observed_at IS NULL OR (city, observed_at) IN (SELECT city, observed_at FROM new_keys)"
+    ctes.append(f"""inserted AS (
+        INSERT INTO weather_summary ({column_list})
+        SELECT DISTINCT ON (city, coalesce(observed_at, fetched_at)) {column_list}
+        FROM {source}
+        WHERE {keep}
+        ON CONFLICT (city, fetched_at) DO NOTHING
+        RETURNING city, temperature, fetched_at
+    )""")
+    if settings.ROLLUP_ENABLED:
+        ctes.append(f"rolled_up AS ({ROLLUP_UPSERT})")
+    return f"WITH {', '.join(ctes)} SELECT count(*) FROM inserted"
+
+
+def record_values(records: "list[dict] | WeatherBatch", metrics: tuple[str, ...] | None = None) -> Iterable[tuple]:
+    """
+    (city, *metrics, observed_at, fetched_at) tuples for the stored metric set (default:
+    settings.METRICS), straight from a WeatherBatch's columns or from dicts.
+    A metric the records do not carry is written as NULL.
+    """
+    metrics = selected_metrics() if metrics is None else metrics
+    if isinstance(records, WeatherBatch):
+        return records.rows(metrics)
+    columns = row_columns(metrics)
+    return (tuple(row.get(column) for column in columns) for row in records)
+
+
+def insert_weather_records(records: "list[dict] | WeatherBatch", conn=None, strict: bool = False) -> int:
     """
     Insert processed weather records into PostgreSQL with
     retries, transaction safety, and partial failure tolerance.
     Ensures the logger reports the **actual inserted rows**,
-    ignoring duplicates handled by ON CONFLICT DO NOTHING.
+    ignoring duplicates: observations already stored (see
+    merge_statement) and rows handled by ON CONFLICT DO NOTHING.
+
+    The count comes from the INSERT's own RETURNING rows, so it costs
+    nothing extra and stays correct while other writers are inserting.
+
+    With `conn`, the insert runs on that caller-held connection in a
+    single attempt; retries only apply to pooled connections.
+    With `strict`, a failed insert raises instead of returning 0, so
+    callers that checkpoint progress can tell "nothing new" from "nothing written".
     """
 
     if not records:
         logger.warning("No records to insert into DB")
         return 0
 
-    db_config = {
-        "host": settings.DB_HOST,
-        "port": settings.DB_PORT,
-        "dbname": settings.DB_NAME,
-        "user": settings.DB_USER,
-        "password": settings.DB_PASSWORD,
-        "connect_timeout": 10,
-    }
-
-    sql = """
-        INSERT INTO weather_summary (city, temperature, humidity, fetched_at)
-        VALUES (%s, %s, %s, %s)
-        ON CONFLICT (city, fetched_at) DO NOTHING
+    metrics = selected_metrics()
+    columns = row_columns(metrics)
+    # One statement per page; one row per page carries its count
+    sql = merge_statement("batch", columns, prefix=f"batch ({', '.join(columns)}) AS (VALUES %s)")
+
+    values = list(record_values(records, metrics))
+    template = values_template(metrics)
+
+    attempts = settings.DB_RETRIES if conn is None else 1
+    error = None
+    for attempt in range(1, attempts + 1):
+        try:
+            with connection(conn) as db:
+                with db.cursor() as cur:
+                    ensure_write_schema(cur)
+                    if settings.ROLLUP_ENABLED:
+                        ensure_rollup_table(cur)
+                    returned = execute_values(cur, sql, values, template=template, page_size=50, fetch=True)
+                    inserted = sum(row[0] for row in returned)
+
+                    logger.info(f"{inserted} records inserted into PostgreSQL")
+                    return inserted
+
+        except psycopg2.OperationalError as e:
+            error = e
+            # A rollback also undid any table or column created in this attempt
+            forget_write_schema()
+            forget_rollup_table()
+            logger.warning(
+                f"DB connection attempt {attempt}/{attempts} failed: {e}"
+            )
+
+        except psycopg2.DatabaseError as e:
+            error = e
+            forget_write_schema()
+            forget_rollup_table()
+            logger.error(f"Database error: {e}")
+            break  # Do NOT retry on corrupted SQL or schema errors
+
+        # Exponential backoff
+        if attempt < attempts:
+            time.sleep(2 ** attempt)
+
+    logger.critical("Database permanently unavailable — records not inserted")
+    if strict:
+        raise RuntimeError("Weather records not inserted") from error
+    return 0
+
+
+class _CsvRecordStream:
     """
+    File-like view of records as CSV lines for COPY FROM STDIN.
+    Rows are formatted lazily as COPY reads, so the full payload is never
+    built in memory.
+    """
+
+    ROWS_PER_FILL = 1000
+
+    def __init__(self, records: "Iterable[dict] | WeatherBatch", metrics: tuple[str, ...] | None = None):
+        self._rows: Iterator[tuple] = iter(record_values(records, metrics))
+        self._buffer = ""
+        self._out = io.StringIO()
+        self._writer = csv.writer(self._out, lineterminator="\n")
 
-    values = [
-        (
-            row["city"],
-            row["temperature"],
-            row["humidity"],
-            row["fetched_at"],
+    def _fill(self) -> bool:
+        rows = list(islice(self._rows, self.ROWS_PER_FILL))
+        if not rows:
+            return False
+
+        self._out.seek(0)
+        self._out.truncate()
+        # Empty unquoted CSV field is NULL for COPY
+        self._writer.writerows(
+            ["" if value is None else value for value in row] for row in rows
         )
-        for row in records
-    ]
+        self._buffer += self._out.getvalue()
+        return True
 
-    for attempt in range(1, settings.DB_RETRIES + 1):
-        try:
-            with psycopg2.connect(**db_config) as conn:
-                with conn.cursor() as cur:
-                    # Capture row count **before insertion**
-                    cur.execute("SELECT COUNT(*) FROM weather_summary;")
-                    before_count = cur.fetchone()[0]
+    def read(self, size: int = -1) -> str:
+        while (size < 0 or len(self._buffer) < size) and self._fill():
+            pass
 
-                    execute_batch(cur, sql, values, page_size=50)
+        if size < 0:
+            chunk, self._buffer = self._buffer, ""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
 
-                    # Capture row count **after insertion**
-                    cur.execute("SELECT COUNT(*) FROM weather_summary;")
-                    after_count = cur.fetchone()[0]
+    readline = read
 
-                    inserted = after_count - before_count
 
-                    logger.info(f"{inserted} records inserted into PostgreSQL")
+def bulk_insert_weather_records(records: "list[dict] | WeatherBatch", conn=None, strict: bool = False) -> int:
+    """
+    Bulk-load records with COPY into a temporary staging table, then merge
+    into weather_summary with the same duplicate handling as
+    insert_weather_records (merge_statement).
+
+    Meant for backfills: one COPY stream and one set-based INSERT instead
+    of thousands of INSERT statements. Returns the number of new rows.
+    `conn` and `strict` work as in insert_weather_records.
+    """
+
+    if not records:
+        logger.warning("No records to insert into DB")
+        return 0
+
+    metrics = selected_metrics()
+    columns = row_columns(metrics)
+
+    attempts = settings.DB_RETRIES if conn is None else 1
+    error = None
+    for attempt in range(1, attempts + 1):
+        try:
+            with connection(conn) as db:
+                with db.cursor() as cur:
+                    ensure_write_schema(cur)
+                    cur.execute(stage_table_ddl(metrics))
+                    cur.copy_expert(
+                        f"COPY {STAGE_TABLE} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                        _CsvRecordStream(records, metrics),
+                    )
+                    if settings.ROLLUP_ENABLED:
+                        ensure_rollup_table(cur)
+                    # Single set-based statement: its count is exactly the new rows
+                    cur.execute(merge_statement(STAGE_TABLE, columns))
+                    inserted = cur.fetchone()[0]
+
+                    logger.info(f"{inserted} records bulk-loaded into PostgreSQL")
                     return inserted
 
         except psycopg2.OperationalError as e:
+            error = e
+            # A rollback also undid any table or column created in this attempt
+            forget_write_schema()
+            forget_rollup_table()
             logger.warning(
-                f"DB connection attempt {attempt}/{settings.DB_RETRIES} failed: {e}"
+                f"DB connection attempt {attempt}/{attempts} failed: {e}"
             )
 
         except psycopg2.DatabaseError as e:
+            error = e
+            forget_write_schema()
+            forget_rollup_table()
             logger.error(f"Database error: {e}")
             break  # Do NOT retry on corrupted SQL or schema errors
 
         # Exponential backoff
-        time.sleep(2 ** attempt)
+        if attempt < attempts:
+            time.sleep(2 ** attempt)
 
     logger.critical("Database permanently unavailable — records not inserted")
+    if strict:
+        raise RuntimeError("Weather records not inserted") from error
     return 0
@@ -0,0 +1,252 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+import psycopg2
+
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection became available within DB_POOL_TIMEOUT."""
+
+
+def connect_from_settings():
+    """Open a new PostgreSQL connection from the central settings."""
+    return psycopg2.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        dbname=settings.DB_NAME,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        connect_timeout=settings.DB_CONNECT_TIMEOUT,
+    )
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool shared by ingestion and analytics.
+
+    - At most `max_size` connections exist; callers block up to `timeout`
+      seconds for one to free up
+    - Idle connections are health-checked before reuse and replaced when broken
+    - Metrics: checkout wait time, connections in use, connections created
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any] = connect_from_settings,
+        max_size: int | None = None,
+        min_size: int | None = None,
+        timeout: float | None = None,
+        health_check_after: float | None = None,
+    ):
+        self._connect = connect
+        self.max_size = max(1, max_size or settings.DB_POOL_MAX_SIZE)
+        self.min_size = min(self.max_size, settings.DB_POOL_MIN_SIZE if min_size is None else min_size)
+        self.timeout = settings.DB_POOL_TIMEOUT if timeout is None else timeout
+        self.health_check_after = (
+            settings.DB_POOL_HEALTH_CHECK_SECONDS if health_check_after is None else health_check_after
+        )
+
+        self._cond = threading.Condition()
+        self._idle: list[tuple[Any, float]] = []  # (connection, returned_at)
+        self._size = 0
+        self._in_use = 0
+        self._metrics = {
+            "checkouts": 0,
+            "created": 0,
+            "discarded": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+        for _ in range(self.min_size):
+            conn = self._create()
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._size += 1
+
+    # ----------------------
+    # Internals
+    # ----------------------
+    # Connecting and closing are network calls: both run without holding
+    # _cond, which is taken only to update the metrics
+    def _create(self):
+        conn = self._connect()
+        with self._cond:
+            self._metrics["created"] += 1
+        return conn
+
+    def _healthy(self, conn, returned_at: float) -> bool:
+        if getattr(conn, "closed", False):
+            return False
+        if time.monotonic() - returned_at < self.health_check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn) -> None:
+        with self._cond:
+            self._metrics["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # ----------------------
+    # Checkout / return
+    # ----------------------
+    def getconn(self):
+        """Check out a healthy connection, waiting up to `timeout` seconds."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+
+        with self._cond:
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"No database connection available after {self.timeout}s")
+                self._cond.wait(remaining)
+
+            waited = time.monotonic() - start
+            self._metrics["checkouts"] += 1
+            self._metrics["wait_time_total"] += waited
+            self._metrics["wait_time_max"] = max(self._metrics["wait_time_max"], waited)
+
+            # Reserve a slot, then do network work outside the lock
+            idle = self._idle.pop() if self._idle else None
+            if idle is None:
+                self._size += 1
+            self._in_use += 1
+
+        try:
+            if idle is not None:
+                conn, returned_at = idle
+                if self._healthy(conn, returned_at):
+                    return conn
+                logger.warning("Discarding broken pooled database connection")
+                self._discard(conn)
+            return self._create()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """Return a connection; broken or discarded ones free their slot instead."""
+        discard = discard or getattr(conn, "closed", False)
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if discard:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Borrow a connection for one transaction:
+        commit on success, roll back on error, always return it to the pool.
+        """
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    # ----------------------
+    # Metrics
+    # ----------------------
+    def metrics(self) -> dict:
+        with self._cond:
+            metrics = dict(self._metrics)
+            metrics["in_use"] = self._in_use
+            metrics["idle"] = len(self._idle)
+            metrics["size"] = self._size
+            metrics["max_size"] = self.max_size
+            return metrics
+
+    def log_metrics(self) -> None:
+        m = self.metrics()
+        logger.info(
+            f"DB pool: {m['in_use']} in use, {m['idle']} idle, {m['created']} created, "
+            f"{m['checkouts']} checkouts, wait total {m['wait_time_total']:.3f}s "
+            f"(max {m['wait_time_max']:.3f}s)"
+        )
+
+    def close(self) -> None:
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide pool configured from Settings, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
+
+
+@contextmanager
+def transaction(conn) -> Iterator[Any]:
+    """
+    One transaction on a connection the caller already holds:
+    commit on success, roll back on error. The connection is not returned.
+    """
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def advisory_xact_lock(cur, name: str) -> None:
+    """
+    Serialize first-use DDL on `name` across processes until the current
+    transaction ends. The two-key form never collides with the single-key
+    shard locks.
+    """
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext('weather_analyzer'), hashtext(%s))", (name,))
+
+
+def connection(conn=None):
+    """
+    Shortcut for `get_pool().connection()`. With `conn`, runs the
+    transaction on that caller-held connection instead of borrowing one,
+    so several steps can share a single connection.
+    """
+    if conn is not None:
+        return transaction(conn)
+    return get_pool().connection()
@@ -0,0 +1,146 @@
+from typing import TYPE_CHECKING
+
+from weather_analyzer.db.pool import advisory_xact_lock, connection
+from weather_analyzer.logger import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+ROLLUP_DDL = """
+    CREATE TABLE IF NOT EXISTS weather_daily_rollup (
+        city TEXT NOT NULL,
+        day DATE NOT NULL,
+        count BIGINT NOT NULL,
+        sum DOUBLE PRECISION NOT NULL,
+        min DOUBLE PRECISION,
+        max DOUBLE PRECISION,
+        sumsq DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (city, day)
+    )
+"""
+
+# Folds a set of (city, temperature, fetched_at) rows named `inserted` into
+# the rollup. Used as the tail of data-modifying CTEs at insert time.
+ROLLUP_UPSERT = """
+    INSERT INTO weather_daily_rollup (city, day, count, sum, min, max, sumsq)
+    SELECT
+        city,
+        fetched_at::date,
+        count(temperature),
+        coalesce(sum(temperature), 0),
+        min(temperature),
+        max(temperature),
+        coalesce(sum(temperature * temperature), 0)
+    FROM inserted
+    GROUP BY city, fetched_at::date
+    ON CONFLICT (city, day) DO UPDATE SET
+        count = weather_daily_rollup.count + EXCLUDED.count,
+        sum = weather_daily_rollup.sum + EXCLUDED.sum,
+        min = LEAST(weather_daily_rollup.min, EXCLUDED.min),
+        max = GREATEST(weather_daily_rollup.max, EXCLUDED.max),
+        sumsq = weather_daily_rollup.sumsq + EXCLUDED.sumsq
+"""
+
+_rollup_ready = False
+
+
+def rollup_table_exists(cur) -> bool:
+    cur.execute("SELECT to_regclass('weather_daily_rollup') IS NOT NULL")
+    return cur.fetchone()[0]
+
+
+def ensure_rollup_table(cur) -> None:
+    """
+    Create weather_daily_rollup on first use and seed it from existing
+    history, so deployments that predate the rollup start out consistent.
+
+    - Checked once per process; the table only exists once the caller's
+      transaction commits, so a writer whose transaction fails calls
+      forget_rollup_table() and the next attempt checks again
+    - Concurrent first writers (scheduler replicas) queue on an advisory
+      lock and re-check, so only one of them creates and seeds
+    """
+    global _rollup_ready
+    if _rollup_ready:
+        return
+
+    if not rollup_table_exists(cur):
+        advisory_xact_lock(cur, "weather_daily_rollup")
+        if not rollup_table_exists(cur):
+            cur.execute(ROLLUP_DDL)
+            refresh_daily_rollup(cur)
+            logger.info("Created weather_daily_rollup from existing history")
+
+    _rollup_ready = True
+
+
+def forget_rollup_table() -> None:
+    """Make the next ensure_rollup_table check again (its transaction was rolled back)."""
+    global _rollup_ready
+    _rollup_ready = False
+
+
+def refresh_daily_rollup(cur, start=None, end=None) -> int:
+    """
+    Rebuild rollup days in [start, end) from raw weather_summary rows
+    (everything when no bounds are given). Returns the number of days written.
+    """
+    cur.execute(
+        """
+        DELETE FROM weather_daily_rollup
+        WHERE (%(start)s::date IS NULL OR day >= %(start)s::date)
+          AND (%(end)s::date IS NULL OR day < %(end)s::date)
+        """,
+        {"start": start, "end": end},
+    )
+    cur.execute(
+        """
+        INSERT INTO weather_daily_rollup (city, day, count, sum, min, max, sumsq)
+        SELECT
+            city,
+            fetched_at::date,
+            count(temperature),
+            coalesce(sum(temperature), 0),
+            min(temperature),
+            max(temperature),
+            coalesce(sum(temperature * temperature), 0)
+        FROM weather_summary
+        WHERE (%(start)s::date IS NULL OR fetched_at >= %(start)s::date)
+          AND (%(end)s::date IS NULL OR fetched_at < %(end)s::date)
+        GROUP BY city, fetched_at::date
+        """,
+        {"start": start, "end": end},
+    )
+    return cur.rowcount
+
+
+def fetch_daily_rollup(cities: list[str] | None = None, start=None, end=None, conn=None) -> "pd.DataFrame":
+    """
+    Per-city, per-day aggregates straight from weather_daily_rollup:
+    one row per city and day instead of every raw observation.
+    Columns: city, date, count, sum, min, max, sumsq.
+    """
+    import pandas as pd
+
+    query = """
+        SELECT city, day AS date, count, sum, min, max, sumsq
+        FROM weather_daily_rollup
+        WHERE (%(cities)s::text[] IS NULL OR city = ANY(%(cities)s::text[]))
+          AND (%(start)s::date IS NULL OR day >= %(start)s::date)
+          AND (%(end)s::date IS NULL OR day < %(end)s::date)
+        ORDER BY city, day
+    """
+    params = {"cities": list(cities) if cities else None, "start": start, "end": end}
+
+    with connection(conn) as conn:
+        with conn.cursor() as cur:
+            ensure_rollup_table(cur)
+            cur.execute(query, params)
+            rows = cur.fetchall()
+
+    df = pd.DataFrame(rows, columns=["city", "date", "count", "sum", "min", "max", "sumsq"])
+    df["date"] = pd.to_datetime(df["date"])
+    # Database collation may order cities differently than pandas does
+    return df.sort_values(["city", "date"], ignore_index=True)
@@ -0,0 +1,433 @@
+import argparse
+import re
+from datetime import date
+
+from psycopg2 import sql
+
+from weather_analyzer.db.pool import advisory_xact_lock, connection
+from weather_analyzer.metrics import METRICS, selected_metrics
+from weather_analyzer.db.rollup import ensure_rollup_table
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+TABLE = "weather_summary"
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+# Base layout; observed_at and metric columns beyond temperature / humidity are added by add_columns
+COLUMNS_DDL = """
+    city TEXT NOT NULL,
+    temperature DOUBLE PRECISION,
+    humidity INTEGER,
+    fetched_at TIMESTAMP NOT NULL
+"""
+
+# One row per stored observation. A unique index on weather_summary has to
+# include its partition key (fetched_at), so uniqueness of the provider's
+# observation time per city is enforced here instead.
+OBSERVATION_KEYS = "weather_observation_keys"
+OBSERVATION_KEYS_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {OBSERVATION_KEYS} (
+        city TEXT NOT NULL,
+        observed_at TIMESTAMP NOT NULL,
+        PRIMARY KEY (city, observed_at)
+    )
+"""
+
+_write_schema_ready = False
+
+
+# ----------------------
+# Month helpers
+# ----------------------
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+# ----------------------
+# Introspection
+# ----------------------
+def table_exists(cur, name: str = TABLE) -> bool:
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (name,))
+    return cur.fetchone()[0]
+
+
+def is_partitioned(cur, name: str = TABLE) -> bool:
+    cur.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+        (name,),
+    )
+    return cur.fetchone()[0]
+
+
+def list_partitions(cur, parent: str = TABLE) -> dict[date, str]:
+    """Monthly partitions attached to `parent`, keyed by the month they cover."""
+    cur.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(%s)
+        """,
+        (parent,),
+    )
+    partitions = {}
+    for (name,) in cur.fetchall():
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+def table_columns(cur, name: str = TABLE) -> list[str]:
+    """Column names of `name` in table order (empty when it does not exist)."""
+    cur.execute(
+        """
+        SELECT attname
+        FROM pg_attribute
+        WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum
+        """,
+        (name,),
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+# ----------------------
+# DDL
+# ----------------------
+def create_partitioned_table(cur, name: str = TABLE) -> None:
+    cur.execute(
+        sql.SQL(
+            """
+            CREATE TABLE {table} (
+                {columns},
+                UNIQUE (city, fetched_at)
+            ) PARTITION BY RANGE (fetched_at)
+            """
+        ).format(table=sql.Identifier(name), columns=sql.SQL(COLUMNS_DDL))
+    )
+    add_columns(cur, name)
+    # Catches rows outside every monthly range so inserts never fail
+    cur.execute(
+        sql.SQL("CREATE TABLE {default} PARTITION OF {table} DEFAULT").format(
+            default=sql.Identifier(f"{name}_default"), table=sql.Identifier(name)
+        )
+    )
+
+
+def missing_columns(cur, name: str = TABLE, metrics: list[str] | None = None) -> dict[str, str]:
+    """{column: SQL type} of observed_at and the selected metrics that `name` lacks."""
+    wanted = {metric: METRICS[metric].sql_type for metric in selected_metrics(metrics)}
+    wanted["observed_at"] = "TIMESTAMP"
+    existing = set(table_columns(cur, name))
+    return {column: sql_type for column, sql_type in wanted.items() if column not in existing}
+
+
+def add_columns(cur, name: str = TABLE, metrics: list[str] | None = None) -> list[str]:
+    """
+    Add a nullable column for observed_at and for every selected metric
+    (default: settings.METRICS) the table lacks; returns the columns added.
+
+    - Nullable columns without a default are a catalog-only change: no
+      table rewrite, existing rows simply read NULL
+    - On the partitioned parent the column reaches every partition
+    - Columns of metrics no longer selected are kept, never dropped
+    """
+    added = []
+    for column, sql_type in missing_columns(cur, name, metrics).items():
+        cur.execute(
+            sql.SQL("ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {type}").format(
+                table=sql.Identifier(name),
+                column=sql.Identifier(column),
+                type=sql.SQL(sql_type),
+            )
+        )
+        added.append(column)
+
+    if added:
+        logger.info(f"Added columns to {name}: {', '.join(added)}")
+    return added
+
+
+def ensure_observation_keys(cur) -> bool:
+    """
+    Create weather_observation_keys if missing, seeded from stored rows
+    that carry an observed_at. Returns True when it was created.
+    """
+    if table_exists(cur, OBSERVATION_KEYS):
+        return False
+    cur.execute(OBSERVATION_KEYS_DDL)
+    if "observed_at" in table_columns(cur):
+        cur.execute(
+            f"""
+            INSERT INTO {OBSERVATION_KEYS} (city, observed_at)
+            SELECT DISTINCT city, observed_at FROM {TABLE} WHERE observed_at IS NOT NULL
+            """
+        )
+    logger.info(f"Created {OBSERVATION_KEYS}")
+    return True
+
+
+def ensure_write_schema(cur) -> None:
+    """
+    add_columns and ensure_observation_keys for weather_summary: writers
+    call it so a newly configured metric or an upgrade needs no manual
+    migration.
+
+    - Checked once per process; the DDL only takes effect once the caller's
+      transaction commits, so a writer whose transaction fails calls
+      forget_write_schema() and the next attempt checks again
+    - Concurrent first writers (scheduler replicas) queue on an advisory
+      lock and re-check, so only one of them runs the DDL and seeds the keys
+    """
+    global _write_schema_ready
+    if _write_schema_ready:
+        return
+
+    if missing_columns(cur) or not table_exists(cur, OBSERVATION_KEYS):
+        advisory_xact_lock(cur, "weather_write_schema")
+        add_columns(cur)
+        ensure_observation_keys(cur)
+
+    _write_schema_ready = True
+
+
+def forget_write_schema() -> None:
+    """Make the next ensure_write_schema check again (its transaction was rolled back)."""
+    global _write_schema_ready
+    _write_schema_ready = False
+
+
+def create_month_partition(cur, month: date, parent: str = TABLE) -> bool:
+    """
+    Create the partition for one month if missing. Rows for that month that
+    already landed in the default partition are moved into it.
+    Returns True when a partition was created.
+    """
+    if month in list_partitions(cur, parent):
+        return False
+
+    name = partition_name(month)
+    default = f"{parent}_default"
+    bounds = {"start": month, "end": add_months(month, 1)}
+
+    cur.execute(
+        sql.SQL("SELECT EXISTS (SELECT 1 FROM {default} WHERE fetched_at >= %(start)s AND fetched_at < %(end)s)")
+        .format(default=sql.Identifier(default)),
+        bounds,
+    )
+    stray_rows = cur.fetchone()[0]
+
+    if stray_rows:
+        # A new range may not overlap rows in the default partition:
+        # detach it, carve the month out, then re-attach
+        cur.execute(sql.SQL("ALTER TABLE {table} DETACH PARTITION {default}").format(
+            table=sql.Identifier(parent), default=sql.Identifier(default)))
+
+    cur.execute(
+        sql.SQL("CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%(start)s) TO (%(end)s)")
+        .format(name=sql.Identifier(name), table=sql.Identifier(parent)),
+        bounds,
+    )
+
+    if stray_rows:
+        cur.execute(
+            sql.SQL(
+                """
+                WITH moved AS (
+                    DELETE FROM {default}
+                    WHERE fetched_at >= %(start)s AND fetched_at < %(end)s
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """
+            ).format(default=sql.Identifier(default), name=sql.Identifier(name)),
+            bounds,
+        )
+        cur.execute(sql.SQL("ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT").format(
+            table=sql.Identifier(parent), default=sql.Identifier(default)))
+
+    logger.info(f"Created partition {name}")
+    return True
+
+
+# ----------------------
+# Migration & maintenance
+# ----------------------
+def migrate(cur, today: date | None = None) -> None:
+    """
+    Bring weather_summary to the partitioned layout:
+    - missing table: create it partitioned
+    - plain heap table: copy it into a new partitioned table and swap names
+    - already partitioned: nothing to migrate
+    Then add columns for observed_at and newly selected metrics, make sure
+    the observation keys and the rollup exist, and pre-create upcoming partitions.
+    """
+    today = today or date.today()
+
+    if not table_exists(cur):
+        create_partitioned_table(cur)
+        logger.info(f"Created partitioned table {TABLE}")
+
+    elif not is_partitioned(cur):
+        staging = f"{TABLE}_partitioned"
+        logger.info(f"Migrating {TABLE} to a monthly partitioned table")
+        create_partitioned_table(cur, staging)
+        # Metric columns the old table already has are carried over even if no longer selected
+        old_columns = table_columns(cur)
+        add_columns(cur, staging, [column for column in old_columns if column in METRICS])
+        copied_columns = ", ".join(c for c in table_columns(cur, staging) if c in old_columns)
+
+        cur.execute(f"SELECT min(fetched_at), max(fetched_at) FROM {TABLE}")
+        oldest, newest = cur.fetchone()
+        if oldest is not None:
+            month = month_start(oldest.date())
+            while month <= month_start(newest.date()):
+                create_month_partition(cur, month, parent=staging)
+                month = add_months(month, 1)
+
+        cur.execute(f"INSERT INTO {staging} ({copied_columns}) SELECT {copied_columns} FROM {TABLE}")
+        copied = cur.rowcount
+        cur.execute(f"DROP TABLE {TABLE}")
+        cur.execute(f"ALTER TABLE {staging} RENAME TO {TABLE}")
+        cur.execute(f"ALTER TABLE {staging}_default RENAME TO {DEFAULT_PARTITION}")
+        logger.info(f"Migrated {copied} rows into partitioned {TABLE}")
+
+    else:
+        add_columns(cur)
+
+    ensure_observation_keys(cur)
+    ensure_partitions(cur, today=today)
+    ensure_rollup_table(cur)
+
+
+def ensure_partitions(cur, months_ahead: int | None = None, today: date | None = None) -> int:
+    """Pre-create partitions from the current month up to `months_ahead` months out."""
+    months_ahead = settings.PARTITION_PREMAKE_MONTHS if months_ahead is None else months_ahead
+    current = month_start(today or date.today())
+
+    created = 0
+    for offset in range(months_ahead + 1):
+        created += create_month_partition(cur, add_months(current, offset))
+    return created
+
+
+def apply_retention(cur, retention_months: int | None = None, mode: str | None = None,
+                    today: date | None = None) -> list[str]:
+    """
+    Remove monthly partitions that ended more than `retention_months` ago.
+    mode "drop" deletes them; "detach" keeps them as standalone
+    weather_summary_archive_* tables; expired rows in the default partition
+    are handled by expire_default_rows. The daily rollup is left untouched,
+    so long-term aggregates survive raw-data retention. Observation keys
+    older than the cutoff are deleted with the rows they guarded.
+    """
+    retention_months = settings.RETENTION_MONTHS if retention_months is None else retention_months
+    mode = mode or settings.RETENTION_MODE
+    if retention_months <= 0:
+        return []
+
+    cutoff = add_months(month_start(today or date.today()), -retention_months)
+    expired = []
+
+    for month, name in sorted(list_partitions(cur).items()):
+        if add_months(month, 1) > cutoff:
+            continue
+
+        if mode == "drop":
+            cur.execute(sql.SQL("DROP TABLE {name}").format(name=sql.Identifier(name)))
+        else:
+            archive = name.replace(f"{TABLE}_p", f"{TABLE}_archive_p", 1)
+            cur.execute(sql.SQL("ALTER TABLE {table} DETACH PARTITION {name}").format(
+                table=sql.Identifier(TABLE), name=sql.Identifier(name)))
+            cur.execute(sql.SQL("ALTER TABLE {name} RENAME TO {archive}").format(
+                name=sql.Identifier(name), archive=sql.Identifier(archive)))
+
+        expired.append(name)
+        logger.info(f"Retention: {mode} partition {name}")
+
+    if table_exists(cur, DEFAULT_PARTITION):
+        expire_default_rows(cur, cutoff, mode)
+
+    if table_exists(cur, OBSERVATION_KEYS):
+        cur.execute(f"DELETE FROM {OBSERVATION_KEYS} WHERE observed_at < %s", (cutoff,))
+
+    return expired
+
+
+def expire_default_rows(cur, cutoff: date, mode: str) -> int:
+    """
+    Rows older than `cutoff` that sit in the default partition (fetched
+    before any month partition covered them) have no partition to drop:
+    "drop" deletes them, "detach" moves them to weather_summary_archive_default.
+    """
+    archive = f"{TABLE}_archive_default"
+    deleted = f"DELETE FROM {DEFAULT_PARTITION} WHERE fetched_at < %(cutoff)s RETURNING *"
+    if mode == "drop":
+        cur.execute(deleted, {"cutoff": cutoff})
+    else:
+        cur.execute(f"CREATE TABLE IF NOT EXISTS {archive} (LIKE {DEFAULT_PARTITION})")
+        columns = table_columns(cur, DEFAULT_PARTITION)
+        add_columns(cur, archive, [column for column in columns if column in METRICS])
+        column_list = ", ".join(columns)
+        cur.execute(
+            f"WITH moved AS ({deleted}) INSERT INTO {archive} ({column_list}) SELECT {column_list} FROM moved",
+            {"cutoff": cutoff},
+        )
+    expired = cur.rowcount
+    if expired:
+        logger.info(f"Retention: {mode} {expired} rows from {DEFAULT_PARTITION}")
+    return expired
+
+
+def maintain(conn=None) -> None:
+    """Scheduler hook: pre-create upcoming partitions and apply retention."""
+    with connection(conn) as conn:
+        with conn.cursor() as cur:
+            if not is_partitioned(cur):
+                logger.warning(f"{TABLE} is not partitioned; run `python -m weather_analyzer.db.schema migrate`")
+                return
+            ensure_partitions(cur)
+            apply_retention(cur)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Manage the weather_summary schema"
+    )
+    parser.add_argument(
+        "command",
+        choices=["migrate", "maintain"],
+        help="migrate: create or convert to the partitioned layout and add metric columns, "
+             "maintain: pre-create partitions and apply retention"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.command == "migrate":
+        with connection() as conn:
+            with conn.cursor() as cur:
+                migrate(cur)
+        logger.info("Schema migration completed")
+    else:
+        maintain()
+        logger.info("Partition maintenance completed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import math
+import os
+import socket
+import threading
+import zlib
+from typing import Any, Callable
+
+import psycopg2
+
+from weather_analyzer.db.pool import connect_from_settings
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+# Second advisory-lock key inside SHARD_LOCK_NAMESPACE; shard slots use 0..N-1
+MEMBER_KEY = -1
+LEADER_KEY = -2
+
+
+def shard_of(city: str, shard_count: int) -> int:
+    """Stable shard slot of a city name (same answer in every process and run)."""
+    return zlib.crc32(city.strip().lower().encode("utf-8")) % shard_count
+
+
+def fair_share(shard_count: int, members: int) -> int:
+    """Most shards one worker may hold so every live worker gets a part."""
+    return math.ceil(shard_count / max(1, members))
+
+
+class ShardCoordinator:
+    """
+    Splits the city list across scheduler replicas with PostgreSQL
+    advisory locks on one dedicated session per worker.
+
+    - Cities hash to SHARD_COUNT slots; a worker only fetches cities whose
+      slot lock it holds, so replicas never fetch or insert the same city
+    - Every worker holds a shared "member" lock; counting its holders in
+      pg_locks gives the number of live workers and thus the fair share
+    - rebalance() (once per ingest tick) releases slots above the fair share
+      and claims unowned ones up to it
+    - Released slots are still fetched by the releasing worker on that tick;
+      a joiner only claims them on its next rebalance, so nothing is missed
+      in between (a city may be fetched twice once, which dedup absorbs)
+    - A dead worker's session ends and Postgres drops its locks, so the
+      survivors pick its slots up on their next rebalance
+    - One worker additionally holds the leader lock and runs singleton jobs
+    - member_count lets each worker take its share of the API quota
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any] = connect_from_settings,
+        shard_count: int | None = None,
+        namespace: int | None = None,
+        worker_id: str | None = None,
+    ):
+        self._connect = connect
+        self.shard_count = shard_count or settings.SHARD_COUNT
+        self.namespace = settings.SHARD_LOCK_NAMESPACE if namespace is None else namespace
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self._conn = None
+        self._lock = threading.Lock()  # ingest and analytics jobs share the session
+        self.owned: set[int] = set()
+        self.handed_off: set[int] = set()  # released on the latest rebalance
+        self.member_count = 1  # live workers seen on the latest rebalance
+        self.leader = False
+
+    # ----------------------
+    # Session
+    # ----------------------
+    def _session(self):
+        """The lock-holding connection; reopened (with every lock lost) when broken."""
+        if self._conn is not None and not self._conn.closed:
+            try:
+                with self._conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                return self._conn
+            except psycopg2.Error:
+                logger.warning(f"Shard session of {self.worker_id} lost; reclaiming shards")
+                self._drop_session()
+
+        conn = self._connect()
+        conn.autocommit = True  # session-level locks, no long-open transaction
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_lock_shared(%s, %s)", (self.namespace, MEMBER_KEY))
+        self._conn = conn
+        return conn
+
+    def _drop_session(self) -> None:
+        try:
+            if self._conn is not None:
+                self._conn.close()
+        except psycopg2.Error:
+            pass
+        self._conn = None
+        self.owned = set()
+        self.handed_off = set()
+        self.leader = False
+
+    # ----------------------
+    # Membership & claims
+    # ----------------------
+    def members(self, cur) -> int:
+        cur.execute(
+            """
+            SELECT count(*) FROM pg_locks
+            WHERE locktype = 'advisory' AND classid = %s::oid AND objid = %s::oid
+              AND objsubid = 2 AND granted
+            """,
+            (self.namespace & 0xFFFFFFFF, MEMBER_KEY & 0xFFFFFFFF),
+        )
+        return cur.fetchone()[0]
+
+    def _claim_order(self) -> list[int]:
+        # Each worker starts probing at its own offset, so concurrent
+        # workers mostly try different slots first
+        start = shard_of(self.worker_id, self.shard_count)
+        return [(start + i) % self.shard_count for i in range(self.shard_count)]
+
+    def rebalance(self) -> set[int]:
+        """Adjust held shards to the current fair share. Returns the owned slots."""
+        with self._lock:
+            return self._rebalance()
+
+    def _rebalance(self) -> set[int]:
+        conn = self._session()
+        with conn.cursor() as cur:
+            members = self.members(cur)
+            self.member_count = max(1, members)
+            target = fair_share(self.shard_count, members)
+
+            # Give back surplus first so newly joined workers can claim it
+            self.handed_off = set(sorted(self.owned)[target:])
+            for slot in self.handed_off:
+                cur.execute("SELECT pg_advisory_unlock(%s, %s)", (self.namespace, slot))
+                self.owned.discard(slot)
+
+            for slot in self._claim_order():
+                if len(self.owned) >= target:
+                    break
+                if slot in self.owned:
+                    continue
+                cur.execute("SELECT pg_try_advisory_lock(%s, %s)", (self.namespace, slot))
+                if cur.fetchone()[0]:
+                    self.owned.add(slot)
+
+            if not self.leader:
+                cur.execute("SELECT pg_try_advisory_lock(%s, %s)", (self.namespace, LEADER_KEY))
+                self.leader = cur.fetchone()[0]
+
+        logger.info(
+            f"Shards for {self.worker_id}: {len(self.owned)}/{self.shard_count} "
+            f"({members} workers, fair share {target}{', leader' if self.leader else ''})"
+        )
+        return set(self.owned)
+
+    def cities(self, cities: list[str]) -> list[str]:
+        """The cities this worker fetches this tick: its owned and just handed-off slots."""
+        with self._lock:
+            slots = self._rebalance() | self.handed_off
+        return [city for city in cities if shard_of(city, self.shard_count) in slots]
+
+    def is_leader(self) -> bool:
+        if not self.leader:
+            self.rebalance()
+        return self.leader
+
+    def close(self) -> None:
+        """Release every lock by ending the session."""
+        with self._lock:
+            self._drop_session()
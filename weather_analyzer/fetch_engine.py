@@ -0,0 +1,99 @@
+import heapq
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable
+
+from weather_analyzer.http_client import RetryPolicy, get_client
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+
+class FetchEngine:
+    """
+    Bounded concurrent fetcher with per-item retries.
+
+    - At most `concurrency` calls are in flight at any time
+    - A failed item is re-queued with a backoff deadline instead of
+      sleeping inside a worker, so one slow city never blocks the others
+    - Results come back in the same order as the input items
+    - `on_result(item, result)` sees each success as soon as it arrives,
+      so results can be streamed out before the whole batch is done
+    """
+
+    def __init__(
+        self,
+        fetch_once: Callable[[Any], Any],
+        concurrency: int | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ):
+        self.fetch_once = fetch_once
+        self.concurrency = max(1, concurrency or settings.FETCH_CONCURRENCY)
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
+
+    def run(self, items: list, on_result: Callable[[Any, Any], None] | None = None) -> list:
+        """
+        Fetch every item and return a list aligned with `items`.
+        Items that fail all attempts are returned as None.
+        """
+        results: list = [None] * len(items)
+        ready = deque((index, 1) for index in range(len(items)))
+        delayed: list[tuple[float, int, int]] = []  # (due, index, attempt)
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while ready or delayed or in_flight:
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    _, index, attempt = heapq.heappop(delayed)
+                    ready.append((index, attempt))
+
+                while ready and len(in_flight) < self.concurrency:
+                    index, attempt = ready.popleft()
+                    future = pool.submit(self.fetch_once, items[index])
+                    in_flight[future] = (index, attempt)
+
+                if not in_flight:
+                    # Only backoff timers left: sleep until the next one is due
+                    time.sleep(max(0.0, delayed[0][0] - time.monotonic()))
+                    continue
+
+                timeout = None
+                if delayed:
+                    timeout = max(0.0, delayed[0][0] - time.monotonic())
+
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index, attempt = in_flight.pop(future)
+                    try:
+                        results[index] = future.result()
+                    except Exception as exc:
+                        self._handle_failure(items[index], index, attempt, exc, delayed)
+                        continue
+                    if on_result is not None and results[index] is not None:
+                        self._deliver(on_result, items[index], results[index])
+
+        return results
+
+    @staticmethod
+    def _deliver(on_result: Callable[[Any, Any], None], item, result) -> None:
+        # A failing consumer must not abort the remaining fetches
+        try:
+            on_result(item, result)
+        except Exception:
+            logger.exception(f"Result callback failed for {item}")
+
+    def _handle_failure(self, item, index: int, attempt: int, exc: Exception, delayed: list) -> None:
+        policy = self.retry_policy
+        logger.warning(f"API attempt {attempt}/{policy.attempts} failed for {item}: {exc}")
+
+        if policy.should_retry(attempt, exc):
+            get_client().count("retried")
+            due = time.monotonic() + policy.delay(attempt, exc)
+            heapq.heappush(delayed, (due, index, attempt + 1))
+        else:
+            get_client().count("dropped")
+            logger.error(f"API permanently failed for {item}")
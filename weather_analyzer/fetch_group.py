@@ -0,0 +1,152 @@
+import json
+from pathlib import Path
+from typing import Callable
+
+from weather_analyzer.cache import get_cache
+from weather_analyzer.fetch_engine import FetchEngine
+from weather_analyzer.fetch_weather import fetch_weather_many, validate_weather_payload
+from weather_analyzer.http_client import get_client
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+
+class CityIdCache:
+    """
+    On-disk mapping of city name → OpenWeatherMap city ID.
+    Names are resolved once through the per-city endpoint and reused afterwards.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path or settings.CITY_ID_CACHE_PATH)
+        self._ids: dict[str, int] = {}
+        self._dirty = False
+
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._ids = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable city ID cache {self.path}: {e}")
+
+    @staticmethod
+    def _key(city: str) -> str:
+        return city.strip().lower()
+
+    def get(self, city: str) -> int | None:
+        return self._ids.get(self._key(city))
+
+    def set(self, city: str, city_id: int) -> None:
+        if self._ids.get(self._key(city)) != city_id:
+            self._ids[self._key(city)] = city_id
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._ids, f, sort_keys=True)
+        tmp_path.replace(self.path)
+
+        self._dirty = False
+        logger.info(f"City ID cache saved to {self.path} ({len(self._ids)} cities)")
+
+
+def fetch_group_once(city_ids: list[int]) -> dict[int, dict]:
+    """
+    Single call to the group endpoint for up to GROUP_CHUNK_SIZE city IDs.
+    Returns the per-city payloads keyed by city ID; malformed entries are dropped.
+    """
+    params = {
+        "id": ",".join(str(city_id) for city_id in city_ids),
+        "appid": settings.WEATHER_API_KEY,
+        "units": settings.UNITS,
+    }
+    data, timing = get_client().get_json(settings.WEATHER_GROUP_API_URL, params)
+
+    if "list" not in data:
+        raise ValueError("Malformed group API response")
+
+    payloads = {}
+    for item in data["list"]:
+        try:
+            validate_weather_payload(item)
+            payloads[item["id"]] = item
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Skipping malformed group entry: {item}")
+
+    logger.info(f"Group weather fetched for {len(payloads)}/{len(city_ids)} cities ({timing})")
+    return payloads
+
+
+def fetch_weather_grouped(
+    cities: list[str],
+    concurrency: int | None = None,
+    on_result: Callable[[str, dict], None] | None = None,
+) -> list[dict | None]:
+    """
+    Fetch many cities with one API call per chunk of GROUP_CHUNK_SIZE.
+
+    - Cities with a fresh response-cache entry cost no call at all
+    - Cities missing from the ID cache are fetched one by one; that call
+      both resolves their ID and provides this run's data
+    - Known cities are fetched through the group endpoint in chunks,
+      concurrently and with the usual retries
+    - Chunk payloads are split back into the per-city dicts
+      process_weather_data expects, aligned with `cities`
+    - `on_result(city, data)` is called for each city as soon as its data
+      is in hand (cache hit, ID resolution or its chunk's response)
+    """
+    id_cache = CityIdCache()
+    cache = get_cache()
+    results: dict[str, dict] = {}
+
+    def deliver(city: str, data: dict) -> None:
+        results[city] = data
+        if on_result is not None:
+            try:
+                on_result(city, data)
+            except Exception:
+                logger.exception(f"Result callback failed for {city}")
+
+    if cache is not None:
+        for city in cities:
+            cached = cache.get(city)
+            if cached is not None:
+                deliver(city, cached)
+
+    unresolved = [city for city in cities if city not in results and id_cache.get(city) is None]
+    if unresolved:
+        logger.info(f"Resolving city IDs for {len(unresolved)} cities")
+        for city, data in zip(unresolved, fetch_weather_many(unresolved, concurrency=concurrency)):
+            if data and "id" in data:
+                id_cache.set(city, data["id"])
+                deliver(city, data)
+        id_cache.save()
+
+    pending = [city for city in cities if city not in results and id_cache.get(city) is not None]
+    size = max(1, settings.GROUP_CHUNK_SIZE)
+    chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+
+    engine = FetchEngine(
+        lambda chunk: fetch_group_once([id_cache.get(city) for city in chunk]),
+        concurrency=concurrency,
+    )
+
+    def split_chunk(chunk: list[str], payloads: dict[int, dict]) -> None:
+        for city in chunk:
+            data = payloads.get(id_cache.get(city))
+            if data is not None:
+                if cache is not None:
+                    cache.put(city, data)
+                deliver(city, data)
+            else:
+                logger.warning(f"Group response did not include {city}")
+
+    engine.run(chunks, on_result=split_chunk)
+
+    return [results.get(city) for city in cities]
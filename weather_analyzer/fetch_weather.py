@@ -1,61 +1,86 @@
-import time
-import requests
+from typing import Callable
 
+from weather_analyzer.cache import get_cache
+from weather_analyzer.fetch_engine import FetchEngine
+from weather_analyzer.http_client import get_client
 from weather_analyzer.logger import get_logger
 from weather_analyzer.config.settings import settings
 
 logger = get_logger(__name__)
 
 
-def fetch_weather(city: str) -> dict | None:
-    """
-    Fetch weather data for a city with robust retry logic.
-
-    - Uses centralized settings (timeouts, retries, API config)
-    - Retries failed requests with exponential backoff
-    - Returns parsed JSON on success
-    - Returns None after all retries fail
-    """
-
-    params = {
+def _city_params(city: str) -> dict:
+    return {
         "q": city,
         "appid": settings.WEATHER_API_KEY,
         "units": settings.UNITS,
     }
 
-    for attempt in range(1, settings.API_RETRIES + 1):
-        try:
-            response = requests.get(
-                settings.WEATHER_API_URL,
-                params=params,
-                timeout=settings.REQUEST_TIMEOUT,
-            )
 
-            # HTTP-level failure
-            if response.status_code != 200:
-                raise RuntimeError(
-                    f"HTTP {response.status_code}: {response.text}"
-                )
+def validate_weather_payload(data: dict) -> None:
+    """Data integrity check shared by every fetch path."""
+    if "main" not in data or "temp" not in data["main"]:
+        raise ValueError("Malformed API response")
+
+
+def fetch_weather_once(city: str) -> dict:
+    """
+    Single API call for a city, without retries.
+
+    - Served from the response cache while the cached observation is fresh
+    - Stale entries are revalidated with a conditional request when possible
+    - Raises on HTTP errors and malformed payloads so callers
+      (the client's retry loop or the FetchEngine) decide what to do next
+    """
+    cache = get_cache()
+    headers = None
 
-            data = response.json()
+    if cache is not None:
+        cached = cache.get(city)
+        if cached is not None:
+            logger.info(f"Weather data for {city} served from cache")
+            return cached
+        headers = cache.revalidation_headers(city)
 
-            # Data integrity check
-            if "main" not in data or "temp" not in data["main"]:
-                raise ValueError("Malformed API response")
+    response, timing = get_client().get(settings.WEATHER_API_URL, _city_params(city), headers=headers)
 
-            logger.info(f"Weather data fetched for {city}")
+    if response.status_code == 304 and cache is not None:
+        data = cache.revalidated(city)
+        if data is not None:
+            logger.info(f"Weather data for {city} revalidated ({timing})")
             return data
 
-        except Exception as exc:
-            logger.warning(
-                f"API attempt {attempt}/{settings.API_RETRIES} failed for {city}: {exc}"
-            )
+    data = get_client().parse_json(response, validate=validate_weather_payload)
+    if cache is not None:
+        cache.put(city, data, response.headers)
 
-            # Retry if attempts remain
-            if attempt < settings.API_RETRIES:
-                backoff_seconds = 2 ** attempt
-                time.sleep(backoff_seconds)
-            else:
-                logger.error(f"API permanently failed for {city}")
+    logger.info(f"Weather data fetched for {city} ({timing})")
+    return data
 
-    return None
+
+def fetch_weather(city: str) -> dict | None:
+    """
+    Fetch weather data for a city with robust retry logic.
+
+    - Uses the shared pooled HTTP client (timeouts, retries, keep-alive)
+    - Retries failed requests with exponential backoff
+    - Returns parsed JSON on success
+    - Returns None after all retries fail
+    """
+    return get_client().call_with_retries(lambda: fetch_weather_once(city), label=city)
+
+
+def fetch_weather_many(
+    cities: list[str],
+    concurrency: int | None = None,
+    on_result: Callable[[str, dict], None] | None = None,
+) -> list[dict | None]:
+    """
+    Fetch several cities concurrently (bounded by FETCH_CONCURRENCY).
+
+    Retries and backoff run per city without holding up the others.
+    The returned list is aligned with `cities`; failed cities are None.
+    `on_result(city, data)` is called for each city as soon as it arrives.
+    """
+    engine = FetchEngine(fetch_weather_once, concurrency=concurrency)
+    return engine.run(list(cities), on_result=on_result)
@@ -0,0 +1,324 @@
+import socket
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from weather_analyzer.rate_limit import AdaptiveConcurrency, TokenBucket, parse_retry_after
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Per-thread accumulator the timed connections write their handshake time into
+_timing = threading.local()
+
+
+# ----------------------
+# Errors & retry policy
+# ----------------------
+class HttpStatusError(RuntimeError):
+    """Non-200 API response. 429, 408 and 5xx are worth retrying; other 4xx are not."""
+
+    def __init__(self, status: int, text: str, retry_after: float | None = None):
+        super().__init__(f"HTTP {status}: {text}")
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status in (408, 429) or self.status >= 500
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How many times to try a request and how long to wait in between.
+    delay(attempt) = backoff_factor * 2 ** attempt  →  2, 4, 8 ... seconds by default,
+    or the server's Retry-After when that is longer.
+    """
+    attempts: int = 3
+    backoff_factor: float = 1.0
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        return cls(attempts=settings.API_RETRIES, backoff_factor=settings.API_BACKOFF_FACTOR)
+
+    def delay(self, attempt: int, exc: Exception | None = None) -> float:
+        delay = self.backoff_factor * 2 ** attempt
+        retry_after = getattr(exc, "retry_after", None)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def should_retry(self, attempt: int, exc: Exception | None = None) -> bool:
+        if isinstance(exc, HttpStatusError) and not exc.retryable:
+            return False
+        return attempt < self.attempts
+
+
+# ----------------------
+# Timing instrumentation
+# ----------------------
+@dataclass
+class RequestTiming:
+    """Split of one request's wall time: TCP/TLS connect vs. request + response transfer."""
+    connect: float
+    transfer: float
+
+    @property
+    def total(self) -> float:
+        return self.connect + self.transfer
+
+    @property
+    def reused(self) -> bool:
+        return self.connect == 0.0
+
+    def __str__(self) -> str:
+        return f"connect {self.connect * 1000:.1f}ms, transfer {self.transfer * 1000:.1f}ms"
+
+
+class _TimedConnectMixin:
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _timing.connect = getattr(_timing, "connect", 0.0) + time.perf_counter() - start
+
+
+class TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report connect time and use TCP keep-alive."""
+
+    def __init__(self, keepalive: bool = True, **kwargs):
+        self.keepalive = keepalive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.keepalive:
+            pool_kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+# ----------------------
+# Client
+# ----------------------
+class WeatherHttpClient:
+    """
+    Long-lived, pooled HTTP session shared by every fetch path.
+
+    - One requests.Session with a bounded connection pool per host
+    - Keep-alive connections are reused across cities and runs
+    - Owns the retry policy for API calls
+    - Client-side quota (token bucket, API_RATE_LIMIT_PER_MINUTE) shared by
+      every caller; a 429's Retry-After pauses all of them
+    - Adaptive in-flight limit: halved on 429 / 5xx bursts, regrown on success
+    - Records connect vs. transfer time for every request, plus counters
+      for throttled, retried and dropped requests
+    """
+
+    def __init__(
+        self,
+        pool_connections: int | None = None,
+        pool_maxsize: int | None = None,
+        keepalive: bool | None = None,
+        retry_policy: RetryPolicy | None = None,
+        timeout: float | None = None,
+        rate_limiter: TokenBucket | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+    ):
+        self.keepalive = settings.HTTP_KEEPALIVE if keepalive is None else keepalive
+        self.retry_policy = retry_policy or RetryPolicy.from_settings()
+        self.timeout = timeout or settings.REQUEST_TIMEOUT
+
+        adapter = PooledAdapter(
+            keepalive=self.keepalive,
+            pool_connections=pool_connections or settings.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or settings.HTTP_POOL_MAXSIZE,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if not self.keepalive:
+            self.session.headers["Connection"] = "close"
+
+        if rate_limiter is None and settings.API_RATE_LIMIT_PER_MINUTE > 0:
+            rate_limiter = TokenBucket(settings.API_RATE_LIMIT_PER_MINUTE, burst=settings.API_RATE_BURST)
+        if concurrency is None and settings.API_ADAPTIVE_CONCURRENCY:
+            concurrency = AdaptiveConcurrency(
+                maximum=pool_maxsize or settings.HTTP_POOL_MAXSIZE,
+                minimum=settings.API_MIN_CONCURRENCY,
+            )
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "connects": 0,
+            "connect_time": 0.0,
+            "transfer_time": 0.0,
+            "throttled": 0,       # 429 responses
+            "server_errors": 0,   # 5xx responses
+            "retried": 0,         # attempts scheduled again after a failure
+            "dropped": 0,         # calls given up on
+            "throttle_wait": 0.0,  # seconds spent waiting for the client-side quota
+        }
+
+    def get(self, url: str, params: dict, headers: dict | None = None) -> tuple[requests.Response, RequestTiming]:
+        """
+        Single GET attempt. The body is read before returning so the
+        timing covers the full transfer and the connection goes back to the pool.
+        """
+        waited = self.rate_limiter.acquire() if self.rate_limiter is not None else 0.0
+
+        with self.concurrency.slot() if self.concurrency is not None else nullcontext():
+            _timing.connect = 0.0
+            start = time.perf_counter()
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            response.content  # noqa: B018 - force the body read inside the timed window
+            total = time.perf_counter() - start
+
+        connect = min(_timing.connect, total)
+        timing = RequestTiming(connect=connect, transfer=total - connect)
+        self._record(timing, waited)
+        self._observe(response)
+        return response, timing
+
+    def _observe(self, response: requests.Response) -> None:
+        """Feed the response status back into the quota and the in-flight limit."""
+        status = response.status_code
+        if status == 429 or status >= 500:
+            self.count("throttled" if status == 429 else "server_errors")
+            if status == 429 and self.rate_limiter is not None:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after:
+                    self.rate_limiter.pause(retry_after)
+            if self.concurrency is not None and self.concurrency.on_overload():
+                logger.warning(f"HTTP {status}: in-flight limit lowered to {self.concurrency.limit}")
+        elif self.concurrency is not None:
+            self.concurrency.on_success()
+
+    @staticmethod
+    def parse_json(response: requests.Response, validate: Callable[[dict], None] | None = None) -> dict:
+        """
+        Parsed JSON body of a successful response.
+        Raises on non-200 responses and on payloads rejected by `validate`.
+        """
+        # HTTP-level failure
+        if response.status_code != 200:
+            raise HttpStatusError(
+                response.status_code,
+                response.text,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+
+        data = response.json()
+        if validate is not None:
+            validate(data)
+        return data
+
+    def get_json(self, url: str, params: dict, validate: Callable[[dict], None] | None = None) -> tuple[dict, RequestTiming]:
+        """Single attempt returning parsed JSON (see parse_json)."""
+        response, timing = self.get(url, params)
+        return self.parse_json(response, validate), timing
+
+    def call_with_retries(self, call: Callable[[], T], label: str) -> T | None:
+        """
+        Run `call` under the client's retry policy.
+        Returns None after all attempts fail.
+        """
+        policy = self.retry_policy
+
+        for attempt in range(1, policy.attempts + 1):
+            try:
+                return call()
+
+            except Exception as exc:
+                logger.warning(
+                    f"API attempt {attempt}/{policy.attempts} failed for {label}: {exc}"
+                )
+
+                # Retry if attempts remain and the error is transient
+                if policy.should_retry(attempt, exc):
+                    self.count("retried")
+                    time.sleep(policy.delay(attempt, exc))
+                else:
+                    self.count("dropped")
+                    logger.error(f"API permanently failed for {label}")
+                    break
+
+        return None
+
+    def _record(self, timing: RequestTiming, waited: float = 0.0) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["connects"] += 0 if timing.reused else 1
+            self._stats["connect_time"] += timing.connect
+            self._stats["transfer_time"] += timing.transfer
+            self._stats["throttle_wait"] += waited
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """Bump one of the outcome counters (throttled, server_errors, retried, dropped)."""
+        with self._lock:
+            self._stats[counter] += amount
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def log_stats(self) -> None:
+        stats = self.stats()
+        if not stats["requests"]:
+            return
+        logger.info(
+            f"HTTP: {stats['requests']} requests over {stats['connects']} new connections, "
+            f"connect {stats['connect_time']:.3f}s, transfer {stats['transfer_time']:.3f}s, "
+            f"quota wait {stats['throttle_wait']:.3f}s; {stats['throttled']} throttled, "
+            f"{stats['server_errors']} server errors, {stats['retried']} retried, {stats['dropped']} dropped"
+            + (f", in-flight limit {self.concurrency.limit}" if self.concurrency is not None else "")
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: WeatherHttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> WeatherHttpClient:
+    """Process-wide shared client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = WeatherHttpClient()
+        return _client
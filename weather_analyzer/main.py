@@ -1,13 +1,19 @@
 import argparse
-from weather_analyzer.fetch_weather import fetch_weather
-from weather_analyzer.process_data import process_weather_data
-from weather_analyzer.utils import save_json_history
-from weather_analyzer.db.insert_weather import insert_weather_records
+from weather_analyzer.fetch_weather import fetch_weather_many
+from weather_analyzer.fetch_group import fetch_weather_grouped
+from weather_analyzer.http_client import get_client
+from weather_analyzer.cache import get_cache
+from weather_analyzer.process_data import process_weather_batch
+from weather_analyzer.records import ObservationCache, WeatherBatch
+from weather_analyzer.archive import RawArchive
 from weather_analyzer.logger import get_logger
 from weather_analyzer.config.settings import settings
 
 logger = get_logger(__name__)
 
+# Newest stored observation per city, shared by every run in this process
+observation_cache = ObservationCache()
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -23,13 +29,144 @@ def parse_args():
     parser.add_argument(
         "--raw-output",
         default=None,
-        help="Folder path to raw JSON output files"
+        help="Folder of the raw payload archive (daily gzip NDJSON files)"
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of cities fetched in parallel (default: FETCH_CONCURRENCY)"
+    )
+
+    parser.add_argument(
+        "--fetch-mode",
+        choices=["single", "group"],
+        default=None,
+        help="single: one API call per city, group: up to GROUP_CHUNK_SIZE cities per call"
+    )
+
+    parser.add_argument(
+        "--insert-mode",
+        choices=["batch", "copy"],
+        default=None,
+        help="batch: multi-row INSERT, copy: COPY into a staging table then merge"
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        choices=["phased", "async"],
+        default=None,
+        help="phased: fetch all, then process and insert; async: stream each city through to the database"
     )
 
     return parser.parse_args()
 
 
-def main(cities=None, raw_output=None):
+def fetch_raw_weather(cities: list[str], concurrency=None, fetch_mode=None, on_result=None) -> list[dict]:
+    """
+    Fetch raw API payloads for `cities`; cities that failed are logged and left out.
+    `on_result(city, data)` receives each payload as soon as it arrives.
+    """
+    fetch_mode = fetch_mode or settings.FETCH_MODE
+
+    try:
+        if fetch_mode == "group":
+            results = fetch_weather_grouped(cities, concurrency=concurrency, on_result=on_result)
+        else:
+            results = fetch_weather_many(cities, concurrency=concurrency, on_result=on_result)
+    except Exception as e:
+        logger.error(f"Fatal error while fetching weather: {e}")
+        results = [None] * len(cities)
+
+    get_client().log_stats()
+    if get_cache() is not None:
+        get_cache().log_stats()
+
+    raw_weather_data = []
+    for city, data in zip(cities, results):
+        if data:
+            raw_weather_data.append(data)
+        else:
+            logger.warning(f"No data returned for {city}")
+    return raw_weather_data
+
+
+def fetch_and_archive(cities: list[str], raw_output: str, concurrency=None, fetch_mode=None) -> list[dict]:
+    """fetch_raw_weather, appending every payload to the raw archive as it arrives."""
+    try:
+        archive = RawArchive(raw_output)
+    except Exception as e:
+        logger.warning(f"Raw archive unavailable: {e}")
+        return fetch_raw_weather(cities, concurrency=concurrency, fetch_mode=fetch_mode)
+
+    def archive_payload(city: str, data: dict) -> None:
+        try:
+            archive.write(city, data)
+        except Exception as e:
+            logger.warning(f"Failed to archive raw payload for {city}: {e}")
+
+    try:
+        return fetch_raw_weather(cities, concurrency=concurrency, fetch_mode=fetch_mode, on_result=archive_payload)
+    finally:
+        try:
+            archive.close()
+        except Exception as e:
+            logger.warning(f"Failed to finalize raw archive: {e}")
+
+
+def persist_records(records, insert_mode=None, conn=None) -> int:
+    """
+    Insert processed records (a WeatherBatch or record dicts) with batch
+    INSERT or COPY, optionally on a caller-held connection.
+
+    With OBSERVATION_DEDUP, a WeatherBatch is first checked against the
+    newest stored observation per city (observation_cache): readings the
+    provider has not updated since the last run never reach the database.
+    """
+    # psycopg2 is only imported once there is something to write
+    from weather_analyzer.db.insert_weather import insert_weather_records, bulk_insert_weather_records
+
+    dedup = settings.OBSERVATION_DEDUP and isinstance(records, WeatherBatch)
+    if dedup:
+        fresh = observation_cache.fresh(records)
+        if len(fresh) < len(records):
+            logger.info(f"Skipped {len(records) - len(fresh)} unchanged observations")
+        if not len(fresh):
+            return 0
+        records = fresh
+
+    insert_mode = insert_mode or settings.INSERT_MODE
+    insert = bulk_insert_weather_records if insert_mode == "copy" else insert_weather_records
+    try:
+        # strict: only remember observations that were really written
+        inserted = insert(records, conn=conn, strict=dedup)
+    except RuntimeError:
+        return 0
+
+    if dedup:
+        observation_cache.remember(records)
+    return inserted
+
+
+def run_async(cities: list[str], raw_output: str, concurrency=None) -> None:
+    """PIPELINE_MODE=async: fetch, process and insert each city as it arrives (async_pipeline)."""
+    import asyncio
+    from weather_analyzer.async_pipeline import run_async_pipeline
+
+    try:
+        stats = asyncio.run(run_async_pipeline(
+            cities, raw_output=raw_output, concurrency=concurrency, observations=observation_cache,
+        ))
+    except Exception as e:
+        logger.critical(f"Async pipeline failed: {e}")
+        return
+
+    if not stats["fetched"]:
+        logger.critical("All cities failed — pipeline aborted")
+
+
+def main(cities=None, raw_output=None, concurrency=None, fetch_mode=None, insert_mode=None, pipeline=None):
     """
     Main weather data pipeline.
     Safe, fault-tolerant, production-ready.
@@ -40,50 +177,45 @@ def main(cities=None, raw_output=None):
         args = parse_args()
         cities = args.cities
         raw_output = args.raw_output
+        concurrency = args.concurrency
+        fetch_mode = args.fetch_mode
+        insert_mode = args.insert_mode
+        pipeline = args.pipeline
 
     # Apply config defaults
     cities = cities or settings.CITIES
     raw_output = raw_output or "data/history/raw"
+    fetch_mode = fetch_mode or settings.FETCH_MODE
+    insert_mode = insert_mode or settings.INSERT_MODE
+    pipeline = pipeline or settings.PIPELINE_MODE
 
     logger.info(f"Weather pipeline started for cities: {cities}")
 
-    raw_weather_data = []
-
-    for city in cities:
-        try:
-            logger.info(f"Fetching weather for {city}")
-            data = fetch_weather(city)
-
-            if data:
-                raw_weather_data.append(data)
-            else:
-                logger.warning(f"No data returned for {city}")
-
-        except Exception as e:
-            logger.error(f"Fatal error while processing {city}: {e}")
+    if pipeline == "async":
+        # One request per city, COPY-merged in micro-batches: FETCH_MODE and INSERT_MODE do not apply
+        run_async(cities, raw_output, concurrency=concurrency)
+        logger.info("Weather pipeline completed")
+        return
 
+    raw_weather_data = fetch_and_archive(cities, raw_output, concurrency=concurrency, fetch_mode=fetch_mode)
     if not raw_weather_data:
         logger.critical("All cities failed — pipeline aborted")
         return
 
     try:
-        raw_file = save_json_history(raw_weather_data, raw_output)
-        logger.info(f"Raw JSON snapshot saved: {raw_file}")
-    except Exception as e:
-        logger.warning(f"Failed to save raw JSON history: {e}")
-
-    try:
-        processed_data = process_weather_data(raw_weather_data)
+        processed_data = process_weather_batch(raw_weather_data)
     except Exception as e:
         logger.critical(f"Data processing failed: {e}")
         return
 
     try:
-        inserted = insert_weather_records(processed_data)
-        logger.info(f"{inserted} records inserted into PostgreSQL")
+        persist_records(processed_data, insert_mode=insert_mode)
     except Exception as e:
         logger.critical(f"Database insertion failed: {e}")
 
+    from weather_analyzer.db.pool import get_pool
+    get_pool().log_metrics()
+
     logger.info("Weather pipeline completed")
 
 
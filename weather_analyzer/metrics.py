@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+
+from weather_analyzer.config.settings import settings
+
+
+@dataclass(frozen=True)
+class Metric:
+    """
+    One observation field: where it sits in the OpenWeatherMap payload
+    and how it is stored.
+
+    - path: (payload object, key), e.g. ("wind", "speed")
+    - sql_type: nullable column type in weather_summary
+    - dtype: compact in-memory history dtype
+    - minimum: readings below it are treated as missing
+    - absent: value when the whole payload object is missing (the API
+      leaves out "rain" / "snow" when there is none); None means NULL
+    """
+
+    name: str
+    path: tuple[str, str]
+    sql_type: str
+    dtype: str
+    minimum: float | None = 0
+    absent: float | None = None
+
+    @property
+    def integer(self) -> bool:
+        return self.dtype.startswith("Int")
+
+
+# Registry order is column order everywhere (records, inserts, history)
+METRICS: dict[str, Metric] = {
+    metric.name: metric
+    for metric in (
+        Metric("temperature", ("main", "temp"), "DOUBLE PRECISION", "float32", minimum=None),
+        Metric("humidity", ("main", "humidity"), "INTEGER", "Int8"),
+        Metric("pressure", ("main", "pressure"), "INTEGER", "Int16"),
+        Metric("wind_speed", ("wind", "speed"), "REAL", "float32"),
+        Metric("wind_deg", ("wind", "deg"), "SMALLINT", "Int16"),
+        Metric("clouds", ("clouds", "all"), "SMALLINT", "Int8"),
+        Metric("rain_1h", ("rain", "1h"), "REAL", "float32", absent=0.0),
+        Metric("snow_1h", ("snow", "1h"), "REAL", "float32", absent=0.0),
+    )
+}
+
+# Columns every weather_summary has had; the others are added by migrations
+CORE_METRICS = ("temperature", "humidity")
+
+
+def selected_metrics(names: list[str] | None = None) -> tuple[str, ...]:
+    """
+    The stored metric set (default: settings.METRICS) in registry order.
+    temperature is always included: a payload without it is unusable.
+    """
+    names = settings.METRICS if names is None else names
+    unknown = set(names) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {sorted(unknown)} (known: {', '.join(METRICS)})")
+    return tuple(name for name in METRICS if name == "temperature" or name in names)
@@ -0,0 +1,200 @@
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import pandas as pd
+
+from weather_analyzer.main import fetch_and_archive, persist_records
+from weather_analyzer.process_data import process_weather_batch
+from weather_analyzer.records import WeatherBatch
+from weather_analyzer.db.pool import get_pool
+from weather_analyzer.db.schema import maintain as maintain_schema
+from weather_analyzer.plotting import plot_trends
+from weather_analyzer.plotting.plot_trends_postgres import (
+    compute_metric_trends,
+    fetch_weather_data,
+    load_trends,
+    plot_temperature_trends,
+)
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PipelineRun:
+    """
+    State shared by the stages of one run: the inputs, the single database
+    connection, and each stage's output, so nothing is fetched or read twice.
+
+    The connection is checked out by the first stage that calls db(), so
+    fetching (and archiving raw payloads) never depends on the database.
+    """
+
+    cities: list[str]
+    raw_output: str = "data/history/raw"
+    fetch_mode: str | None = None
+    insert_mode: str | None = None
+    concurrency: int | None = None
+    render_mode: str | None = None
+
+    conn: Any = None
+    raw: list[dict] = field(default_factory=list)
+    records: WeatherBatch | None = None
+    inserted: int = 0
+    history: pd.DataFrame | None = None
+    overall_stats: pd.DataFrame | None = None
+    daily_stats: pd.DataFrame | None = None
+    metric_stats: dict[str, tuple] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    _stack: ExitStack | None = field(default=None, repr=False)
+
+    def db(self):
+        """The run's pooled connection, checked out on first use."""
+        if self.conn is None:
+            self.conn = self._stack.enter_context(get_pool().connection())
+        return self.conn
+
+
+# ----------------------
+# Stages
+# ----------------------
+def fetch_stage(run: PipelineRun) -> None:
+    run.raw = fetch_and_archive(run.cities, run.raw_output, concurrency=run.concurrency, fetch_mode=run.fetch_mode)
+    if not run.raw:
+        logger.critical("All cities failed — nothing to persist")
+        return
+    run.records = process_weather_batch(run.raw)
+
+
+def persist_stage(run: PipelineRun) -> None:
+    # No caller-held connection: the insert checks out its own and retries
+    # checkout plus insert DB_RETRIES times
+    if run.records:
+        run.inserted = persist_records(run.records, insert_mode=run.insert_mode)
+
+
+def maintain_stage(run: PipelineRun) -> None:
+    # Keep upcoming partitions in place and apply retention
+    try:
+        maintain_schema(conn=run.db())
+    except Exception:
+        logger.exception("Partition maintenance failed")
+
+
+def export_stage(run: PipelineRun) -> None:
+    # Refresh the Parquet dataset analysts (and a parquet HISTORY_SOURCE) read from
+    if not settings.PARQUET_EXPORT and settings.HISTORY_SOURCE != "parquet":
+        return
+    from weather_analyzer.dataset import export_history
+    export_history(conn=run.db())
+
+
+def analyze_stage(run: PipelineRun) -> None:
+    mode = settings.ANALYTICS_MODE
+    if mode == "full":
+        # Every raw row is read once and reused for analytics and the overview
+        # chart; every stored metric in one pass, temperature drives the charts
+        run.history = fetch_weather_data(conn=run.db())
+        run.metric_stats = compute_metric_trends(run.history)
+        run.overall_stats, run.daily_stats = run.metric_stats.get("temperature", (None, None))
+    else:
+        # Aggregates come from the rollup or trend state; the overview chart
+        # only needs its own recent window of raw rows
+        run.overall_stats, run.daily_stats = load_trends(mode, conn=run.db())
+        if run.render_mode == "inprocess":
+            run.history = fetch_weather_data(start=plot_trends.overview_start(), conn=run.db())
+    if run.overall_stats is None:
+        logger.warning("No historical data available.")
+        return
+
+    logger.info("Weather analytics computed successfully.")
+    logger.info(f"\nOverall stats:\n{run.overall_stats}")
+    for metric, (overall, _) in run.metric_stats.items():
+        if metric != "temperature" and overall is not None:
+            logger.info(f"\nOverall {metric} stats:\n{overall}")
+
+
+def render_stage(run: PipelineRun) -> None:
+    if run.overall_stats is None:
+        return
+
+    plot_temperature_trends(run.daily_stats)
+
+    if run.render_mode == "subprocess":
+        # Isolated interpreter: re-reads history on its own connection
+        logger.info("Running plot_trends.py (city temperature over time)")
+        subprocess.run([sys.executable, "-m", "weather_analyzer.plotting.plot_trends"], check=True)
+    elif run.history is not None and not run.history.empty:
+        plot_trends.plot_temperature_trends(run.history, show=False)
+
+
+STAGES: list[tuple[str, Callable[[PipelineRun], None]]] = [
+    ("fetch", fetch_stage),
+    ("persist", persist_stage),
+    ("maintain", maintain_stage),
+    ("export", export_stage),
+    ("analyze", analyze_stage),
+    ("render", render_stage),
+]
+
+
+# ----------------------
+# Runner
+# ----------------------
+def run_pipeline(
+    cities: list[str] | None = None,
+    raw_output: str = "data/history/raw",
+    fetch_mode: str | None = None,
+    insert_mode: str | None = None,
+    concurrency: int | None = None,
+    render_mode: str | None = None,
+    stages: list[str] | None = None,
+) -> PipelineRun:
+    """
+    Fetch → persist → maintain → export → analyze → render in one process, the
+    stages after persist on one pooled connection (checked out when the first
+    of them needs it), with per-stage wall-clock timings in `run.timings`.
+    `stages` runs a subset (e.g. ["fetch", "persist"] for ingestion only).
+    A failing stage stops the run; earlier stages' work is kept.
+    """
+    unknown = set(stages or []) - {name for name, _ in STAGES}
+    if unknown:
+        raise ValueError(f"Unknown pipeline stages: {sorted(unknown)}")
+
+    run = PipelineRun(
+        cities=cities or settings.CITIES,
+        raw_output=raw_output,
+        fetch_mode=fetch_mode,
+        insert_mode=insert_mode,
+        concurrency=concurrency,
+        render_mode=render_mode or settings.RENDER_MODE,
+    )
+
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        run._stack = stack
+        try:
+            for name, stage in STAGES:
+                if stages is not None and name not in stages:
+                    continue
+                stage_started = time.perf_counter()
+                try:
+                    stage(run)
+                finally:
+                    run.timings[name] = time.perf_counter() - stage_started
+                    logger.info(f"Stage {name} finished in {run.timings[name]:.2f}s")
+        finally:
+            run.conn = None
+            run._stack = None
+
+    run.timings["total"] = time.perf_counter() - started
+    logger.info(
+        "Pipeline timings: "
+        + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in run.timings.items())
+    )
+    return run
@@ -1,42 +1,36 @@
-import psycopg2
-import pandas as pd
-import matplotlib.pyplot as plt
+from datetime import datetime, timedelta
+
 from weather_analyzer.logger import get_logger
-from dotenv import load_dotenv
-import os
+from weather_analyzer.analytics.core import city_slices
+from weather_analyzer.dataset import load_history
 from weather_analyzer.config.settings import settings
 
 
 logger = get_logger(__name__)
 
-DB_CONFIG = {
-    "host": settings.DB_HOST,
-    "port": settings.DB_PORT,
-    "dbname": settings.DB_NAME,
-    "user": settings.DB_USER,
-    "password": settings.DB_PASSWORD
-}
-
-
-def fetch_weather_history():
-    """Query historical weather data from PostgreSQL"""
-    conn = psycopg2.connect(**DB_CONFIG)
-    query = """
-        SELECT city, temperature, fetched_at
-        FROM weather_summary
-        ORDER BY fetched_at ASC;
+
+def fetch_weather_history(cities=None, start=None, end=None):
+    """Query historical weather data from HISTORY_SOURCE (compact dtypes, only the plotted columns)"""
+    return load_history(cities=cities, start=start, end=end, columns=["city", "temperature", "fetched_at"])
+
+
+def overview_start():
+    """
+    Earliest fetched_at on the overview chart: the last OVERVIEW_DAYS of rows,
+    or None (all rows) in full analytics mode, which reads everything anyway.
     """
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    if settings.ANALYTICS_MODE == "full" or settings.OVERVIEW_DAYS <= 0:
+        return None
+    return datetime.utcnow() - timedelta(days=settings.OVERVIEW_DAYS)
 
 
-def plot_temperature_trends(df):
+def plot_temperature_trends(df, path="plots/temperature.png", show=True):
     """Plot temperature trends per city"""
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 6))
 
-    for city in df['city'].unique():
-        city_data = df[df['city'] == city]
+    for city, city_data in city_slices(df):
         plt.plot(city_data['fetched_at'], city_data['temperature'], marker='o', label=city)
 
     plt.xlabel("Time")
@@ -47,13 +41,15 @@ def plot_temperature_trends(df):
     plt.tight_layout()
 
     # Save plot
-    plt.savefig("plots/temperature.png")
-    logger.info("Temperature trend plot saved: plots/temperature.png")
-    plt.show()
+    plt.savefig(path)
+    logger.info(f"Temperature trend plot saved: {path}")
+    if show:
+        plt.show()
+    plt.close()
 
 
 if __name__ == "__main__":
-    df = fetch_weather_history()
+    df = fetch_weather_history(start=overview_start())
     if df.empty:
         logger.warning("No historical data found to plot.")
     else:
@@ -1,42 +1,38 @@
 import pandas as pd
-import psycopg2
-import matplotlib.pyplot as plt
-from pathlib import Path
 from weather_analyzer.logger import get_logger
-from dotenv import load_dotenv
+from weather_analyzer.dataset import load_history
+from weather_analyzer.db.rollup import fetch_daily_rollup
+from weather_analyzer.analytics import core
+from weather_analyzer.analytics.incremental import IncrementalTrends, trends_from_aggregates
+from weather_analyzer.metrics import selected_metrics
+from weather_analyzer.plotting.render import render_city_plots
 from weather_analyzer.config.settings import settings
-import os
 
 logger = get_logger(__name__)
 
+
 # ----------------------
-# PostgreSQL connection
+# History
 # ----------------------
-
-DB_CONFIG = {
-    "host": settings.DB_HOST,
-    "port": settings.DB_PORT,
-    "dbname": settings.DB_NAME,
-    "user": settings.DB_USER,
-    "password": settings.DB_PASSWORD
-}
-
-
-def fetch_weather_data():
-    """Fetch historical weather data from PostgreSQL."""
+def fetch_weather_data(since=None, start=None, end=None, cities=None, conn=None):
+    """
+    Fetch historical weather data from HISTORY_SOURCE (PostgreSQL or the
+    exported Parquet dataset).
+
+    - since: only rows fetched strictly after this timestamp
+    - start / end: half-open time window [start, end)
+    - cities: optional city filter
+    - conn: read on a caller-held connection instead of a pooled one
+    Rows are streamed in chunks through a server-side cursor into compact
+    dtypes; bounds stay plain fetched_at predicates so partitions are pruned.
+    Parquet reads prune day partitions and columns the same way; `conn` is unused.
+    """
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        query = """
-            SELECT city, temperature, humidity, fetched_at
-            FROM weather_summary
-            ORDER BY fetched_at ASC;
-        """
-        df = pd.read_sql(query, conn, parse_dates=["fetched_at"])
-        conn.close()
-        logger.info("Weather data fetched from PostgreSQL successfully.")
+        df = load_history(cities=cities, start=start, end=end, since=since, conn=conn)
+        logger.info(f"Weather data fetched from {settings.HISTORY_SOURCE} successfully.")
         return df
     except Exception as e:
-        logger.error(f"Error fetching data from PostgreSQL: {e}")
+        logger.error(f"Error fetching weather history from {settings.HISTORY_SOURCE}: {e}")
         return pd.DataFrame()  # return empty DataFrame on failure
 
 
@@ -44,74 +40,77 @@ def fetch_weather_data():
 # Analytics
 # ----------------------
 def compute_trends(df: pd.DataFrame):
+    """
+    Overall and daily per-city min / max / mean temperature.
+    Rows with an unparseable fetched_at are ignored.
+    """
     if df.empty:
         logger.warning("No data available for analytics.")
         return None, None
 
-    # 🔑 Force normalization (THIS IS THE FIX)
-    df["fetched_at"] = pd.to_datetime(df["fetched_at"], errors="coerce")
-
-    # Drop rows that failed conversion (very important)
-    df = df.dropna(subset=["fetched_at"])
+    return core.compute_trends(df)
 
-    # Create date column safely
-    df["date"] = df["fetched_at"].dt.date
-
-    overall_stats = (
-        df.groupby("city")["temperature"]
-        .agg(["min", "max", "mean"])
-        .reset_index()
-    )
-
-    daily_stats = (
-        df.groupby(["city", "date"])["temperature"]
-        .agg(["min", "max", "mean"])
-        .reset_index()
-    )
-
-    return overall_stats, daily_stats
 
+def compute_metric_trends(df: pd.DataFrame, metrics: list[str] | None = None):
+    """
+    {metric: (overall_stats, daily_stats)} for the stored metrics present
+    in `df` (default: settings.METRICS), aggregated from one shared sort
+    of the rows rather than one pass per metric.
+    """
+    if df.empty:
+        logger.warning("No data available for analytics.")
+        return {}
+
+    metrics = [metric for metric in (metrics or selected_metrics()) if metric in df]
+    return core.compute_metric_trends(df, metrics)
+
+
+def load_trends(mode: str | None = None, conn=None, history: pd.DataFrame | None = None):
+    """
+    (overall_stats, daily_stats) according to ANALYTICS_MODE:
+    - full: read every raw row and run compute_trends
+    - incremental: recompute the days around the stored watermark into persisted aggregates
+    - rollup: read per-day aggregates from weather_daily_rollup, no raw rows at all
+    An already loaded `history` frame is used instead of reading raw rows again;
+    `conn` is passed through to every database read.
+    """
+    mode = mode or settings.ANALYTICS_MODE
+
+    if mode == "rollup":
+        return trends_from_aggregates(fetch_daily_rollup(conn=conn))
+    if mode == "incremental":
+        if history is not None:
+            def fetch(start=None):
+                return history if start is None else history[history["fetched_at"] >= start]
+        else:
+            def fetch(start=None):
+                return fetch_weather_data(start=start, conn=conn)
+        return IncrementalTrends().update(fetch)
+    if history is None:
+        history = fetch_weather_data(conn=conn)
+    return compute_trends(history)
 
 
 # ----------------------
 # Plotting
 # ----------------------
-def plot_temperature_trends(daily_stats: pd.DataFrame):
-    """Plot min, max, avg temperatures per city over time."""
+def plot_temperature_trends(daily_stats: pd.DataFrame, workers: int | None = None, force: bool = False):
+    """
+    Plot min, max, avg temperatures per city over time.
+    Figures render in parallel (PLOT_WORKERS); unchanged cities are skipped.
+    """
     if daily_stats is None or daily_stats.empty:
         logger.warning("No data available for plotting.")
         return
 
-    plots_path = Path("plots")
-    plots_path.mkdir(parents=True, exist_ok=True)
-
-    cities = daily_stats["city"].unique()
-
-    for city in cities:
-        city_data = daily_stats[daily_stats["city"] == city]
-        plt.figure(figsize=(10, 5))
-        plt.plot(city_data["date"], city_data["min"], label="Min Temp", marker='o')
-        plt.plot(city_data["date"], city_data["max"], label="Max Temp", marker='o')
-        plt.plot(city_data["date"], city_data["mean"], label="Avg Temp", marker='o')
-        plt.title(f"Temperature Trends for {city}")
-        plt.xlabel("Date")
-        plt.ylabel("Temperature (°C)")
-        plt.xticks(rotation=45)
-        plt.legend()
-        plt.grid(True)
-        plt.tight_layout()
-        file_path = plots_path / f"temperature_trends_{city}.png"
-        plt.savefig(file_path)
-        plt.close()
-        logger.info(f"Temperature trend plot saved: {file_path}")
+    render_city_plots(daily_stats, output_dir="plots", workers=workers, force=force)
 
 
 # ----------------------
 # Main
 # ----------------------
 def main():
-    df = fetch_weather_data()
-    overall_stats, daily_stats = compute_trends(df)
+    overall_stats, daily_stats = load_trends()
 
     if overall_stats is not None:
         logger.info("Overall temperature stats per city:\n" + str(overall_stats))
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from weather_analyzer.analytics.core import city_slices
+from weather_analyzer.logger import get_logger
+from weather_analyzer.config.settings import settings
+
+logger = get_logger(__name__)
+
+# Bump when the figure layout changes so every PNG is re-rendered once
+RENDER_VERSION = 1
+MANIFEST_NAME = ".render_manifest.json"
+
+
+# ----------------------
+# Render tasks
+# ----------------------
+def city_plot_path(output_dir: Path, city: str) -> Path:
+    return output_dir / f"temperature_trends_{city}.png"
+
+
+def _task(city: str, rows: pd.DataFrame, output_dir: Path) -> dict:
+    """Plain arrays only, so tasks pickle cheaply to worker processes."""
+    return {
+        "city": city,
+        "date": rows["date"].to_numpy(dtype="datetime64[ns]"),
+        "min": rows["min"].to_numpy(dtype=np.float64),
+        "max": rows["max"].to_numpy(dtype=np.float64),
+        "mean": rows["mean"].to_numpy(dtype=np.float64),
+        "path": str(city_plot_path(output_dir, city)),
+    }
+
+
+def _worker_task(task: dict) -> dict:
+    return {key: task[key] for key in ("city", "date", "min", "max", "mean", "path")}
+
+
+def content_hash(task: dict) -> str:
+    """Fingerprint of everything that ends up in a city's figure."""
+    digest = hashlib.sha256(f"{RENDER_VERSION}\0{task['city']}".encode("utf-8"))
+    for column in ("date", "min", "max", "mean"):
+        digest.update(np.ascontiguousarray(task[column]).tobytes())
+    return digest.hexdigest()
+
+
+def render_city(task: dict) -> str:
+    """
+    Draw and save one city's min/max/avg figure. Uses a bare Figure
+    (Agg canvas) rather than pyplot, so no GUI backend or global figure
+    state is involved in the workers.
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.plot(task["date"], task["min"], label="Min Temp", marker='o')
+    ax.plot(task["date"], task["max"], label="Max Temp", marker='o')
+    ax.plot(task["date"], task["mean"], label="Avg Temp", marker='o')
+    ax.set_title(f"Temperature Trends for {task['city']}")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Temperature (°C)")
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(task["path"])
+    return task["path"]
+
+
+# ----------------------
+# Manifest
+# ----------------------
+def _load_manifest(path: Path) -> dict[str, str]:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable render manifest {path}: {e}")
+        return {}
+
+
+def _save_manifest(path: Path, manifest: dict[str, str]) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, sort_keys=True)
+    tmp_path.replace(path)
+
+
+# ----------------------
+# Rendering stage
+# ----------------------
+def _pool_context():
+    # Not fork: the scheduler renders while ingest threads hold pool, HTTP
+    # and logging locks, and a forked child could inherit them locked.
+    # A forkserver starts workers from a clean, single-threaded process
+    # with the rendering modules preloaded; spawn is the portable fallback
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["weather_analyzer.plotting.render", "matplotlib.figure"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def render_city_plots(
+    daily_stats: pd.DataFrame,
+    output_dir: str | Path = "plots",
+    workers: int | None = None,
+    force: bool = False,
+) -> dict[str, int]:
+    """
+    Render one PNG per city from daily_stats (city, date, min, max, mean).
+
+    - Cities whose data hash matches the manifest and whose PNG still
+      exists are skipped (force=True renders everything)
+    - Remaining figures fan out over a process pool (Agg rendering);
+      workers=1 renders in-process. Default: PLOT_WORKERS, 0 = CPU count
+    Returns counts of rendered, skipped and failed cities.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = settings.PLOT_WORKERS if workers is None else workers
+    workers = workers or os.cpu_count() or 1
+
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest = {} if force else _load_manifest(manifest_path)
+
+    pending = []
+    skipped = 0
+    for city, rows in city_slices(daily_stats):
+        task = _task(str(city), rows, output_dir)
+        task["hash"] = content_hash(task)
+        if manifest.get(task["city"]) == task["hash"] and Path(task["path"]).exists():
+            skipped += 1
+        else:
+            pending.append(task)
+
+    rendered = failed = 0
+    if pending and (workers == 1 or len(pending) == 1):
+        for task in pending:
+            try:
+                render_city(task)
+                manifest[task["city"]] = task["hash"]
+                rendered += 1
+            except Exception:
+                logger.exception(f"Rendering plot for {task['city']} failed")
+                failed += 1
+
+    elif pending:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            mp_context=_pool_context(),
+        ) as pool:
+            # Workers get the figure data and output path, nothing else
+            futures = {pool.submit(render_city, _worker_task(task)): task for task in pending}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    future.result()
+                    manifest[task["city"]] = task["hash"]
+                    rendered += 1
+                except Exception:
+                    logger.exception(f"Rendering plot for {task['city']} failed")
+                    failed += 1
+
+    if rendered:
+        _save_manifest(manifest_path, manifest)
+
+    logger.info(
+        f"City plots: {rendered} rendered, {skipped} unchanged, {failed} failed "
+        f"({min(workers, max(len(pending), 1))} workers)"
+    )
+    return {"rendered": rendered, "skipped": skipped, "failed": failed}
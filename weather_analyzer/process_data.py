@@ -1,36 +1,52 @@
-from weather_analyzer.logger import get_logger
 from datetime import datetime
+from typing import Sequence
+
+from weather_analyzer.records import WeatherBatch, observation_time, parse_payload  # noqa: F401 - re-exported
+from weather_analyzer.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-def process_weather_data(weather_data: list) -> list:
+def process_weather_data(
+    weather_data: list,
+    fetched_at: datetime | None = None,
+    use_observation_time: bool = False,
+) -> list:
     """
     Convert raw OpenWeatherMap JSON data into a clean summary.
+
+    - fetched_at: timestamp for every record (default: now, UTC)
+    - use_observation_time: take each payload's own `dt` instead, falling
+      back to fetched_at; replays of archived payloads use this
+    - A payload without humidity gives humidity None; one without a name
+      or a numeric temperature is skipped
     """
     processed = []
-    fetched_at = datetime.utcnow()
+    fetched_at = fetched_at or datetime.utcnow()
 
     for item in weather_data:
         if item is None:
             logger.warning("Received None weather item")
             continue
 
-        city = item.get("name")
-        main = item.get("main", {})
-
-        if not city or not main:
+        record = parse_payload(item, fetched_at, use_observation_time)
+        if record is None:
             logger.warning("Incomplete weather data received")
             continue
 
-        temperature = main.get("temp")
-        humidity = main.get("humidity")
-
-        processed.append({
-            "city": item["name"],
-            "temperature": item["main"]["temp"],
-            "humidity": item["main"]["humidity"],
-            "fetched_at": fetched_at,
-        })
+        processed.append(record.as_dict())
 
     return processed
+
+
+def process_weather_batch(
+    weather_data: Sequence,
+    fetched_at: datetime | None = None,
+    use_observation_time: bool = False,
+) -> WeatherBatch:
+    """process_weather_data as a columnar WeatherBatch, parsed in one pass."""
+    batch = WeatherBatch.from_payloads(weather_data, fetched_at, use_observation_time)
+    dropped = len(weather_data) - len(batch)
+    if dropped:
+        logger.warning(f"Skipped {dropped} incomplete weather payloads")
+    return batch
@@ -0,0 +1,160 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator
+
+
+def parse_retry_after(value: str | None, now: Callable[[], datetime] | None = None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    current = now() if now is not None else datetime.now(timezone.utc)
+    return max(0.0, (moment - current).total_seconds())
+
+
+class TokenBucket:
+    """
+    Client-side request quota: `rate_per_minute` tokens refill continuously,
+    up to `burst` saved. acquire() blocks until a token is free;
+    try_acquire() is its non-blocking step.
+
+    pause() stops handing out tokens until a deadline, so a Retry-After
+    from the server holds back every caller, not just the one that got it.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """
+        Take one token if one is free and return 0.0; otherwise take nothing
+        and return how long until one should be. Never blocks, so asyncio
+        callers can await the wait themselves.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Take one token, waiting as long as needed. Returns the time spent waiting."""
+        waited = 0.0
+        while (wait := self.try_acquire()) > 0:
+            self._sleep(wait)
+            waited += wait
+        return waited
+
+    def set_rate(self, rate_per_minute: float, burst: int | None = None) -> None:
+        """Change the quota in place; tokens already saved are kept up to the new burst."""
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = rate_per_minute / 60.0
+            if burst is not None:
+                self.capacity = max(1, burst)
+                self._tokens = min(self._tokens, self.capacity)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for `seconds`; afterwards restart from an empty bucket."""
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+class AdaptiveConcurrency:
+    """
+    Limit on requests in flight that adapts to the server (AIMD):
+    every success raises it by 1/limit (about +1 per full window),
+    a 429 or 5xx cuts it by `decrease`, at most once per `cooldown`
+    seconds so one burst of failures counts as one signal.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        minimum: int = 1,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._limit = float(self.maximum)
+        self._in_flight = 0
+        self._last_decrease = float("-inf")
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify()
+
+    def on_success(self) -> None:
+        with self._cond:
+            grown = min(self.maximum, self._limit + 1 / self._limit)
+            if int(grown) > int(self._limit):
+                self._cond.notify()
+            self._limit = grown
+
+    def on_overload(self) -> bool:
+        """Shrink the limit; returns False when still cooling down from the last cut."""
+        with self._cond:
+            now = self._clock()
+            if now - self._last_decrease < self.cooldown:
+                return False
+            self._last_decrease = now
+            self._limit = max(self.minimum, self._limit * self.decrease)
+            return True
@@ -0,0 +1,392 @@
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Iterable, Iterator, Sequence
+
+from weather_analyzer.metrics import METRICS, Metric, selected_metrics
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# numpy / pandas are imported on first use: the entry points import this
+# module through process_data and must stay light
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NAT = -(2 ** 63)  # int64 view of NaT
+
+
+@dataclass(frozen=True, slots=True)
+class WeatherRecord:
+    """
+    One observation as stored in weather_summary. fetched_at is when it
+    was fetched, observed_at the provider's own `dt` (both naive UTC).
+    Fields after observed_at are the extended metrics (see metrics.METRICS);
+    None means not reported or not stored.
+    """
+
+    city: str
+    temperature: float
+    humidity: int | None
+    fetched_at: datetime
+    observed_at: datetime | None = None
+    pressure: int | None = None
+    wind_speed: float | None = None
+    wind_deg: int | None = None
+    clouds: int | None = None
+    rain_1h: float | None = None
+    snow_1h: float | None = None
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def row_columns(metrics: Sequence[str]) -> tuple[str, ...]:
+    """Column order of rows(): city, the metrics, observed_at, fetched_at."""
+    return ("city", *metrics, "observed_at", "fetched_at")
+
+
+# ----------------------
+# Payload parsing
+# ----------------------
+# Exact classes, not isinstance: bool is an int subclass but never a valid
+# reading. NaN / Infinity (which json accepts) are not readings either
+_NUMBER = (int, float)
+
+
+def _number(value) -> float | None:
+    if value.__class__ in _NUMBER and math.isfinite(value):
+        return float(value)
+    return None
+
+
+def metric_value(item: dict, metric: Metric) -> float | int | None:
+    """One metric from a payload; None when missing, non-numeric or below the metric's minimum."""
+    block, key = metric.path
+    block = item.get(block)
+    if not isinstance(block, dict):
+        return metric.absent
+    value = _number(block.get(key))
+    if value is None or (metric.minimum is not None and value < metric.minimum):
+        return None
+    return int(value) if metric.integer else value
+
+
+def payload_fields(item) -> dict | None:
+    """
+    {"city", <every registry metric>} of a raw OpenWeatherMap payload.
+
+    - No name, no "main" object or no numeric temperature: None (unusable)
+    - Any other missing, negative or non-numeric reading: None (stored as NULL)
+    - No "rain" / "snow" object at all: 0.0, the API leaves them out when dry
+    """
+    if not isinstance(item, dict):
+        return None
+    city = item.get("name")
+    main = item.get("main")
+    if not city or not isinstance(main, dict) or _number(main.get("temp")) is None:
+        return None
+    return {"city": city, **{name: metric_value(item, metric) for name, metric in METRICS.items()}}
+
+
+def observation_time(item: dict) -> datetime | None:
+    """Observation time from the payload's `dt` (Unix seconds), as naive UTC like fetched_at."""
+    try:
+        return datetime.fromtimestamp(item["dt"], timezone.utc).replace(tzinfo=None)
+    except (KeyError, TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def parse_payload(item, fetched_at: datetime, use_observation_time: bool = False) -> WeatherRecord | None:
+    """A WeatherRecord from a raw payload, or None when the payload is unusable."""
+    fields = payload_fields(item)
+    if fields is None:
+        return None
+    observed_at = observation_time(item)
+    when = (use_observation_time and observed_at) or fetched_at
+    return WeatherRecord(**fields, fetched_at=when, observed_at=observed_at)
+
+
+# ----------------------
+# Columnar batch
+# ----------------------
+class WeatherBatch:
+    """
+    Observations as one NumPy array per field, for writers and analytics
+    that work on whole columns.
+
+    - city: object array of str
+    - values: {metric: float64 array}, NaN where the payload had no reading;
+      each metric is also an attribute (batch.temperature)
+    - observed_at: datetime64[us] from the payload's `dt`, NaT without one
+    - fetched_at: datetime64[us], naive UTC
+    Built in a single pass over raw payloads, without an intermediate
+    dict or record per observation; ~10x less memory than record dicts.
+    """
+
+    __slots__ = ("city", "values", "observed_at", "fetched_at")
+
+    def __init__(self, city, values: dict, observed_at, fetched_at):
+        self.city = city
+        self.values = values
+        self.observed_at = observed_at
+        self.fetched_at = fetched_at
+
+    def __getattr__(self, name: str):
+        # Only reached for names that are not slots
+        if name in METRICS:
+            try:
+                return self.values[name]
+            except KeyError:
+                pass
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    @property
+    def metrics(self) -> tuple[str, ...]:
+        return tuple(self.values)
+
+    @classmethod
+    def from_payloads(
+        cls,
+        payloads: Sequence,
+        fetched_at: datetime | Sequence[datetime | None] | None = None,
+        use_observation_time: bool = False,
+        metrics: list[str] | None = None,
+    ) -> "WeatherBatch":
+        """
+        Parse raw payloads; unusable ones are left out (compare len()).
+
+        - fetched_at: one timestamp for all payloads, or one per payload
+          (None entries fall back to now, UTC)
+        - use_observation_time: prefer each payload's `dt` over fetched_at
+        - metrics: the metric set to keep (default: settings.METRICS)
+        """
+        import numpy as np
+
+        nan = float("nan")
+        names = selected_metrics(metrics)
+        columns = {name: [] for name in names}
+        # Extraction plan: metrics grouped by payload object, so each object
+        # is looked up once per payload whatever the number of metrics
+        groups: dict[str, list] = {}
+        for name in names:
+            if name != "temperature":
+                metric = METRICS[name]
+                absent = nan if metric.absent is None else metric.absent
+                groups.setdefault(metric.path[0], []).append((metric.path[1], columns[name].append, absent))
+        plan = list(groups.items())
+
+        per_payload = fetched_at is not None and not isinstance(fetched_at, datetime)
+        cities, observed, kept = [], [], []
+        add_city, add_temperature = cities.append, columns["temperature"].append
+        add_observed, add_kept = observed.append, kept.append
+
+        # Hot loop: same rules as payload_fields, inlined, and only
+        # references to the payload's own values are collected; non-finite
+        # metric readings become NaN when the columns are built below
+        isfinite = math.isfinite
+        for i, item in enumerate(payloads):
+            try:
+                main = item["main"]
+                city = item["name"]
+                temperature = main["temp"]
+            except (KeyError, TypeError, IndexError):
+                continue
+            if not city or temperature.__class__ not in _NUMBER or not isinstance(main, dict):
+                continue
+            if not isfinite(temperature):
+                continue
+
+            add_city(city)
+            add_temperature(temperature)
+            for block_name, fields in plan:
+                block = item.get(block_name)
+                if block.__class__ is dict:
+                    for key, add, _ in fields:
+                        value = block.get(key)
+                        add(value if value.__class__ in _NUMBER else nan)
+                else:
+                    for _, add, absent in fields:
+                        add(absent)
+            dt = item.get("dt")
+            add_observed(dt if dt.__class__ in _NUMBER else -1)
+            if per_payload:
+                add_kept(i)
+
+        values = {}
+        for name, collected in columns.items():
+            column = np.array(collected, dtype=np.float64)
+            column[np.isinf(column)] = nan
+            minimum = METRICS[name].minimum
+            if minimum is not None:
+                column[column < minimum] = nan
+            values[name] = column
+
+        now = (datetime.utcnow() - _EPOCH) // _MICROSECOND
+        if per_payload:
+            micros = np.array(
+                [now if fetched_at[i] is None else (fetched_at[i] - _EPOCH) // _MICROSECOND for i in kept],
+                dtype=np.int64,
+            )
+        else:
+            default = now if fetched_at is None else (fetched_at - _EPOCH) // _MICROSECOND
+            micros = np.full(len(cities), default, dtype=np.int64)
+        seconds = np.array(observed, dtype=np.float64)
+        seconds[~np.isfinite(seconds)] = -1
+        has_dt = seconds >= 0
+        observed_micros = np.where(has_dt, (seconds * 1_000_000).astype(np.int64), _NAT)
+        if use_observation_time:
+            micros = np.where(has_dt, observed_micros, micros)
+
+        return cls(
+            np.array(cities, dtype=object),
+            values,
+            observed_micros.view("datetime64[us]"),
+            micros.view("datetime64[us]"),
+        )
+
+    @classmethod
+    def from_records(cls, records: Iterable[WeatherRecord | dict], metrics: list[str] | None = None) -> "WeatherBatch":
+        import numpy as np
+
+        rows = [r.as_dict() if isinstance(r, WeatherRecord) else r for r in records]
+        # None (or a metric the rows lack) becomes NaN
+        values = {name: np.array([row.get(name) for row in rows], dtype=np.float64) for name in selected_metrics(metrics)}
+        return cls(
+            np.array([row["city"] for row in rows], dtype=object),
+            values,
+            np.array([row.get("observed_at") for row in rows], dtype="datetime64[us]"),  # None -> NaT
+            np.array([row["fetched_at"] for row in rows], dtype="datetime64[us]"),
+        )
+
+    @classmethod
+    def concat(cls, batches: Iterable["WeatherBatch"]) -> "WeatherBatch":
+        """Concatenate batches built with the same metric set."""
+        import numpy as np
+
+        batches = list(batches)
+        if not batches:
+            return cls.from_records([])
+        return cls(
+            np.concatenate([b.city for b in batches]),
+            {name: np.concatenate([b.values[name] for b in batches]) for name in batches[0].values},
+            np.concatenate([b.observed_at for b in batches]),
+            np.concatenate([b.fetched_at for b in batches]),
+        )
+
+    def subset(self, keep) -> "WeatherBatch":
+        """The rows selected by a boolean mask (or index array)."""
+        return type(self)(
+            self.city[keep],
+            {name: column[keep] for name, column in self.values.items()},
+            self.observed_at[keep],
+            self.fetched_at[keep],
+        )
+
+    def __len__(self) -> int:
+        return len(self.city)
+
+    def __iter__(self) -> Iterator[WeatherRecord]:
+        metrics = self.metrics
+        for city, *values, observed_at, fetched_at in self.rows():
+            yield WeatherRecord(city=city, fetched_at=fetched_at, observed_at=observed_at, **dict(zip(metrics, values)))
+
+    def _column(self, name: str) -> list:
+        """One metric as Python values (int for integer metrics), None where missing or not collected."""
+        import numpy as np
+
+        column = self.values.get(name)
+        if column is None:
+            return [None] * len(self)
+        missing = np.isnan(column)
+        if METRICS[name].integer:
+            column = np.where(missing, 0, column).astype(np.int64)
+        values = column.tolist()
+        for i in np.flatnonzero(missing).tolist():
+            values[i] = None
+        return values
+
+    def rows(self, metrics: Sequence[str] | None = None) -> Iterator[tuple]:
+        """
+        (city, *metrics, observed_at, fetched_at) tuples of Python values,
+        in row_columns() order; missing readings and observed_at are None.
+        - metrics: columns to emit (default: the batch's own metric set)
+        """
+        metrics = self.metrics if metrics is None else metrics
+        return zip(
+            self.city.tolist(),
+            *(self._column(name) for name in metrics),
+            self.observed_at.tolist(),  # NaT -> None
+            self.fetched_at.tolist(),
+        )
+
+    def to_dicts(self) -> list[dict]:
+        columns = row_columns(self.metrics)
+        return [dict(zip(columns, row)) for row in self.rows()]
+
+    def to_frame(self) -> "pd.DataFrame":
+        """DataFrame in the history dtypes (see db.history.HISTORY_DTYPES)."""
+        import numpy as np
+        import pandas as pd
+
+        frame = {"city": pd.Categorical(self.city)}
+        for name, column in self.values.items():
+            dtype = METRICS[name].dtype
+            if METRICS[name].integer:
+                missing = np.isnan(column)
+                frame[name] = pd.arrays.IntegerArray(np.where(missing, 0, column).astype(dtype.lower()), missing)
+            else:
+                frame[name] = column.astype(dtype)
+        frame["fetched_at"] = self.fetched_at.astype("datetime64[ns]")
+        return pd.DataFrame(frame)
+
+
+# ----------------------
+# Observation dedup
+# ----------------------
+class ObservationCache:
+    """
+    Newest stored observation time (`dt`) per city, kept in process so a
+    reading the provider has not updated yet is dropped before it reaches
+    the database (polling faster than the provider refreshes).
+
+    - fresh(batch): the rows that are not a repeat, i.e. whose observed_at
+      differs from the city's newest stored one and is not repeated
+      earlier in the same batch; rows without observed_at are kept
+    - remember(batch): record a batch once it has been stored
+    Only exact repeats are dropped here; older or unknown observations
+    are left to the database's observation key. Thread-safe.
+    """
+
+    def __init__(self):
+        self._newest: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def fresh(self, batch: WeatherBatch) -> WeatherBatch:
+        import numpy as np
+
+        keep = np.ones(len(batch), dtype=bool)
+        seen: set[tuple[str, int]] = set()
+        with self._lock:
+            newest = dict(self._newest)
+        for i, (city, observed) in enumerate(zip(batch.city.tolist(), batch.observed_at.view(np.int64).tolist())):
+            if observed == _NAT:
+                continue
+            if newest.get(city) == observed or (city, observed) in seen:
+                keep[i] = False
+            else:
+                seen.add((city, observed))
+        return batch if keep.all() else batch.subset(keep)
+
+    def remember(self, batch: WeatherBatch) -> None:
+        import numpy as np
+
+        with self._lock:
+            for city, observed in zip(batch.city.tolist(), batch.observed_at.view(np.int64).tolist()):
+                if observed != _NAT and observed > self._newest.get(city, _NAT):
+                    self._newest[city] = observed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._newest.clear()
@@ -1,73 +1,137 @@
-import schedule
-import time
-import subprocess
-import sys
-from pathlib import Path
-
-from weather_analyzer.main import main
-from weather_analyzer.plotting.plot_trends_postgres import (
-    fetch_weather_data,
-    compute_trends,
-    plot_temperature_trends
-)
+import math
+import signal
+
+from weather_analyzer.scheduling import Cadence, Scheduler
 from weather_analyzer.logger import get_logger
 from weather_analyzer.config.settings import settings
 
 logger = get_logger(__name__)
 
-# Ensure plots folder exists
-Path("plots").mkdir(parents=True, exist_ok=True)
-
 CITIES = settings.CITIES
 
-
-def job():
-    logger.info("Scheduled job started")
+INGEST_STAGES = ["fetch", "persist"]
+ANALYTICS_STAGES = ["maintain", "export", "analyze", "render"]
+
+
+_coordinator = None
+
+
+def get_coordinator():
+    """Shard coordinator for this replica, or None when sharding is off."""
+    global _coordinator
+    if settings.SHARDING_ENABLED and _coordinator is None:
+        from weather_analyzer.db.sharding import ShardCoordinator
+        _coordinator = ShardCoordinator()
+    return _coordinator
+
+
+def _run_stages(stages: list[str] | None, cities: list[str] | None = None) -> dict[str, float]:
+    # Heavy dependencies (pandas, matplotlib, psycopg2) load on the first run,
+    # not when the module is imported
+    from pathlib import Path
+    from weather_analyzer.pipeline import run_pipeline
+    from weather_analyzer.db.pool import get_pool
+
+    # Ensure plots folder exists
+    Path("plots").mkdir(parents=True, exist_ok=True)
+
+    run = run_pipeline(
+        cities=CITIES if cities is None else cities,
+        raw_output="data/history/raw",
+        stages=stages,
+    )
+    get_pool().log_metrics()
+    return run.timings
+
+
+def _share_api_quota(members: int) -> None:
+    # API_RATE_LIMIT_PER_MINUTE is the account quota; each replica's token
+    # bucket takes an equal share of it for the live replica count
+    from weather_analyzer.http_client import get_client
+
+    limiter = get_client().rate_limiter
+    if limiter is None:
+        return
+    rate = settings.API_RATE_LIMIT_PER_MINUTE / members
+    burst = max(1, settings.API_RATE_BURST // members)
+    if not math.isclose(limiter.rate * 60, rate) or limiter.capacity != burst:
+        logger.info(f"API quota for this replica: {rate:g}/min, burst {burst} ({members} replicas)")
+        limiter.set_rate(rate, burst)
+
+
+def ingest_job() -> dict[str, float]:
+    """Fetch current weather and store it (only this replica's shards when sharded)."""
+    coordinator = get_coordinator()
+    if coordinator is None:
+        return _run_stages(INGEST_STAGES)
+
+    cities = coordinator.cities(CITIES)
+    _share_api_quota(coordinator.member_count)
+    if not cities:
+        logger.info("No city shards owned by this worker this tick")
+        return {}
+    return _run_stages(INGEST_STAGES, cities=cities)
+
+
+def analytics_job() -> dict[str, float]:
+    """Partition maintenance, analytics and plots over stored history (leader only when sharded)."""
+    coordinator = get_coordinator()
+    if coordinator is not None and not coordinator.is_leader():
+        logger.info("Analytics skipped: another worker is the leader")
+        return {}
+    return _run_stages(ANALYTICS_STAGES)
+
+
+def job() -> dict[str, float]:
+    """Everything in one go: fetch → persist → maintain → export → analyze → render."""
+    return _run_stages(None)
+
+
+def analytics_cadence() -> Cadence:
+    if settings.ANALYTICS_INTERVAL_MINUTES > 0:
+        return Cadence.minutes(settings.ANALYTICS_INTERVAL_MINUTES)
+    return Cadence.daily(settings.ANALYTICS_SCHEDULE_AT)
+
+
+def build_scheduler() -> Scheduler:
+    """Ingestion and analytics on their own cadences from Settings."""
+    scheduler = Scheduler()
+    scheduler.add(
+        "ingest",
+        ingest_job,
+        Cadence.minutes(settings.SCHEDULER_INTERVAL_MINUTES),
+        policy=settings.SCHEDULER_MISSED_POLICY,
+        max_catch_up=settings.SCHEDULER_MAX_CATCH_UP,
+    )
+    scheduler.add(
+        "analytics",
+        analytics_job,
+        analytics_cadence(),
+        policy=settings.SCHEDULER_MISSED_POLICY,
+        max_catch_up=settings.SCHEDULER_MAX_CATCH_UP,
+    )
+    return scheduler
+
+
+def run():
+    """Start the scheduler loop (blocks until SIGINT / SIGTERM)."""
+    scheduler = build_scheduler()
+
+    def shutdown(signum, frame):
+        logger.info(f"Received signal {signum}, stopping scheduler")
+        scheduler.stop(wait=False)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
 
     try:
-        # 1️⃣ Run weather ingestion pipeline
-        main(
-            cities=CITIES,
-            raw_output="data/history/raw"
-        )
-
-        # 2️⃣ Fetch historical data
-        df = fetch_weather_data()
-        if df.empty:
-            logger.warning("No historical data available.")
-            return
-
-        # 3️⃣ Analytics
-        overall_stats, daily_stats = compute_trends(df)
-
-        logger.info("Weather analytics computed successfully.")
-        logger.info(f"\nOverall stats:\n{overall_stats}")
-
-        # 4️⃣ Analytics plots
-        plot_temperature_trends(daily_stats)
-
-        # 5️⃣ Run plot_trends.py USING VENV PYTHON
-        logger.info("Running plot_trends.py (city temperature over time)")
-        subprocess.run(
-            [
-                sys.executable,
-                "-m",
-                "weather_analyzer.plotting.plot_trends",
-            ],
-            check=True
-        )
-
-        logger.info("Scheduled job finished successfully")
-
-    except Exception:
-        logger.exception("Scheduled job failed")
-
-
-schedule.every().day.at("21:32").do(job)
-# schedule.every(10).minutes.do(job)
+        scheduler.run_forever()
+    finally:
+        scheduler.stop()
+        scheduler.log_metrics()
+        if get_coordinator() is not None:
+            get_coordinator().close()
 
-logger.info("Scheduler started. Waiting for jobs...")
 
-while True:
-    schedule.run_pending()
-    time.sleep(60)
\ No newline at end of file
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,291 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, time as dt_time, timedelta
+from typing import Callable
+
+from weather_analyzer.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Interval ticks sit on a fixed grid (e.g. :00, :10, :20 for 10 minutes),
+# so they never drift with job duration or process restarts
+_GRID_ANCHOR = datetime(2000, 1, 1)
+_MAX_TICKS_COUNTED = 100_000
+
+
+@dataclass(frozen=True)
+class Cadence:
+    """When a job is due: every `every`, or daily at local time `at`."""
+
+    every: timedelta | None = None
+    at: dt_time | None = None
+
+    def __post_init__(self):
+        if (self.every is None) == (self.at is None):
+            raise ValueError("Cadence needs exactly one of every / at")
+        if self.every is not None and self.every <= timedelta(0):
+            raise ValueError("Cadence interval must be positive")
+
+    @classmethod
+    def minutes(cls, minutes: float) -> "Cadence":
+        return cls(every=timedelta(minutes=minutes))
+
+    @classmethod
+    def daily(cls, at: str) -> "Cadence":
+        """`at` as HH:MM local time."""
+        return cls(at=dt_time.fromisoformat(at))
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First tick strictly after `moment`."""
+        if self.every is not None:
+            elapsed = (moment - _GRID_ANCHOR) // self.every
+            return _GRID_ANCHOR + (elapsed + 1) * self.every
+
+        candidate = datetime.combine(moment.date(), self.at)
+        return candidate if candidate > moment else candidate + timedelta(days=1)
+
+    def __str__(self) -> str:
+        if self.every is not None:
+            return f"every {self.every}"
+        return f"daily at {self.at.strftime('%H:%M')}"
+
+
+@dataclass
+class JobMetrics:
+    runs: int = 0
+    failures: int = 0
+    missed_ticks: int = 0      # ticks dropped by the skip policy or the catch-up cap
+    overlaps: int = 0          # ticks that came due while the job was still running
+    last_latency: float = 0.0  # seconds from start to finish
+    max_latency: float = 0.0
+    last_lag: float = 0.0      # seconds from the scheduled tick to the actual start
+    max_lag: float = 0.0
+    stages: dict[str, float] = field(default_factory=dict)  # last run's per-stage seconds
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: Callable[[], dict[str, float] | None]
+    cadence: Cadence
+    policy: str
+    max_catch_up: int
+    next_due: datetime
+    running: bool = False
+    last_overlap: datetime | None = None
+    metrics: JobMetrics = field(default_factory=JobMetrics)
+
+
+class Scheduler:
+    """
+    Runs jobs on independent cadences in a background worker each.
+
+    - Drift-free: ticks are computed from the cadence, never from
+      "last finish + interval", and the loop sleeps exactly until the next
+      tick instead of polling
+    - Single-flight: a job never starts while its previous run is still
+      going; ticks that come due meanwhile count as overlaps
+    - Missed ticks (slow job, suspended host) follow the job's policy:
+      "skip" runs once for the latest tick and drops the rest,
+      "catch_up" replays missed ticks back to back, at most `max_catch_up`
+    - Metrics per job: runs, failures, latency, lag behind the scheduled
+      tick, missed ticks, overlaps and the last run's stage timings
+      (a job may return {stage: seconds})
+    """
+
+    POLICIES = ("skip", "catch_up")
+
+    def __init__(self, clock: Callable[[], datetime] = datetime.now, max_sleep: float = 60.0):
+        self._clock = clock
+        # Upper bound on one sleep, so wall-clock jumps are noticed promptly
+        self.max_sleep = max_sleep
+        self._jobs: dict[str, ScheduledJob] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._executor: ThreadPoolExecutor | None = None
+        self._futures = set()
+
+    # ----------------------
+    # Registration
+    # ----------------------
+    def add(
+        self,
+        name: str,
+        func: Callable[[], dict[str, float] | None],
+        cadence: Cadence,
+        policy: str = "skip",
+        max_catch_up: int = 3,
+    ) -> ScheduledJob:
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown missed-tick policy: {policy}")
+        job = ScheduledJob(
+            name=name,
+            func=func,
+            cadence=cadence,
+            policy=policy,
+            max_catch_up=max(0, max_catch_up),
+            next_due=cadence.next_after(self._clock()),
+        )
+        self._jobs[name] = job
+        logger.info(f"Scheduled job {name}: {cadence}, missed ticks: {policy} (next {job.next_due})")
+        return job
+
+    # ----------------------
+    # Dispatch
+    # ----------------------
+    def _due_ticks(self, job: ScheduledJob, now: datetime) -> list[datetime]:
+        """Ticks from job.next_due up to now, inclusive."""
+        ticks = []
+        tick = job.next_due
+        while tick <= now and len(ticks) < _MAX_TICKS_COUNTED:
+            ticks.append(tick)
+            tick = job.cadence.next_after(tick)
+        return ticks
+
+    def run_pending(self, now: datetime | None = None) -> list[str]:
+        """Start every job with a due tick that is not already running. Returns started job names."""
+        now = now or self._clock()
+        started = []
+
+        with self._lock:
+            for job in self._jobs.values():
+                ticks = self._due_ticks(job, now)
+                if not ticks:
+                    continue
+
+                if job.running:
+                    if job.policy == "skip":
+                        job.metrics.overlaps += len(ticks)
+                        job.metrics.missed_ticks += len(ticks)
+                        job.next_due = job.cadence.next_after(now)
+                        logger.warning(f"Job {job.name} still running; skipped {len(ticks)} tick(s)")
+                    else:
+                        # Leave the ticks pending: they run once the current run ends
+                        new = [t for t in ticks if job.last_overlap is None or t > job.last_overlap]
+                        job.metrics.overlaps += len(new)
+                        job.last_overlap = ticks[-1]
+                    continue
+
+                if job.policy == "skip":
+                    scheduled = ticks[-1]
+                    job.metrics.missed_ticks += len(ticks) - 1
+                    job.next_due = job.cadence.next_after(now)
+                else:
+                    # Oldest replayable tick first; older ones beyond the cap are dropped
+                    backlog = ticks[-(job.max_catch_up + 1):]
+                    job.metrics.missed_ticks += len(ticks) - len(backlog)
+                    scheduled = backlog[0]
+                    job.next_due = job.cadence.next_after(scheduled)
+
+                if len(ticks) > 1:
+                    logger.warning(f"Job {job.name} was {len(ticks) - 1} tick(s) behind ({job.policy})")
+
+                job.running = True
+                self._submit(job, scheduled)
+                started.append(job.name)
+
+        return started
+
+    def _submit(self, job: ScheduledJob, scheduled: datetime) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max(1, len(self._jobs)), thread_name_prefix="job")
+        future = self._executor.submit(self._run_job, job, scheduled)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+
+    def _run_job(self, job: ScheduledJob, scheduled: datetime) -> None:
+        started_at = self._clock()
+        started = time.perf_counter()
+        stages = None
+        failed = False
+        try:
+            stages = job.func()
+        except Exception:
+            failed = True
+            logger.exception(f"Job {job.name} failed")
+        finally:
+            latency = time.perf_counter() - started
+            lag = max(0.0, (started_at - scheduled).total_seconds())
+            with self._lock:
+                m = job.metrics
+                m.runs += 1
+                m.failures += failed
+                m.last_latency = latency
+                m.max_latency = max(m.max_latency, latency)
+                m.last_lag = lag
+                m.max_lag = max(m.max_lag, lag)
+                if isinstance(stages, dict):
+                    m.stages = dict(stages)
+                job.running = False
+            self._wake.set()
+
+        stage_summary = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in (m.stages or {}).items())
+        logger.info(
+            f"Job {job.name} {'failed' if failed else 'finished'} in {latency:.2f}s "
+            f"(lag {lag:.2f}s){'; ' + stage_summary if stage_summary else ''}"
+        )
+
+    # ----------------------
+    # Loop
+    # ----------------------
+    def seconds_until_next(self, now: datetime | None = None) -> float:
+        now = now or self._clock()
+        with self._lock:
+            # Running jobs still wake the loop at their next tick (to skip it
+            # or count the overlap), unless that tick already passed; a
+            # finishing job wakes the loop itself
+            upcoming = [
+                job.next_due for job in self._jobs.values()
+                if not job.running or job.next_due > now
+            ]
+        if not upcoming:
+            return self.max_sleep
+        return min(self.max_sleep, max(0.0, (min(upcoming) - now).total_seconds()))
+
+    def run_forever(self) -> None:
+        """Dispatch due jobs until stop() is called."""
+        logger.info("Scheduler started. Waiting for jobs...")
+        while not self._stopped.is_set():
+            self.run_pending()
+            # Woken early when a job finishes, so catch-up ticks run right away
+            self._wake.wait(self.seconds_until_next())
+            self._wake.clear()
+
+    def wait(self) -> None:
+        """Block until every job started so far has finished."""
+        for future in list(self._futures):
+            future.result()
+
+    def stop(self, wait: bool = True) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    # ----------------------
+    # Metrics
+    # ----------------------
+    def metrics(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    **vars(job.metrics),
+                    "stages": dict(job.metrics.stages),
+                    "running": job.running,
+                    "next_due": job.next_due.isoformat(),
+                }
+                for name, job in self._jobs.items()
+            }
+
+    def log_metrics(self) -> None:
+        for name, m in self.metrics().items():
+            logger.info(
+                f"Job {name}: {m['runs']} runs, {m['failures']} failed, "
+                f"latency {m['last_latency']:.2f}s (max {m['max_latency']:.2f}s), "
+                f"lag {m['last_lag']:.2f}s (max {m['max_lag']:.2f}s), "
+                f"{m['missed_ticks']} missed, {m['overlaps']} overlaps"
+            )